@@ -0,0 +1,99 @@
+"""
+Content-hashed, on-disk cache for pipeline stages.
+A stage's key hashes its input data, its parameters and the source of the code it runs,
+so a stage is only recomputed when one of those changes. Entries are evicted least recently used
+once the cache directory grows past max_bytes.
+"""
+from __future__ import annotations
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import pandas as pd
+
+def hash_frame(df: pd.DataFrame) -> str:
+    """
+    Content hash of a dataframe (values, index, column names and dtypes).
+    """
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    return h.hexdigest()
+
+def code_version(*objs: Any) -> str:
+    """
+    Hash of the source of modules/functions (or plain strings such as library versions).
+    """
+    h = hashlib.sha256()
+    for obj in objs:
+        h.update((obj if isinstance(obj, str) else inspect.getsource(obj)).encode())
+    return h.hexdigest()
+
+def stage_key(stage: str, inputs: Sequence[str], params: Dict[str, Any], code: str) -> str:
+    payload = json.dumps({"stage": stage, "inputs": list(inputs), "params": params, "code": code}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+@dataclass
+class StageCache:
+    root: Path
+    max_bytes: int
+    enabled: bool = True
+    log: List[Tuple[str, str]] = field(default_factory=list)  # (stage, "hit" | "miss")
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pkl"
+
+    def run(self, stage: str, compute: Callable[[], Any], inputs: Sequence[str], params: Dict[str, Any], code: str) -> Tuple[Any, str]:
+        """
+        Returns (value, key). The key can be passed as an input of downstream stages.
+        """
+        key = stage_key(stage, inputs, params, code)
+        path = self._path(key)
+        if self.enabled and path.exists():
+            try:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                path.unlink(missing_ok=True)
+            else:
+                os.utime(path)  # mark as recently used
+                self.log.append((stage, "hit"))
+                return value, key
+
+        value = compute()
+        self.log.append((stage, "miss"))
+        if self.enabled:
+            self._put(path, value)
+        return value, key
+
+    def _put(self, path: Path, value: Any) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        # write then rename, so a crashed run never leaves a truncated entry
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+
+    def evict(self, keep: Path = None) -> None:
+        entries = sorted(self.root.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in entries)
+        for p in entries:
+            if total <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            total -= p.stat().st_size
+            p.unlink(missing_ok=True)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "hits": sum(1 for _, r in self.log if r == "hit"),
+            "misses": sum(1 for _, r in self.log if r == "miss"),
+        }
@@ -0,0 +1,71 @@
+"""
+One command line for the pipeline:
+
+    python -m src run --csv                  # the pipeline (src/commands/run_pipeline.py)
+    python -m src eda --chunksize 100000     # EDA figures and tables
+    python -m src score new.csv scored.csv   # score new enterprises with the saved artifact
+    python -m src scenarios --price 25 80    # stranded share at any carbon price
+    python -m src <bench | grid | query | rank | append | profile> --help
+
+Only argparse is imported up front: each subcommand imports what it needs when it runs, so light
+commands never pay for sklearn or matplotlib (tests/test_startup.py; timings: `python -m src bench --startup`).
+The other subcommands take exactly the options of their src.commands module, imported on use.
+"""
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+COMMANDS = {
+    "run": ("run_pipeline", "cli", "run the pipeline"),
+    "eda": ("eda_report", "cli", "EDA figures and tables"),
+    "score": ("score", "main", "score new enterprises with the saved artifact"),
+    "bench": ("benchmark", "main", "benchmark the stages on synthetic data, or the subcommands' startup"),
+    "grid": ("run_grid", "main", "sensitivity grid over the output-stage settings"),
+    "query": ("query_cube", "main", "roll-ups and slices of the stranding cube"),
+    "rank": ("rank", "main", "query the risk ranking index"),
+    "append": ("append_batch", "main", "score and append a new batch of raw records"),
+    "profile": ("profile_extract", "main", "data-quality profile of a raw extract"),
+}
+
+def scenarios(args) -> int:
+    # numpy / pandas only: the break-even column of the snapshot, sorted once, answers every price
+    from src.config import CARBON_PRICE_SCENARIOS_USD2010
+    from src.io import load_columnar
+    from src.scenarios import StrandingCurve
+
+    if not (args.snapshot / "manifest.json").exists():
+        raise SystemExit(f"no snapshot at {args.snapshot}; run `python -m src run` first")
+    column = "Break_Even_Carbon_Price"
+    curve = StrandingCurve.from_break_even(load_columnar(args.snapshot, columns=[column])[column])
+    prices = {} if args.price else dict(CARBON_PRICE_SCENARIOS_USD2010)
+    prices.update({f"{p:g}": p for p in args.price or []})
+    print(curve.table(prices).to_markdown(index=False, floatfmt=".4g"))
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description="Agri carbon-risk pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for command, (_, _, help_) in COMMANDS.items():
+        sub.add_parser(command, help=help_, add_help=False)  # options (and --help) go to the command's parser
+
+    from src.config import SNAPSHOT_COLUMNAR_PATH
+    p = sub.add_parser("scenarios", help="stranded share at the named scenarios or any carbon prices")
+    p.add_argument("--price", type=float, nargs="*", help="carbon prices (USD2010/tCO2e); default: the named scenarios")
+    p.add_argument("--snapshot", type=Path, default=SNAPSHOT_COLUMNAR_PATH, help="columnar snapshot written by run")
+    p.set_defaults(handler=scenarios)
+    return parser
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.command in COMMANDS:
+        module, entry, _ = COMMANDS[args.command]
+        sys.argv[0] = f"python -m src {args.command}"  # usage lines of the command's parser
+        return getattr(importlib.import_module(f"src.commands.{module}"), entry)(rest) or 0
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
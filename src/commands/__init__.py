@@ -0,0 +1,3 @@
+"""
+The subcommands of `python -m src` (src/cli.py), one module each with its argparse entry point.
+"""
@@ -0,0 +1,51 @@
+"""
+Appends a new batch of raw enterprise records (e.g. the next quarter) without re-running the pipeline:
+only the new rows are scored, the running statistics are updated, and drifted statistics are flagged.
+
+    python -m src append data/AgriRiskFin_2026Q3.csv --name 2026Q3
+"""
+import argparse
+from pathlib import Path
+
+from src.config import ARTIFACT_PATH, STATE_PATH, INCREMENT_DIR, DRIFT_REPORT_PATH, DEFAULT_DRIFT_TOLERANCE
+from src.io import load_raw_data, save_clean_data, save_columnar
+from src.reporting import write_markdown
+from src.scoring import load_artifact
+from src.incremental import append_batch, drift_table, load_state, save_state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a new batch with the fitted pipeline and update the running statistics.")
+    parser.add_argument("input", type=Path, help="raw AgriRiskFin-schema CSV")
+    parser.add_argument("--name", help="batch name (default: the file name)")
+    parser.add_argument("--artifact", type=Path, default=ARTIFACT_PATH)
+    parser.add_argument("--state", type=Path, default=STATE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_DRIFT_TOLERANCE, help="drift that flags the earlier rows for rescoring")
+    parser.add_argument("--csv", action="store_true", help="also export the scored batch as CSV")
+    args = parser.parse_args(argv)
+
+    name = args.name or args.input.stem
+    artifact = load_artifact(args.artifact)
+    state = load_state(args.state, artifact)
+    if name in state.batches:
+        parser.error(f"batch {name!r} was already appended (choose another --name)")
+    scored = append_batch(state, artifact, load_raw_data(args.input), name)
+
+    save_columnar(scored, INCREMENT_DIR / name)
+    if args.csv:
+        save_clean_data(scored, INCREMENT_DIR / f"{name}.csv")
+    save_state(state, args.state)
+
+    table = drift_table(state, artifact, args.tolerance)
+    flagged = table[table["flagged"]]
+    write_markdown(DRIFT_REPORT_PATH, (
+        f"# Drift after batch {name}\n\n"
+        f"- rows: {state.n_rows} ({len(state.batches)} appended batches: {', '.join(state.batches)})\n"
+        f"- tolerance: {args.tolerance}; flagged: {len(flagged)}\n\n"
+        + table.to_markdown(index=False, floatfmt=".4g") + "\n"
+    ))
+    print(f"Scored {len(scored)} rows -> {INCREMENT_DIR / name}")
+    if len(flagged):
+        print(f"{len(flagged)} statistic(s) drifted past {args.tolerance}; earlier rows need rescoring (run_pipeline.py):")
+        print(flagged[["statistic", "drift"]].to_string(index=False))
+    return 0
@@ -0,0 +1,234 @@
+"""
+Benchmarks every stage run_pipeline.main calls on synthetic AgriRiskFin-schema data.
+Each size is timed (best of --repeat runs), then run once more under tracemalloc for the peak
+allocation per stage. Results go to outputs/benchmarks/latest.json and are compared stage by stage
+against a stored baseline; the exit code is 1 when a stage regressed past the thresholds or has
+no baseline (a size the baseline was not recorded at).
+
+    python -m src bench --rows 10k 1m                 # run + compare to the baseline
+    python -m src bench --rows 10k 1m 10m --save-baseline
+    python -m src bench --startup                    # import time of the python -m src subcommands
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from src.config import (
+    PROJECT_ROOT, RAW_DATA_PATH, BENCH_DIR, SYNTHETIC_DIR, CARBON_PRICE_SCENARIOS_USD2010, SEVERE_SCENARIO,
+    EXCLUDE_PROFIT, EXCLUDE_OTHER, PipelineConfig
+)
+from src.io import load_raw_data, save_clean_data
+from src.features import add_financial_ratios, add_climate_stress, climate_stress_stats
+from src.preprocessing import fit_clean_dataset
+from src.proxies import add_proxy_variants, compare_proxies, choose_baseline_proxy, fit_proxy_stats
+from src.models import train_ridge_regression, predict_column
+from src.outputs import add_pipeline_outputs
+from src.synthetic import fit_profile, write_synthetic
+
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+STARTUP_BASELINE_PATH = BENCH_DIR / "startup_baseline.json"
+DEFAULT_SIZES = ["10k", "1m", "10m"]
+
+def parse_rows(text: str) -> int:
+    text = text.lower().replace("_", "")
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+def synthetic_path(n_rows: int, random_state: int) -> Path:
+    path = SYNTHETIC_DIR / f"agririskfin_{n_rows}_{random_state}.csv"
+    if not path.exists():
+        write_synthetic(path, n_rows, fit_profile(load_raw_data(RAW_DATA_PATH)), random_state=random_state)
+    return path
+
+# --- the stages of run_pipeline.main, each taking and returning the running state --------------
+
+def stage_load(st, cfg):
+    st["df"] = load_raw_data(st["path"])
+
+def stage_features(st, cfg):
+    df = add_financial_ratios(st["df"], inplace=cfg.inplace)
+    st["df"] = add_climate_stress(df, inplace=cfg.inplace, temp_stats=climate_stress_stats(df))
+
+def stage_clean(st, cfg):
+    st["df"], _ = fit_clean_dataset(st["df"], inplace=cfg.inplace)
+
+def stage_proxies(st, cfg):
+    st["df"] = add_proxy_variants(st["df"], inplace=cfg.inplace, stats=fit_proxy_stats(st["df"]))
+    compare_proxies(st["df"], q=cfg.top_risk_q)
+
+def stage_models(st, cfg):
+    df = st["df"]
+    baseline = choose_baseline_proxy(df, preferred="Emissions_Proxy_v1")
+    res = train_ridge_regression(df, "Net_Profit", EXCLUDE_PROFIT + EXCLUDE_OTHER, cfg.random_state, cfg.cv_splits)
+    df = predict_column(df, res.model, res.features, "Pred_Net_Profit", inplace=cfg.inplace)
+    res = train_ridge_regression(df, baseline, [baseline] + EXCLUDE_OTHER, cfg.random_state, cfg.cv_splits)
+    st["df"] = predict_column(df, res.model, res.features, "Pred_Emissions_Proxy", inplace=cfg.inplace)
+
+def stage_outputs(st, cfg):
+    st["df"] = add_pipeline_outputs(
+        st["df"], CARBON_PRICE_SCENARIOS_USD2010, years=cfg.years, growth_rate=cfg.growth_rate,
+        discount_rate=cfg.discount_rate, severe=SEVERE_SCENARIO, inplace=cfg.inplace,
+    )
+
+def stage_export_csv(st, cfg):
+    with tempfile.TemporaryDirectory() as tmp:
+        save_clean_data(st["df"], Path(tmp) / "final_dataset_snapshot.csv")
+
+STAGES = [
+    ("load", stage_load),
+    ("features", stage_features),
+    ("clean", stage_clean),
+    ("proxies", stage_proxies),
+    ("models", stage_models),
+    ("outputs", stage_outputs),
+    ("export_csv", stage_export_csv),
+]
+
+def run_once(path: Path, cfg: PipelineConfig, trace_memory: bool) -> dict:
+    st, out = {"path": path}, {}
+    for name, fn in STAGES:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        fn(st, cfg)
+        seconds = time.perf_counter() - start
+        if trace_memory:
+            out[name] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        else:
+            out[name] = seconds
+    return out
+
+# --- startup: python -X importtime -m src <command> -----------------------------------------------
+
+# light subcommands must not import these (they alone cost most of a second)
+HEAVY_MODULES = ("sklearn", "scipy", "matplotlib")
+STARTUP_COMMANDS = {"help": ["--help"], "scenarios": ["scenarios"]}
+
+def import_profile(argv) -> tuple:
+    """
+    Total import time in seconds (sum of the top-level cumulative times) and the root names of every
+    imported module. The command may fail (e.g. no snapshot yet): its imports happen first.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-m", "src", *argv], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    total, modules = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip().split(".")[0])
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total / 1e6, modules
+
+def run_startup(repeat: int) -> dict:
+    results = []
+    for command, argv in STARTUP_COMMANDS.items():
+        runs = [import_profile(argv) for _ in range(repeat)]
+        heavy = sorted(set(HEAVY_MODULES) & set().union(*(m for _, m in runs)))
+        results.append({"rows": 0, "stage": f"startup:{command}", "seconds": min(s for s, _ in runs), "peak_mb": None, "heavy": heavy})
+        print(f"{'startup':>10} {command:<12} {results[-1]['seconds']:9.3f}s" + (f"  imports {', '.join(heavy)}" if heavy else ""))
+    return {
+        "meta": {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"), "python": platform.python_version(), "repeat": repeat},
+        "results": results,
+    }
+
+def run_benchmarks(sizes, cfg: PipelineConfig, repeat: int, memory: bool) -> dict:
+    results = []
+    for n_rows in sizes:
+        path = synthetic_path(n_rows, cfg.random_state)
+        times = [run_once(path, cfg, trace_memory=False) for _ in range(repeat)]
+        peaks = run_once(path, cfg, trace_memory=True) if memory else {}
+        for name, _ in STAGES:
+            results.append({
+                "rows": n_rows, "stage": name,
+                "seconds": min(t[name] for t in times),
+                "peak_mb": peaks.get(name),
+            })
+            print(f"{n_rows:>10} {name:<12} {results[-1]['seconds']:9.3f}s" + (f" {peaks[name]:10.1f} MB" if memory else ""))
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "numpy": np.__version__, "pandas": pd.__version__, "sklearn": sklearn.__version__,
+            "repeat": repeat, "inplace": cfg.inplace,
+        },
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, time_threshold: float, memory_threshold: float, min_seconds: float) -> pd.DataFrame:
+    """
+    One row per (rows, stage) of the current run; missing_baseline flags those the baseline lacks.
+    A stage regresses when it is slower than baseline * (1 + time_threshold) by more than
+    min_seconds (timer noise), or its peak memory exceeds baseline * (1 + memory_threshold).
+    """
+    key = ["rows", "stage"]
+    cur = pd.DataFrame(current["results"]).set_index(key)
+    base = pd.DataFrame(baseline["results"]).set_index(key)
+    table = cur.join(base, lsuffix="", rsuffix="_baseline", how="left")
+    table["missing_baseline"] = table["seconds_baseline"].isna()
+    table["time_ratio"] = table["seconds"] / table["seconds_baseline"]
+    table["memory_ratio"] = table["peak_mb"] / table["peak_mb_baseline"]
+    slow = (table["time_ratio"] > 1 + time_threshold) & (table["seconds"] - table["seconds_baseline"] > min_seconds)
+    heavy = table["memory_ratio"] > 1 + memory_threshold
+    table["regression"] = slow | heavy.fillna(False)
+    return table.reset_index()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data.")
+    parser.add_argument("--rows", nargs="+", default=DEFAULT_SIZES, help="row counts, e.g. 10k 1m 10m")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per size (the fastest is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--inplace", action="store_true")
+    parser.add_argument("--startup", action="store_true", help="measure the import time of the python -m src subcommands instead of the stages")
+    parser.add_argument("--output", type=Path, default=None, help="default: latest.json (startup_latest.json with --startup)")
+    parser.add_argument("--baseline", type=Path, default=None, help="default: baseline.json (startup_baseline.json with --startup)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline instead of comparing")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="allowed relative slowdown per stage")
+    parser.add_argument("--memory-threshold", type=float, default=0.10, help="allowed relative peak-memory growth per stage")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="slowdowns below this many seconds are noise")
+    args = parser.parse_args(argv)
+    args.output = args.output or BENCH_DIR / ("startup_latest.json" if args.startup else "latest.json")
+    args.baseline = args.baseline or (STARTUP_BASELINE_PATH if args.startup else BASELINE_PATH)
+
+    if args.startup:
+        current = run_startup(max(args.repeat, 3))
+    else:
+        cfg = PipelineConfig(inplace=args.inplace)
+        current = run_benchmarks([parse_rows(r) for r in args.rows], cfg, args.repeat, memory=not args.no_memory)
+
+    out = args.baseline if args.save_baseline else args.output
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(current, indent=2))
+    print(f"Wrote {out}")
+    # a light subcommand importing a heavy module regresses whatever the baseline
+    heavy = [r["stage"] for r in current["results"] if r.get("heavy")]
+    if heavy:
+        print(f"{', '.join(heavy)} import(s) one of {HEAVY_MODULES}")
+        return 1
+    if args.save_baseline or not args.baseline.exists():
+        return 0
+
+    table = compare(current, json.loads(args.baseline.read_text()), args.time_threshold, args.memory_threshold, args.min_seconds)
+    cols = ["rows", "stage", "seconds_baseline", "seconds", "time_ratio", "peak_mb_baseline", "peak_mb", "memory_ratio", "regression", "missing_baseline"]
+    print(table[cols].to_markdown(index=False, floatfmt=".3f"))
+    failed = False
+    if table["regression"].any():
+        print(f"{int(table['regression'].sum())} stage(s) regressed against {args.baseline}")
+        failed = True
+    if table["missing_baseline"].any():
+        sizes = sorted(table.loc[table["missing_baseline"], "rows"].unique())
+        print(f"no baseline for rows {', '.join(map(str, sizes))} in {args.baseline}; record every size with --save-baseline")
+        failed = True
+    return int(failed)
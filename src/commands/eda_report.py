@@ -0,0 +1,60 @@
+import argparse
+
+from src.config import RAW_DATA_PATH, FIG_DIR, TABLE_DIR, REPORT_DIR, EDA_BINS, EDA_SCATTER_MAX_ROWS
+from src.io import ensure_dirs, load_raw_data, iter_raw_chunks
+from src.eda import compute_eda_summary, save_describe_table, accumulate_eda
+from src.profiling import DataProfile
+from src.figures import FigureSpec, histogram_specs, pair_spec, render_figures
+from src.reporting import write_markdown, format_eda_summary
+
+SCATTER_PAIRS = [("Avg_Temperature", "Net_Profit")]
+
+def profiled(chunks, profile: DataProfile):
+    for chunk in chunks:
+        profile.update(chunk)
+        yield chunk
+
+def main(chunksize=None, bins=EDA_BINS, scatter_max_rows=EDA_SCATTER_MAX_ROWS, n_workers=1, per_column=False, force=False):
+    ensure_dirs(FIG_DIR, TABLE_DIR, REPORT_DIR)
+
+    # One pass over the data (whole file, or chunks of chunksize rows, profiled for the summary as they pass)
+    profile = None
+    if chunksize:
+        profile = DataProfile(duplicates="exact")
+        chunks = profiled(iter_raw_chunks(RAW_DATA_PATH, chunksize, schema=False), profile)
+    else:
+        df = load_raw_data(RAW_DATA_PATH)
+        chunks = [df]
+    acc = accumulate_eda(chunks, pairs=SCATTER_PAIRS, bins=bins, scatter_max_rows=scatter_max_rows)
+
+    # Tables
+    if chunksize:
+        summary = profile.summary()
+        acc.describe().to_csv(TABLE_DIR / "describe.csv")
+    else:
+        summary = compute_eda_summary(df)
+        save_describe_table(df, TABLE_DIR / "describe.csv")
+
+    # Figures: cost depends on bins, not rows (raw scatter only up to scatter_max_rows)
+    # rendered in parallel, unchanged ones skipped
+    specs = histogram_specs(acc.hists, FIG_DIR, per_column=per_column)
+    specs.append(FigureSpec(FIG_DIR / "corr_heatmap.png", "plot_corr_matrix", (acc.cov.correlation(),)))
+    for x, y in acc.pairs:
+        specs.append(pair_spec(acc, x, y, FIG_DIR / "scatter_temp_profit.png" if (x, y) == SCATTER_PAIRS[0] else FIG_DIR / f"scatter_{x}_{y}.png"))
+    log = render_figures(specs, n_workers=n_workers, force=force)
+    print(f"Figures: {sum(s == 'rendered' for _, s in log)} rendered, {sum(s == 'cached' for _, s in log)} unchanged")
+
+    # Markdown report
+    md = format_eda_summary(summary)
+    write_markdown(REPORT_DIR / "eda_summary.md", md)
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="EDA figures and tables for the raw dataset.")
+    parser.add_argument("--chunksize", type=int, default=None, help="read the raw file in chunks of this many rows")
+    parser.add_argument("--bins", type=int, default=EDA_BINS)
+    parser.add_argument("--scatter-max-rows", type=int, default=EDA_SCATTER_MAX_ROWS, help="above this many rows the scatter becomes a binned density")
+    parser.add_argument("--workers", type=int, default=1, help="processes rendering the figures")
+    parser.add_argument("--per-column", action="store_true", help="one histogram figure per column instead of one grid")
+    parser.add_argument("--force", action="store_true", help="redraw every figure, even unchanged ones")
+    args = parser.parse_args(argv)
+    return main(args.chunksize, args.bins, args.scatter_max_rows, args.workers, args.per_column, args.force)
@@ -0,0 +1,43 @@
+"""
+Data-quality profile of an incoming extract in one chunked pass, before it enters the pipeline.
+
+    python -m src profile data/AgriRiskFin_2026Q3.csv
+    python -m src profile data/AgriRiskFin_2026Q3.csv --duplicates exact
+"""
+import argparse
+from pathlib import Path
+
+from src.config import RAW_DATA_PATH, TABLE_DIR, REPORT_DIR, DEFAULT_CHUNKSIZE
+from src.io import iter_raw_chunks
+from src.profiling import DUPLICATE_MODES, DEFAULT_BLOOM_CAPACITY, profile_chunks
+from src.reporting import write_markdown, format_eda_summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile a raw AgriRiskFin-schema extract in one chunked pass.")
+    parser.add_argument("input", type=Path, nargs="?", default=RAW_DATA_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--duplicates", choices=DUPLICATE_MODES, default="bloom",
+                        help="bloom: fixed memory, may overcount slightly; exact: memory grows with the distinct rows")
+    parser.add_argument("--bloom-capacity", type=int, default=DEFAULT_BLOOM_CAPACITY, help="distinct rows the Bloom filter is sized for")
+    args = parser.parse_args(argv)
+
+    chunks = iter_raw_chunks(args.input, args.chunksize, schema=False)  # dtypes as compute_eda_summary infers them
+    profile = profile_chunks(chunks, duplicates=args.duplicates, bloom_capacity=args.bloom_capacity)
+
+    name = args.input.stem
+    describe = profile.describe()
+    TABLE_DIR.mkdir(parents=True, exist_ok=True)
+    describe.to_csv(TABLE_DIR / f"profile_{name}.csv")
+    summary = profile.summary()
+    missing = {c: n for c, n in summary.missing_by_col.items() if n}
+    write_markdown(REPORT_DIR / f"profile_{name}.md", (
+        format_eda_summary(summary).replace("# EDA Summary", f"# Profile of {args.input.name}")
+        + f"- Duplicate count: {args.duplicates}"
+        + (" (Bloom filter, an upper bound)\n" if args.duplicates == "bloom" else "\n")
+        + "".join(f"- Missing {c}: {n}\n" for c, n in missing.items())
+        + "\n" + describe.T.to_markdown(floatfmt=".4g") + "\n"
+    ))
+    print(f"{summary.n_rows} rows, {summary.n_duplicates} duplicates, {sum(missing.values())} missing values"
+          f" -> {REPORT_DIR / f'profile_{name}.md'}")
+    return 0
@@ -0,0 +1,33 @@
+"""
+Roll-ups and slices of the stranding cube saved by run_pipeline.py (no row-level data is read).
+
+    python -m src query --by Region Climate_Profile --where "scenario=Divergent Net Zero"
+    python -m src query --by scenario --where Enterprise_Size=Small,Medium
+"""
+import argparse
+from pathlib import Path
+
+from src.config import CUBE_PATH
+from src.cube import load_cube
+
+
+def parse_where(items):
+    where = {}
+    for item in items:
+        axis, _, levels = item.partition("=")
+        if not levels:
+            raise argparse.ArgumentTypeError(f"expected axis=level[,level...], got {item!r}")
+        where[axis] = levels.split(",")
+    return where
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the Region x Enterprise_Size x Climate_Profile x scenario stranding cube.")
+    parser.add_argument("--by", nargs="*", default=["scenario"], help="axes to keep (the others are rolled up)")
+    parser.add_argument("--where", nargs="*", default=[], help="slices, e.g. scenario=Divergent Net Zero or Region=North,South")
+    parser.add_argument("--cube", type=Path, default=CUBE_PATH)
+    args = parser.parse_args(argv)
+
+    cube = load_cube(args.cube)
+    table = cube.query(by=args.by, where=parse_where(args.where))
+    print(table.to_markdown(floatfmt=".4g"))
+    return 0
@@ -0,0 +1,64 @@
+"""
+Queries the risk ranking index saved by run_pipeline.py (memory-mapped; the snapshot is never loaded).
+A column is a full risk score column name or a scenario (then Carbon_Risk_Score_Future_<scenario>).
+
+    python -m src rank list
+    python -m src rank top "Divergent Net Zero" -k 20
+    python -m src rank quantile "Divergent Net Zero" 0.9
+    python -m src rank above "Divergent Net Zero" 650
+    python -m src rank rank "Divergent Net Zero" ENT0042
+"""
+import argparse
+from pathlib import Path
+
+from src.config import RANKING_DIR
+from src.ranking import load_ranking_index
+
+
+def resolve_column(index, name: str) -> str:
+    if name in index.rankings:
+        return name
+    column = f"Carbon_Risk_Score_Future_{name}"
+    if column in index.rankings:
+        return column
+    raise SystemExit(f"no ranking for {name!r}; indexed: {', '.join(index.rankings)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Top-k, percentile and rank queries on the risk ranking index.")
+    parser.add_argument("--index", type=Path, default=RANKING_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="indexed columns")
+    p = sub.add_parser("top", help="the k highest-scoring enterprises")
+    p.add_argument("column")
+    p.add_argument("-k", type=int, default=10)
+    p = sub.add_parser("quantile", help="score at quantile q (e.g. 0.9 = top-10%% threshold)")
+    p.add_argument("column")
+    p.add_argument("q", type=float)
+    p = sub.add_parser("above", help="number of enterprises scoring at least the threshold")
+    p.add_argument("column")
+    p.add_argument("threshold", type=float)
+    p = sub.add_parser("rank", help="rank of an enterprise (Enterprise_ID or row number)")
+    p.add_argument("column")
+    p.add_argument("enterprise")
+    args = parser.parse_args(argv)
+
+    index = load_ranking_index(args.index)
+    if args.command == "list":
+        for col, r in index.rankings.items():
+            print(f"{col}  ({r.n_rows} rows{'' if r.complete else f', top {len(r.order)} kept'})")
+        return 0
+
+    column = resolve_column(index, args.column)
+    ranking = index.ranking(column)
+    if args.command == "top":
+        print(index.top(column, args.k).to_markdown(index=False, floatfmt=".4g"))
+    elif args.command == "quantile":
+        print(f"{column} q{args.q:g}: {ranking.quantile(args.q):.6g}")
+    elif args.command == "above":
+        n = ranking.count_at_least(args.threshold)
+        print(f"{column} >= {args.threshold:g}: {n} of {ranking.n_rows} ({n / ranking.n_rows:.2%})")
+    else:
+        enterprise = int(args.enterprise) if args.enterprise.isdigit() else args.enterprise
+        rank = index.rank(column, enterprise)
+        print(f"{args.enterprise} in {column}: " + (f"rank {rank} of {ranking.n_rows}" if rank else "not ranked"))
+    return 0
@@ -0,0 +1,409 @@
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from src.config import (
+    RAW_DATA_PATH, CLEAN_DATA_PATH, CLEAN_COLUMNAR_PATH, SNAPSHOT_COLUMNAR_PATH, SNAPSHOT_CSV_PATH,
+    FIG_DIR, TABLE_DIR, REPORT_DIR, CACHE_DIR, ARTIFACT_PATH, TRACE_PATH, CUBE_PATH, RANKING_DIR, STRANDING_CURVE_PATH,
+    CARBON_PRICE_SCENARIOS_USD2010, SEVERE_SCENARIO, DEFAULT_CHUNKSIZE, EXCLUDE_PROFIT, EXCLUDE_OTHER, PipelineConfig
+)
+from src.io import (
+    RAW_SCHEMA, ensure_dirs, load_raw_data, save_clean_data, save_columnar, load_columnar, columnar_columns,
+    iter_columnar_chunks, load_enterprise_ids, ColumnarWriter
+)
+from src.features import add_financial_ratios, add_climate_stress, climate_stress_stats
+from src.preprocessing import CATEGORICAL_COLS, build_clean_dataset, fit_clean_dataset, category_vocabularies, one_hot_nbytes
+from src.proxies import PROXY_VARIANTS, add_proxy_variants, compare_proxies, choose_baseline_proxy, fit_proxy_stats, StabilityAccumulator
+from src.models import train_ridge_regression, train_ridge_streaming, predict_column
+from src.outputs import add_pipeline_outputs, climate_profile_thresholds, CLIMATE_PROFILE_QUANTILES
+from src.sketch import make_sketch
+from src.reporting import save_table_csv, save_table_md, write_markdown
+from src.cache import StageCache, hash_frame, code_version
+from src.scoring import build_artifact, save_artifact
+from src.montecarlo import UncertaintySpec, add_stranding_probability
+from src.dag import run_stages, critical_path
+from src.instrument import active, enable, disable, trace_stage
+from src.stages import pipeline_stages, assemble_frame
+from src.cube import build_cube, save_cube
+from src.ranking import build_ranking_index, save_ranking_index, risk_columns
+from src.scenarios import StrandingCurve, price_grid
+from src import features, preprocessing, proxies, models, outputs, scenarios, projection, montecarlo, sketch
+from src.streaming import (
+    RunningRange, temperature_stats, iter_feature_chunks, fit_scaler,
+    update_proxy_moments, proxy_stats, sample_mask
+)
+
+def add_outputs(df_cleaned, cfg: PipelineConfig, inplace: bool, proxy_range=None, climate_thresholds=None):
+    # 6-9) Risk indices, future revenue, stranding
+    return add_pipeline_outputs(
+        df_cleaned, CARBON_PRICE_SCENARIOS_USD2010,
+        years=cfg.years, growth_rate=cfg.growth_rate, discount_rate=cfg.discount_rate, severe=SEVERE_SCENARIO,
+        inplace=inplace, proxy_range=proxy_range, climate_thresholds=climate_thresholds,
+        exact_quantiles=cfg.exact_quantiles, revenue_paths=cfg.revenue_path_columns,
+    )
+
+def write_run_summary(cfg: PipelineConfig, baseline_proxy: str, profit_res, em_res, cache: StageCache = None, timeline=None, memory=None) -> None:
+    # Quick summary markdown
+    md = (
+        "# Pipeline Run Summary\n\n"
+        f"- random_state: {cfg.random_state}\n"
+        f"- baseline proxy: {baseline_proxy}\n\n"
+        "## Model metrics\n"
+        f"- Net_Profit Ridge: alpha={profit_res.best_alpha:.4g}, RMSE={profit_res.test_rmse:.4g}, R2={profit_res.test_r2:.4g}\n"
+        f"- EmissionsProxy Ridge: alpha={em_res.best_alpha:.4g}, RMSE={em_res.test_rmse:.4g}, R2={em_res.test_r2:.4g}\n"
+    )
+    if memory is not None:
+        used, default = memory
+        md += (
+            "\n## Cleaned frame memory\n"
+            f"- compact categoricals: {cfg.compact_categories}, float32: {cfg.float32}\n"
+            f"- {used / 2 ** 20:.2f} MB vs {default / 2 ** 20:.2f} MB with dummies + float64 ({1 - used / default:.1%} saved)\n"
+        )
+    if cache is not None and cache.enabled:
+        counts = cache.summary()
+        md += (
+            "\n## Stage cache\n"
+            f"- hits: {counts['hits']}, misses: {counts['misses']}\n"
+            + "".join(f"- {stage}: {result}\n" for stage, result in cache.log)
+        )
+    if timeline is not None:
+        timings, (path, path_time) = timeline
+        md += (
+            f"\n## Stage timeline ({cfg.n_workers} workers)\n"
+            f"- critical path ({path_time:.3f}s): {' -> '.join(path)}\n\n"
+            "| stage | start (s) | end (s) | worker |\n|---|---|---|---|\n"
+            + "".join(f"| {t.name} | {t.start:.3f} | {t.end:.3f} | {t.worker} |\n" for t in sorted(timings, key=lambda t: t.start))
+        )
+    tracer = active()
+    if tracer is not None and tracer.records:
+        tracer.save_json(TRACE_PATH)
+        md += (
+            f"\n## Stage trace\n(full trace: {TRACE_PATH.name}; peak_mb = tracemalloc peak above the stage's starting allocation)\n\n"
+            + tracer.summary_table().to_markdown(index=False, floatfmt=".3f") + "\n"
+        )
+    write_markdown(REPORT_DIR / "run_summary.md", md)
+
+def save_stranding_curve(break_even) -> None:
+    # stranded share on a 0-500 price grid plus the named scenarios, one binary search each
+    curve = StrandingCurve.from_break_even(break_even)
+    save_table_csv(curve.table(price_grid(include=CARBON_PRICE_SCENARIOS_USD2010)), STRANDING_CURVE_PATH)
+
+def export_results(cfg: PipelineConfig, df, stability, fitted, baseline_proxy, profit_res, em_res) -> None:
+    save_table_csv(stability, TABLE_DIR / "proxy_stability.csv")
+    save_table_md(stability, TABLE_DIR / "proxy_stability.md")
+
+    # Export key outputs
+    save_columnar(df, SNAPSHOT_COLUMNAR_PATH)
+    if cfg.export_csv:
+        save_clean_data(df, SNAPSHOT_CSV_PATH, index=False)
+    save_cube(build_cube(df, CARBON_PRICE_SCENARIOS_USD2010), CUBE_PATH)
+    save_ranking_index(build_ranking_index(df, ids=load_enterprise_ids(RAW_DATA_PATH), top=cfg.ranking_top), RANKING_DIR)
+    save_stranding_curve(df["Break_Even_Carbon_Price"])
+
+    # Fitted state, for scoring new batches without refitting
+    future_proxy = df["Future_Emissions_Proxy"]
+    save_artifact(build_artifact(
+        cfg, baseline_proxy=baseline_proxy, profit_model=profit_res, emissions_model=em_res,
+        proxy_range=(float(future_proxy.min()), float(future_proxy.max())),
+        climate_thresholds=climate_profile_thresholds(df["Climate_Stress"], exact=cfg.exact_quantiles),
+        **fitted
+    ), ARTIFACT_PATH)
+
+def main_dag(cfg: PipelineConfig, df_cleaned, fitted, cache: StageCache, memory=None) -> None:
+    """
+    Steps 4-10 as a dependency graph (src/stages.py) on cfg.n_workers threads; same snapshot as main.
+    Only the clean stage goes through the stage cache.
+    """
+    # the frame's columns once the graph's proxies stage has run, as main_in_memory chooses from
+    baseline_proxy = choose_baseline_proxy(list(df_cleaned.columns) + PROXY_VARIANTS, preferred="Emissions_Proxy_v1")
+    stages = pipeline_stages(list(df_cleaned.columns), cfg, CARBON_PRICE_SCENARIOS_USD2010, SEVERE_SCENARIO, baseline_proxy)
+    with trace_stage("4-10) stage graph", df_cleaned):
+        store, timings = run_stages(stages, {c: df_cleaned[c] for c in df_cleaned.columns}, n_workers=cfg.n_workers)
+
+    fitted["proxy_stats"] = store["proxy_stats"]
+    with trace_stage("export"):
+        export_results(cfg, assemble_frame(df_cleaned, stages, store), store["stability"], fitted, baseline_proxy, store["profit_res"], store["em_res"])
+    write_run_summary(cfg, baseline_proxy, store["profit_res"], store["em_res"], cache, timeline=(timings, critical_path(stages, timings)), memory=memory)
+
+def main(cfg: PipelineConfig = None):
+    cfg = cfg or PipelineConfig()
+    if cfg.trace:
+        enable(memory=cfg.trace_memory)
+    try:
+        return main_streaming(cfg) if cfg.chunksize else main_in_memory(cfg)
+    finally:
+        disable()
+
+def main_in_memory(cfg: PipelineConfig):
+    inplace = cfg.inplace
+    ensure_dirs(FIG_DIR, TABLE_DIR, REPORT_DIR)
+    cache = StageCache(CACHE_DIR, cfg.cache_max_bytes, enabled=cfg.use_cache)
+
+    # 1) Load
+    with trace_stage("1) load") as t:
+        df_raw = load_raw_data(RAW_DATA_PATH)
+        raw_key = hash_frame(df_raw)
+        t.output(df_raw)
+
+    # 2) Features (raw-space) + 3) Clean dataset (dummies + scaling)
+    def clean_stage():
+        temp_stats = climate_stress_stats(df_raw)
+        df_feat = add_financial_ratios(df_raw, inplace=inplace)
+        df_feat = add_climate_stress(df_feat, inplace=inplace, temp_stats=temp_stats)
+        vocabularies = category_vocabularies(df_feat)
+        df, scaler = fit_clean_dataset(df_feat, inplace=inplace, compact=cfg.compact_categories, float32=cfg.float32)
+        return df, {"temp_stats": temp_stats, "vocabularies": vocabularies, "scaler": scaler}
+
+    with trace_stage("2-3) features + clean", df_raw) as t:
+        (df_cleaned, fitted), clean_key = cache.run(
+            "clean", clean_stage, inputs=[raw_key], params={"compact": cfg.compact_categories, "float32": cfg.float32},
+            code=code_version(clean_stage, features, preprocessing, pd.__version__)
+        )
+        t.output(df_cleaned)
+    memory = None
+    if cfg.compact_categories or cfg.float32:
+        memory = (int(df_cleaned.memory_usage(index=False, deep=True).sum()), one_hot_nbytes(df_cleaned))
+
+    # Save cleaned snapshot
+    with trace_stage("save cleaned", df_cleaned):
+        save_columnar(df_cleaned, CLEAN_COLUMNAR_PATH)
+        if cfg.export_csv:
+            save_clean_data(df_cleaned, CLEAN_DATA_PATH)
+    if cfg.dag:
+        return main_dag(cfg, df_cleaned, fitted, cache, memory=memory)
+
+    # 4) Emissions proxy variants + stability table
+    def proxy_stage():
+        stats = fit_proxy_stats(df_cleaned)
+        df = add_proxy_variants(df_cleaned, inplace=inplace, stats=stats)
+        return df, compare_proxies(df, q=cfg.top_risk_q, exact=cfg.exact_quantiles), stats
+
+    with trace_stage("4) proxies + stability", df_cleaned) as t:
+        (df_cleaned, stability, fitted["proxy_stats"]), proxy_key = cache.run(
+            "proxies", proxy_stage, inputs=[clean_key], params={"top_risk_q": cfg.top_risk_q, "exact_quantiles": cfg.exact_quantiles},
+            code=code_version(proxy_stage, proxies, sketch)
+        )
+        t.output(df_cleaned)
+
+    baseline_proxy = choose_baseline_proxy(df_cleaned, preferred="Emissions_Proxy_v1")
+
+    # 5) Models (D1-A, D2-A)
+    # excluded everything that can hurt the calculations
+    exclude_total_v1 = EXCLUDE_PROFIT + EXCLUDE_OTHER
+
+    # D2-A: predict baseline emissions proxy
+    exclude_em = [baseline_proxy]  # exclude target itself
+
+    exclude_total_v2 = exclude_em + EXCLUDE_OTHER
+
+    def model_stage():
+        df = df_cleaned
+        profit_res = train_ridge_regression(
+            df, target="Net_Profit",
+            feature_exclude=exclude_total_v1,
+            random_state=cfg.random_state,
+            cv_splits=cfg.cv_splits
+        )
+        df = predict_column(df, profit_res.model, profit_res.features, "Pred_Net_Profit", inplace=inplace)
+
+        em_res = train_ridge_regression(
+            df, target=baseline_proxy,
+            feature_exclude=exclude_total_v2,
+            random_state=cfg.random_state,
+            cv_splits=cfg.cv_splits
+        )
+        df = predict_column(df, em_res.model, em_res.features, "Pred_Emissions_Proxy", inplace=inplace)
+        return df, profit_res, em_res
+
+    model_params = {
+        "random_state": cfg.random_state, "cv_splits": cfg.cv_splits,
+        "exclude_profit": exclude_total_v1, "exclude_emissions": exclude_total_v2, "target": baseline_proxy,
+    }
+    with trace_stage("5) models", df_cleaned) as t:
+        (df_cleaned, profit_res, em_res), model_key = cache.run(
+            "models", model_stage, inputs=[proxy_key], params=model_params,
+            code=code_version(model_stage, models, sklearn.__version__)
+        )
+        t.output(df_cleaned)
+
+    # 6-9) Risk indices, future revenue, stranding
+    output_params = {
+        "years": cfg.years, "growth_rate": cfg.growth_rate, "discount_rate": cfg.discount_rate,
+        "revenue_paths": cfg.revenue_path_columns, "scenarios": CARBON_PRICE_SCENARIOS_USD2010, "severe": SEVERE_SCENARIO,
+        "exact_quantiles": cfg.exact_quantiles,
+    }
+    with trace_stage("6-9) outputs", df_cleaned) as t:
+        df_cleaned, output_key = cache.run(
+            "outputs", lambda: add_outputs(df_cleaned, cfg, inplace), inputs=[model_key], params=output_params,
+            code=code_version(add_outputs, outputs, scenarios, projection, sketch)
+        )
+        t.output(df_cleaned)
+
+    # 10) Optional: stranding probability under proxy-weight / price / growth / discount uncertainty
+    if cfg.mc_draws > 0:
+        spec = UncertaintySpec(n_draws=cfg.mc_draws, growth_mean=cfg.growth_rate, discount_mean=cfg.discount_rate, years=cfg.years)
+        with trace_stage("10) montecarlo", df_cleaned) as t:
+            df_cleaned, _ = cache.run(
+                "montecarlo",
+                lambda: add_stranding_probability(df_cleaned, spec, random_state=cfg.random_state, n_workers=cfg.n_workers, inplace=inplace),
+                inputs=[output_key], params={"spec": spec, "random_state": cfg.random_state},
+                code=code_version(montecarlo, proxies)
+            )
+            t.output(df_cleaned)
+
+    with trace_stage("export", df_cleaned):
+        export_results(cfg, df_cleaned, stability, fitted, baseline_proxy, profit_res, em_res)
+    write_run_summary(cfg, baseline_proxy, profit_res, em_res, cache, memory=memory)
+
+def main_streaming(cfg: PipelineConfig):
+    """
+    Same steps as main, in chunks of cfg.chunksize rows. Full-dataset statistics are accumulated
+    in one pass and applied in the next; the columnar cleaned snapshot doubles as the spill file between passes.
+    Only a few 1-D columns (proxies, Climate_Stress) and the model sample are held in full.
+    """
+    chunksize = cfg.chunksize
+    ensure_dirs(FIG_DIR, TABLE_DIR, REPORT_DIR)
+
+    # 1) Load: row count + Avg_Temperature stats
+    n_rows, temp_stats = temperature_stats(RAW_DATA_PATH, chunksize)
+
+    # 2-3) Features + clean dataset: fit the scaler over every chunk, then scale and save chunk by chunk
+    exclude = ["Financial_Risk_Level"]
+    scaler = fit_scaler(iter_feature_chunks(RAW_DATA_PATH, chunksize, temp_stats), exclude_cols=exclude)
+    writer = ColumnarWriter(CLEAN_COLUMNAR_PATH, n_rows)
+    for i, chunk in enumerate(iter_feature_chunks(RAW_DATA_PATH, chunksize, temp_stats)):
+        chunk = build_clean_dataset(chunk, inplace=True, scaler=scaler, compact=cfg.compact_categories, float32=cfg.float32)
+        writer.write(chunk)
+        if cfg.export_csv:
+            save_clean_data(chunk, CLEAN_DATA_PATH, append=i > 0)
+    writer.close()
+
+    # 4) Proxy z-score stats, model sample and climate-stress column in one pass
+    moments = {}
+    rng = np.random.default_rng(cfg.random_state)
+    fraction = cfg.model_sample_rows / max(1, n_rows)
+    sample_parts, stress_sketch = [], make_sketch(cfg.exact_quantiles)
+    for chunk in iter_columnar_chunks(CLEAN_COLUMNAR_PATH, chunksize):
+        update_proxy_moments(moments, chunk)
+        sample_parts.append(chunk[sample_mask(len(chunk), fraction, rng)])
+        stress_sketch.update(chunk["Climate_Stress"])
+    stats = proxy_stats(moments)
+    climate_thresholds = tuple(float(v) for v in stress_sketch.quantiles(CLIMATE_PROFILE_QUANTILES))
+    del stress_sketch
+
+    df_sample = add_proxy_variants(pd.concat(sample_parts, ignore_index=True), inplace=True, stats=stats)
+    del sample_parts
+    baseline_proxy = choose_baseline_proxy(df_sample, preferred="Emissions_Proxy_v1")
+
+    # 5) Models on the sample (every row when n_rows <= model_sample_rows), or out of core on every row
+    if cfg.out_of_core_models:
+        del df_sample
+        def model_chunks(profit_model=None):
+            for chunk in iter_columnar_chunks(CLEAN_COLUMNAR_PATH, chunksize):
+                chunk = add_proxy_variants(chunk, inplace=True, stats=stats)
+                if profit_model is not None:
+                    chunk = predict_column(chunk, profit_model.model, profit_model.features, "Pred_Net_Profit", inplace=True)
+                yield chunk
+        profit_res = train_ridge_streaming(
+            model_chunks, target="Net_Profit",
+            feature_exclude=EXCLUDE_PROFIT + EXCLUDE_OTHER,
+            random_state=cfg.random_state,
+            cv_splits=cfg.cv_splits
+        )
+        em_res = train_ridge_streaming(
+            lambda: model_chunks(profit_res), target=baseline_proxy,
+            feature_exclude=[baseline_proxy] + EXCLUDE_OTHER,
+            random_state=cfg.random_state,
+            cv_splits=cfg.cv_splits
+        )
+    else:
+        profit_res = train_ridge_regression(
+            df_sample, target="Net_Profit",
+            feature_exclude=EXCLUDE_PROFIT + EXCLUDE_OTHER,
+            random_state=cfg.random_state,
+            cv_splits=cfg.cv_splits
+        )
+        df_sample = predict_column(df_sample, profit_res.model, profit_res.features, "Pred_Net_Profit", inplace=True)
+        em_res = train_ridge_regression(
+            df_sample, target=baseline_proxy,
+            feature_exclude=[baseline_proxy] + EXCLUDE_OTHER,
+            random_state=cfg.random_state,
+            cv_splits=cfg.cv_splits
+        )
+        del df_sample
+
+    def iter_scored_chunks():
+        for chunk in iter_columnar_chunks(CLEAN_COLUMNAR_PATH, chunksize):
+            chunk = add_proxy_variants(chunk, inplace=True, stats=stats)
+            chunk = predict_column(chunk, profit_res.model, profit_res.features, "Pred_Net_Profit", inplace=True)
+            yield predict_column(chunk, em_res.model, em_res.features, "Pred_Emissions_Proxy", inplace=True)
+
+    # top-q thresholds of the proxies (for the stability table) + range of the future proxy for the min-shifted indices
+    proxy_sketches = {c: make_sketch(cfg.exact_quantiles) for c in PROXY_VARIANTS}
+    em_range = RunningRange()
+    for chunk in iter_scored_chunks():
+        for c, s in proxy_sketches.items():
+            s.update(chunk[c])
+        em_range.update(chunk["Pred_Emissions_Proxy"])
+    stability_acc = StabilityAccumulator(PROXY_VARIANTS, [s.quantile(cfg.top_risk_q) for s in proxy_sketches.values()])
+    del proxy_sketches
+
+    # 6-9) + export, chunk by chunk; the stability table accumulates along
+    writer = ColumnarWriter(SNAPSHOT_COLUMNAR_PATH, n_rows)
+    cube = None
+    for i, chunk in enumerate(iter_scored_chunks()):
+        stability_acc.update(chunk[PROXY_VARIANTS].to_numpy())
+        chunk = add_outputs(chunk, cfg, inplace=True, proxy_range=em_range.bounds(), climate_thresholds=climate_thresholds)
+        writer.write(chunk)
+        if cfg.export_csv:
+            save_clean_data(chunk, SNAPSHOT_CSV_PATH, index=False, append=i > 0)
+        part = build_cube(chunk, CARBON_PRICE_SCENARIOS_USD2010)
+        cube = part if cube is None else cube.merge(part)
+    writer.close()
+    stability = stability_acc.result().pairs()
+    save_table_csv(stability, TABLE_DIR / "proxy_stability.csv")
+    save_table_md(stability, TABLE_DIR / "proxy_stability.md")
+    save_cube(cube, CUBE_PATH)
+    scores = load_columnar(SNAPSHOT_COLUMNAR_PATH, columns=risk_columns(columnar_columns(SNAPSHOT_COLUMNAR_PATH)))
+    save_ranking_index(build_ranking_index(scores, ids=load_enterprise_ids(RAW_DATA_PATH), top=cfg.ranking_top), RANKING_DIR)
+    save_stranding_curve(load_columnar(SNAPSHOT_COLUMNAR_PATH, columns=["Break_Even_Carbon_Price"])["Break_Even_Carbon_Price"])
+
+    save_artifact(build_artifact(
+        cfg, temp_stats=temp_stats, vocabularies={c: list(RAW_SCHEMA[c].categories) for c in CATEGORICAL_COLS},
+        scaler=scaler, proxy_stats=stats, baseline_proxy=baseline_proxy, profit_model=profit_res, emissions_model=em_res,
+        proxy_range=em_range.bounds(), climate_thresholds=climate_thresholds,
+    ), ARTIFACT_PATH)
+
+    write_run_summary(cfg, baseline_proxy, profit_res, em_res)
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Run the agri carbon-risk pipeline.")
+    parser.add_argument("--inplace", action="store_true", help="append columns to one frame instead of copying it at every step")
+    parser.add_argument("--chunksize", type=int, nargs="?", const=DEFAULT_CHUNKSIZE, default=None,
+                        help=f"stream the raw file in chunks of this many rows (default {DEFAULT_CHUNKSIZE} when given without a value)")
+    parser.add_argument("--out-of-core-models", action="store_true", help="with --chunksize, fit the models on every row from accumulated X^T X / X^T y instead of a sample")
+    parser.add_argument("--csv", action="store_true", help="also export the cleaned data and the final snapshot as CSV")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage instead of loading unchanged ones from the stage cache")
+    parser.add_argument("--mc-draws", type=int, default=0, help="Monte Carlo draws for per-enterprise stranding probabilities (0 = off)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (threads with --dag) for parallel stages")
+    parser.add_argument("--dag", action="store_true", help="run independent stages concurrently and log per-stage start/end times")
+    parser.add_argument("--trace", action="store_true", help="record per-stage time, memory and shapes (stage_trace.json + run_summary.md)")
+    parser.add_argument("--compact", action="store_true", help="keep Region / Enterprise_Size / Quarter as int8-coded categoricals instead of dummies")
+    parser.add_argument("--float32", action="store_true", help="downcast the scaled numeric columns to float32")
+    parser.add_argument("--ranking-top", type=int, default=None, help="rank only the top-k rows per risk column (argpartition instead of a full sort)")
+    parser.add_argument("--exact-quantiles", action="store_true", help="exact tercile / top-q thresholds instead of KLL sketches (validation)")
+    parser.add_argument("--years", type=int, default=PipelineConfig.years, help="revenue projection horizon in years")
+    parser.add_argument("--no-revenue-paths", action="store_true", help="keep only the discounted revenue, not one Revenue_Year_k column per year")
+    parser.add_argument("--trace-no-memory", action="store_true", help="with --trace, skip tracemalloc (time and shapes only)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    return main(PipelineConfig(
+        inplace=args.inplace, chunksize=args.chunksize, out_of_core_models=args.out_of_core_models, export_csv=args.csv, use_cache=not args.no_cache,
+        mc_draws=args.mc_draws, n_workers=args.workers, dag=args.dag,
+        trace=args.trace, trace_memory=not args.trace_no_memory,
+        years=args.years, revenue_path_columns=not args.no_revenue_paths, exact_quantiles=args.exact_quantiles,
+        compact_categories=args.compact, float32=args.float32, ranking_top=args.ranking_top,
+    ))
@@ -0,0 +1,31 @@
+import argparse
+from pathlib import Path
+
+from src.config import ARTIFACT_PATH, DEFAULT_CHUNKSIZE
+from src.scoring import load_artifact, score_file
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score new enterprises with the fitted pipeline saved by run_pipeline.py.")
+    parser.add_argument("input", nargs="?", help="raw AgriRiskFin-schema CSV or columnar dataset")
+    parser.add_argument("output", nargs="?", help="output path (.csv for CSV, else a columnar dataset)")
+    parser.add_argument("--artifact", type=Path, default=ARTIFACT_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--serve", action="store_true", help="run the local HTTP scoring server instead")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-rows", type=int, default=1024)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    artifact = load_artifact(args.artifact)
+    if args.serve:
+        from src.serving import make_server
+        server = make_server(artifact, args.host, args.port, args.max_batch_rows, args.max_wait_ms)
+        print(f"Scoring on http://{args.host}:{args.port}/score")
+        server.serve_forever()
+        return
+    if not args.input or not args.output:
+        parser.error("input and output are required unless --serve is given")
+    n = score_file(artifact, Path(args.input), Path(args.output), chunksize=args.chunksize)
+    print(f"Scored {n} rows -> {args.output}")
@@ -4,7 +4,7 @@ Contains variables for everything
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PROJECT_ROOT / "data"
@@ -12,16 +12,52 @@ OUTPUT_DIR = PROJECT_ROOT / "outputs"
 FIG_DIR = OUTPUT_DIR / "figures"
 TABLE_DIR = OUTPUT_DIR / "tables"
 REPORT_DIR = OUTPUT_DIR / "reports"
+CACHE_DIR = OUTPUT_DIR / "cache"
+MODEL_DIR = OUTPUT_DIR / "models"
+BENCH_DIR = OUTPUT_DIR / "benchmarks"
 
 RAW_DATA_PATH = DATA_DIR / "AgriRiskFin_Dataset.csv"
 CLEAN_DATA_PATH = DATA_DIR / "data_cleaned.csv"
 
+# Generated AgriRiskFin-schema data for benchmarks (see src/synthetic.py)
+SYNTHETIC_DIR = DATA_DIR / "synthetic"
+
+# Binary columnar copies (see src/io.save_columnar); the CSVs above are exports
+CLEAN_COLUMNAR_PATH = DATA_DIR / "data_cleaned"
+SNAPSHOT_COLUMNAR_PATH = TABLE_DIR / "final_dataset_snapshot"
+SNAPSHOT_CSV_PATH = TABLE_DIR / "final_dataset_snapshot.csv"
+
+# Region x Enterprise_Size x Climate_Profile x scenario aggregates of the snapshot (see src/cube.py)
+CUBE_PATH = TABLE_DIR / "stranding_cube.npz"
+
+# Stranded share vs carbon price, from the sorted break-even prices (see scenarios.StrandingCurve)
+STRANDING_CURVE_PATH = TABLE_DIR / "stranding_curve.csv"
+
+# Key (input + code hash) of every rendered figure, so unchanged figures are not redrawn (see src/figures.py)
+FIGURE_HASHES_PATH = FIG_DIR / "figure_hashes.json"
+
+# Per-scenario ranking index of the risk score columns (see src/ranking.py)
+RANKING_DIR = TABLE_DIR / "risk_rankings"
+
+# Per-stage timing / memory trace of the last run_pipeline.py --trace run (see src/instrument.py)
+TRACE_PATH = REPORT_DIR / "stage_trace.json"
+
+# Fitted pipeline (scaler, vocabularies, stats, models) for scoring new batches (see src/scoring.py)
+ARTIFACT_PATH = MODEL_DIR / "pipeline_artifact.pkl"
+
+# Append mode (see src/incremental.py): running statistics, scored batches, drift report
+STATE_PATH = MODEL_DIR / "running_state.pkl"
+INCREMENT_DIR = TABLE_DIR / "increments"
+DRIFT_REPORT_PATH = REPORT_DIR / "drift_report.md"
+DEFAULT_DRIFT_TOLERANCE = 0.05  # drift past this flags the earlier rows for rescoring
+
 # Scenario multipliers (your notebook values)
 CARBON_PRICE_SCENARIOS_USD2010: Dict[str, float] = {
     "Delayed Transition": 10.0,
     "Net Zero(NZ) 2050": 110.0,
     "Divergent Net Zero": 300.0,
 }
+SEVERE_SCENARIO = "Divergent Net Zero"  # scenario used for Is_Stranded
 
 # Output generation defaults (your notebook choices)
 DEFAULT_YEARS = 5
@@ -33,6 +69,32 @@ DEFAULT_RANDOM_STATE = 37
 DEFAULT_CV_SPLITS = 5
 TOP_RISK_Q = 0.90  # top 10%
 
+# Streaming defaults (chunked run for extracts that do not fit in memory)
+DEFAULT_CHUNKSIZE = 250_000
+DEFAULT_MODEL_SAMPLE_ROWS = 500_000  # Ridge models are fit on a row sample of at most this size
+
+# D1-A: predict Net_Profit (exclude leakage + labels + derived outputs)
+EXCLUDE_PROFIT = [
+    "Net_Profit",
+    "Financial_Risk_Level",
+    "Profit_Margin",  # leakage for Net_Profit
+]
+
+# a text variable that's better off excluded
+# (Enterprise_Size itself is not listed: its dummies, or its codes in compact mode, always were model features)
+EXCLUDE_OTHER = [
+    "Climate_Profile",
+    "Financial_Risk_Level"
+]
+
+# EDA (see src/eda.py): histogram bins, 2-D density bins per axis, raw scatter up to this many rows
+EDA_BINS = 30
+EDA_DENSITY_BINS = 100
+EDA_SCATTER_MAX_ROWS = 50_000
+
+# Stage cache (see src/cache.py)
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
 @dataclass(frozen=True)
 class PipelineConfig:
     random_state: int = DEFAULT_RANDOM_STATE
@@ -41,3 +103,20 @@ class PipelineConfig:
     growth_rate: float = DEFAULT_GROWTH_RATE
     discount_rate: float = DEFAULT_DISCOUNT_RATE
     top_risk_q: float = TOP_RISK_Q
+    exact_quantiles: bool = False  # Series.quantile instead of KLL sketches for the tercile / top-q thresholds (see src/sketch.py)
+    inplace: bool = False  # transforms append columns to one frame instead of copying it
+    chunksize: Optional[int] = None  # None = load everything in memory, else stream chunks of this many rows
+    model_sample_rows: int = DEFAULT_MODEL_SAMPLE_ROWS
+    out_of_core_models: bool = False  # with chunksize, fit the Ridge models on every row from accumulated normal equations
+    export_csv: bool = False  # also write the cleaned data and the snapshot as CSV
+    use_cache: bool = True  # load unchanged stages from CACHE_DIR (in-memory run only)
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+    compact_categories: bool = False  # Region / Enterprise_Size / Quarter as int8-coded categoricals, not dummies
+    float32: bool = False  # downcast the scaled numeric columns
+    revenue_path_columns: bool = True  # Revenue_Year_k columns in the snapshot; off for long horizons (see src/projection.py)
+    ranking_top: Optional[int] = None  # keep only the top-k rows per risk column in the ranking index (None = full)
+    mc_draws: int = 0  # > 0 adds Monte Carlo stranding probabilities (see src/montecarlo.py)
+    n_workers: int = 1
+    trace: bool = False  # record per-stage wall/CPU time, peak memory and shapes (see src/instrument.py)
+    trace_memory: bool = True  # tracemalloc peaks while tracing (slows allocation-heavy stages)
+    dag: bool = False  # run the stages after cleaning as a dependency graph on n_workers threads (see src/stages.py)
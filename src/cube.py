@@ -0,0 +1,155 @@
+"""
+Aggregate cube of the snapshot: count, sum and sum of squares of Carbon_Risk_Score_Future_<scenario>,
+and the stranded count (risk > 0, as add_stranded_flag), per Region x Enterprise_Size x Climate_Profile
+x scenario cell. Built in one bincount pass over integer category codes; cubes of chunks merge by
+addition. Roll-ups and slices (query) only touch the cell arrays, never the row-level data.
+"""
+from __future__ import annotations
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.io import RAW_SCHEMA
+from src.outputs import CLIMATE_PROFILE_LEVELS
+from src.instrument import traced
+
+CUBE_DIMS = ["Region", "Enterprise_Size", "Climate_Profile"]
+DEFAULT_LEVELS: Dict[str, List[str]] = {
+    "Region": list(RAW_SCHEMA["Region"].categories),
+    "Enterprise_Size": list(RAW_SCHEMA["Enterprise_Size"].categories),
+    "Climate_Profile": CLIMATE_PROFILE_LEVELS,
+}
+MEASURES = ("count", "sum", "sumsq", "stranded")
+
+@dataclass
+class AggregateCube:
+    dims: List[str]                # row dimensions; "scenario" is the last axis of every array
+    levels: Dict[str, List[str]]
+    scenarios: List[str]
+    count: np.ndarray              # (*dims, scenario) rows per cell
+    sum: np.ndarray                # of the scenario's Carbon_Risk_Score_Future
+    sumsq: np.ndarray
+    stranded: np.ndarray           # rows with risk > 0
+    n_dropped: int = 0             # rows with a label outside the levels (or missing)
+
+    @property
+    def axes(self) -> List[str]:
+        return self.dims + ["scenario"]
+
+    def axis_levels(self, axis: str) -> List[str]:
+        return self.scenarios if axis == "scenario" else self.levels[axis]
+
+    def merge(self, other: "AggregateCube") -> "AggregateCube":
+        if (other.dims, other.levels, other.scenarios) != (self.dims, self.levels, self.scenarios):
+            raise ValueError("cubes have different dimensions, levels or scenarios")
+        for m in MEASURES:
+            setattr(self, m, getattr(self, m) + getattr(other, m))
+        self.n_dropped += other.n_dropped
+        return self
+
+    def query(self, by: Iterable[str] = (), where: Optional[Dict[str, Union[str, List[str]]]] = None) -> pd.DataFrame:
+        """
+        Slices with where={axis: level or [levels]}, then rolls up to the `by` axes: count, mean, std
+        (ddof=1), stranded count and share per group. Rolling up over "scenario" pools the scenarios,
+        so keep it in `by` or slice one.
+        """
+        by, where = list(by), dict(where or {})
+        unknown = [a for a in by + list(where) if a not in self.axes]
+        if unknown:
+            raise ValueError(f"unknown axes {unknown}; the cube has {self.axes}")
+
+        arrays = [getattr(self, m) for m in MEASURES]
+        labels = []
+        for ax, name in enumerate(self.axes):
+            levels = self.axis_levels(name)
+            picked = where.get(name, levels)
+            picked = [picked] if isinstance(picked, str) else list(picked)
+            missing = [p for p in picked if p not in levels]
+            if missing:
+                raise ValueError(f"{name} has no level(s) {missing}; levels are {levels}")
+            idx = [levels.index(p) for p in picked]
+            arrays = [np.take(a, idx, axis=ax) for a in arrays]
+            labels.append(picked)
+
+        keep = [self.axes.index(b) for b in by]
+        rolled = tuple(i for i in range(len(self.axes)) if i not in keep)
+        order = np.argsort(np.argsort(keep))  # kept axes come out in cube order; put them in `by` order
+        count, total, sumsq, stranded = (np.transpose(a.sum(axis=rolled), order).ravel() for a in arrays)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            var = np.maximum(sumsq - total * mean, 0) / (count - 1)
+        out = pd.DataFrame({
+            "count": count.astype(np.int64),
+            "mean": mean,
+            "std": np.sqrt(np.where(count > 1, var, np.nan)),
+            "stranded": stranded.astype(np.int64),
+            "stranded_share": np.where(count > 0, stranded / np.maximum(count, 1), np.nan),
+        })
+        if len(by) == 1:
+            out.index = pd.Index(labels[keep[0]], name=by[0])
+        elif by:
+            out.index = pd.MultiIndex.from_product([labels[k] for k in keep], names=by)
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Every cell as a row (the cube in long format).
+        """
+        return self.query(by=self.axes).reset_index()
+
+@traced
+def build_cube(
+    df: pd.DataFrame,
+    scenarios: Iterable[str],
+    dims: List[str] = None,
+    levels: Dict[str, List[str]] = None,
+    risk_prefix: str = "Carbon_Risk_Score_Future",
+) -> AggregateCube:
+    """
+    One grouped pass over the category codes of df (the snapshot or one chunk of it).
+    Levels are fixed (schema categories by default), so cubes of different chunks line up.
+    """
+    dims = list(dims or CUBE_DIMS)
+    levels = {d: list((levels or DEFAULT_LEVELS)[d]) for d in dims}
+    scenarios = list(scenarios)
+    shape = tuple(len(levels[d]) for d in dims)
+    n_scen, n_cells = len(scenarios), int(np.prod(shape))
+
+    codes = np.vstack([pd.Categorical(df[d], categories=levels[d]).codes for d in dims]).astype(np.int64)
+    valid = (codes >= 0).all(axis=0)
+    cell = np.ravel_multi_index(codes[:, valid], shape)
+    risk = np.column_stack([np.asarray(df[f"{risk_prefix}_{s}"], dtype=np.float64) for s in scenarios])[valid]
+
+    # one flat key per (row, scenario): cell-major, scenario last, as the arrays are laid out
+    key = (cell[:, None] * n_scen + np.arange(n_scen)[None, :]).ravel()
+    values = risk.ravel()
+    size = n_cells * n_scen
+    def agg(weights=None) -> np.ndarray:
+        return np.bincount(key, weights=weights, minlength=size).reshape(shape + (n_scen,))
+
+    return AggregateCube(
+        dims, levels, scenarios,
+        count=agg().astype(np.int64),
+        sum=agg(values),
+        sumsq=agg(values * values),
+        stranded=agg((values > 0).astype(np.float64)).astype(np.int64),
+        n_dropped=int((~valid).sum()),
+    )
+
+def save_cube(cube: AggregateCube, path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {"dims": cube.dims, "levels": cube.levels, "scenarios": cube.scenarios, "n_dropped": cube.n_dropped}
+    with open(path, "wb") as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **{m: getattr(cube, m) for m in MEASURES})
+    return path
+
+def load_cube(path: Path) -> AggregateCube:
+    with np.load(path, allow_pickle=False) as f:
+        meta = json.loads(str(f["meta"]))
+        return AggregateCube(meta["dims"], meta["levels"], meta["scenarios"], *(f[m] for m in MEASURES), n_dropped=meta["n_dropped"])
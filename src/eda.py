@@ -1,12 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from src.config import EDA_BINS, EDA_DENSITY_BINS, EDA_SCATTER_MAX_ROWS
+
 @dataclass
 class EDASummary:
     n_rows: int
@@ -63,3 +65,267 @@ def plot_scatter(df: pd.DataFrame, x: str, y: str, out_png: Path) -> None:
     plt.tight_layout()
     plt.savefig(out_png, dpi=200)
     plt.close()
+
+# ---------------------------------------------------------------------------
+# One-pass EDA over chunks: figures cost depends on the bin count, not the row count.
+# ---------------------------------------------------------------------------
+
+class BinnedHistogram:
+    """
+    Fixed-count histogram over 1 or 2 axes, filled chunk by chunk without knowing the range up front.
+    The grid starts at the first chunk's range; a value outside it doubles that axis' bin width
+    (merging adjacent pairs of bins, placed to cover the new range) until it fits. Edges are kept as
+    integer multiples of the starting bin width from the starting lo, so a merged edge is the same float
+    as before and the final counts are exact for the final grid (np.histogram on edges()).
+    range = [(lo, hi)] per axis pins the starting grid (e.g. [0, 1] indices).
+    """
+    def __init__(self, bins: int = EDA_BINS, ndim: int = 1, range: Optional[Sequence[Tuple[float, float]]] = None):
+        self.bins = bins + bins % 2  # even, so pairs of bins merge
+        self.ndim = ndim
+        self.origin = np.full(ndim, np.nan)  # edge n of an axis is origin + unit * n
+        self.unit = np.full(ndim, np.nan)
+        self.start = np.zeros(ndim, dtype=np.int64)  # first edge, in units
+        self.step = np.ones(ndim, dtype=np.int64)  # bin width, in units
+        self.counts = np.zeros((self.bins,) * ndim, dtype=np.int64)
+        self.n_dropped = 0  # rows with a NaN / inf on any axis
+        if range is not None:
+            self._init_grid(np.asarray(range, dtype=np.float64).T)
+
+    def _init_grid(self, x: np.ndarray) -> None:
+        lo, hi = x.min(axis=0), x.max(axis=0)
+        span = np.where(hi > lo, hi - lo, np.maximum(np.abs(lo), 1.0) * 1e-6)
+        self.origin, self.unit = lo, span / self.bins * (1 + 1e-12)  # so the top edge is not below max by rounding
+        self.start[:], self.step[:] = 0, 1
+
+    @property
+    def lo(self) -> np.ndarray:
+        return self.origin + self.unit * self.start
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.unit * self.step
+
+    def _grow(self, axis: int, lo: float, hi: float) -> None:
+        # double the bin width; the merged pairs land at the offset (in new bins) that covers [lo, hi]
+        half = self.bins // 2
+        width = 2 * self.width[axis]
+        k_min = max(0, int(np.ceil((self.lo[axis] - lo) / width)))
+        k_max = min(half, int(np.floor((self.lo[axis] + self.bins * width - hi) / width)))
+        if k_min <= k_max:  # fits after this doubling: centre the old grid + new values
+            mid = (min(lo, self.lo[axis]) + max(hi, self.edges(axis)[-1])) / 2
+            k = int(np.clip(round((self.lo[axis] - mid) / width + half), k_min, k_max))
+        else:
+            k = half if k_min > 0 else 0
+
+        shape = list(self.counts.shape)
+        shape[axis: axis + 1] = [half, 2]
+        merged = self.counts.reshape(shape).sum(axis=axis + 1)
+        grown = np.zeros_like(self.counts)
+        index = [slice(None)] * self.ndim
+        index[axis] = slice(k, k + half)
+        grown[tuple(index)] = merged
+        self.start[axis] -= k * 2 * self.step[axis]
+        self.step[axis] *= 2
+        self.counts = grown
+
+    def update(self, *columns) -> "BinnedHistogram":
+        x = np.column_stack([np.asarray(c, dtype=np.float64) for c in columns])
+        finite = np.isfinite(x).all(axis=1)
+        self.n_dropped += int((~finite).sum())
+        x = x[finite]
+        if not len(x):
+            return self
+        if np.isnan(self.origin).any():
+            self._init_grid(x)
+        lo, hi = x.min(axis=0), x.max(axis=0)
+        for axis in range(self.ndim):
+            while lo[axis] < self.lo[axis] or hi[axis] > self.edges(axis)[-1]:
+                self._grow(axis, lo[axis], hi[axis])
+        # as np.histogram: half-open bins, the last one closed
+        idx = [np.clip(np.searchsorted(self.edges(a), x[:, a], side="right") - 1, 0, self.bins - 1) for a in range(self.ndim)]
+        flat = np.ravel_multi_index(tuple(idx), self.counts.shape)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        return self
+
+    def edges(self, axis: int = 0) -> np.ndarray:
+        return self.origin[axis] + self.unit[axis] * (self.start[axis] + self.step[axis] * np.arange(self.bins + 1))
+
+    def occupied(self, axis: int = 0) -> slice:
+        # bins from the first to the last non-empty one along axis (for plotting without the grown margins)
+        other = tuple(a for a in range(self.ndim) if a != axis)
+        nz = np.flatnonzero(self.counts.sum(axis=other) if other else self.counts)
+        return slice(nz[0], nz[-1] + 1) if len(nz) else slice(0, self.bins)
+
+class RunningCovariance:
+    """
+    Count / means / co-moment matrix over k columns, merged chunk by chunk like RunningMoments.
+    Rows with a NaN in any column are skipped (DataFrame.corr drops pairwise instead; the same without NaNs).
+    """
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, df: pd.DataFrame) -> "RunningCovariance":
+        x = df[self.columns].to_numpy(dtype=np.float64)
+        x = x[~np.isnan(x).any(axis=1)]
+        n_b = len(x)
+        if not n_b:
+            return self
+        mean_b = x.mean(axis=0)
+        d = x - mean_b
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.comoment += d.T @ d + np.outer(delta, delta) * self.count * n_b / n
+        self.mean += delta * n_b / n
+        self.count = n
+        return self
+
+    def covariance(self, ddof: int = 1) -> pd.DataFrame:
+        cov = self.comoment / (self.count - ddof) if self.count > ddof else np.full_like(self.comoment, np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self) -> pd.DataFrame:
+        sd = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self.comoment / np.outer(sd, sd)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+class EDAAccumulator:
+    """
+    Everything eda_report.py plots, accumulated in one pass: per-column histograms, the covariance
+    of the numeric columns, 2-D densities for the scatter pairs, and (up to scatter_max_rows) the raw
+    points of those pairs. Numeric columns default to the first chunk's numeric columns.
+    The EDASummary of a chunked pass comes from src.profiling.DataProfile.
+    """
+    def __init__(self, numeric_cols: Optional[List[str]] = None, pairs: Sequence[Tuple[str, str]] = (),
+                 bins: int = EDA_BINS, density_bins: int = EDA_DENSITY_BINS, scatter_max_rows: int = EDA_SCATTER_MAX_ROWS,
+                 ranges: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.numeric_cols = numeric_cols
+        self.pairs = list(pairs)
+        self.bins = bins
+        self.density_bins = density_bins
+        self.scatter_max_rows = scatter_max_rows
+        self.ranges = ranges or {}
+        self.n_rows = 0
+        self.mins: Dict[str, float] = {}
+        self.maxs: Dict[str, float] = {}
+        self.hists: Dict[str, BinnedHistogram] = {}
+        self.densities: Dict[Tuple[str, str], BinnedHistogram] = {}
+        self.points: Dict[Tuple[str, str], List[pd.DataFrame]] = {}
+        self.cov: Optional[RunningCovariance] = None
+
+    def update(self, chunk: pd.DataFrame) -> "EDAAccumulator":
+        if self.cov is None:
+            if self.numeric_cols is None:
+                self.numeric_cols = chunk.select_dtypes(include="number").columns.tolist()
+            self.cov = RunningCovariance(self.numeric_cols)
+            self.hists = {c: BinnedHistogram(self.bins, range=[self.ranges[c]] if c in self.ranges else None) for c in self.numeric_cols}
+            self.pairs = [(x, y) for x, y in self.pairs if x in chunk.columns and y in chunk.columns]
+            self.densities = {p: BinnedHistogram(self.density_bins, ndim=2) for p in self.pairs}
+            self.points = {p: [] for p in self.pairs}
+        self.n_rows += len(chunk)
+        for c, h in self.hists.items():
+            h.update(chunk[c])
+            self.mins[c] = min(self.mins.get(c, np.inf), chunk[c].min())
+            self.maxs[c] = max(self.maxs.get(c, -np.inf), chunk[c].max())
+        self.cov.update(chunk)
+        keep_points = self.n_rows <= self.scatter_max_rows
+        for (x, y), h in self.densities.items():
+            h.update(chunk[x], chunk[y])
+            if keep_points:
+                self.points[(x, y)].append(chunk[[x, y]])
+            else:
+                self.points[(x, y)] = []  # past the threshold: density only
+        return self
+
+    def describe(self) -> pd.DataFrame:
+        """
+        count / mean / std / min / max of the numeric columns (as DataFrame.describe, without quantiles).
+        """
+        cov = self.cov.covariance()
+        return pd.DataFrame({
+            "count": [int(self.hists[c].counts.sum()) for c in self.numeric_cols],
+            "mean": self.cov.mean,
+            "std": np.sqrt(np.diag(cov.to_numpy())),
+            "min": [self.mins[c] for c in self.numeric_cols],
+            "max": [self.maxs[c] for c in self.numeric_cols],
+        }, index=self.numeric_cols).T
+
+    def scatter_points(self, pair: Tuple[str, str]) -> Optional[pd.DataFrame]:
+        parts = self.points.get(pair)
+        return pd.concat(parts, ignore_index=True) if parts else None
+
+def accumulate_eda(chunks: Iterable[pd.DataFrame], **kwargs) -> EDAAccumulator:
+    acc = EDAAccumulator(**kwargs)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc
+
+def _draw_binned(ax, col: str, h: BinnedHistogram) -> None:
+    used = h.occupied()
+    ax.stairs(h.counts[used], h.edges()[used.start: used.stop + 1], fill=True)
+    ax.set_title(col)
+    ax.grid(True)
+
+def plot_binned_histograms(hists: Dict[str, BinnedHistogram], out_png: Path) -> None:
+    out_png.parent.mkdir(parents=True, exist_ok=True)
+    n = len(hists)
+    ncols = int(np.ceil(np.sqrt(n))) if n else 1
+    nrows = int(np.ceil(n / ncols)) if n else 1
+    fig, axes = plt.subplots(nrows, ncols, figsize=(14, 10), squeeze=False)
+    for ax, (col, h) in zip(axes.flat, hists.items()):
+        _draw_binned(ax, col, h)
+    for ax in axes.flat[n:]:
+        ax.set_visible(False)
+    plt.tight_layout()
+    plt.savefig(out_png, dpi=200)
+    plt.close(fig)
+
+def plot_binned_histogram(h: BinnedHistogram, col: str, out_png: Path) -> None:
+    # one column per figure (see figures.histogram_specs)
+    out_png.parent.mkdir(parents=True, exist_ok=True)
+    fig, ax = plt.subplots(figsize=(6, 4))
+    _draw_binned(ax, col, h)
+    plt.tight_layout()
+    plt.savefig(out_png, dpi=200)
+    plt.close(fig)
+
+def plot_corr_matrix(corr: pd.DataFrame, out_png: Path) -> None:
+    out_png.parent.mkdir(parents=True, exist_ok=True)
+    plt.figure(figsize=(10, 8))
+    plt.imshow(corr.values)
+    plt.xticks(range(len(corr.columns)), corr.columns, rotation=90, fontsize=7)
+    plt.yticks(range(len(corr.columns)), corr.columns, fontsize=7)
+    plt.colorbar()
+    plt.title("Correlation matrix (numeric features)")
+    plt.tight_layout()
+    plt.savefig(out_png, dpi=200)
+    plt.close()
+
+def plot_density(h: BinnedHistogram, x: str, y: str, out_png: Path) -> None:
+    """
+    2-D binned counts of y vs x (log colour scale), in place of a scatter with one marker per row.
+    """
+    out_png.parent.mkdir(parents=True, exist_ok=True)
+    plt.figure(figsize=(8, 6))
+    ux, uy = h.occupied(0), h.occupied(1)
+    counts = np.ma.masked_equal(h.counts[ux, uy].T, 0)
+    plt.pcolormesh(h.edges(0)[ux.start: ux.stop + 1], h.edges(1)[uy.start: uy.stop + 1], counts, norm="log", cmap="viridis")
+    plt.colorbar(label="rows")
+    plt.xlabel(x)
+    plt.ylabel(y)
+    plt.title(f"{y} vs {x} ({int(h.counts.sum())} rows, binned)")
+    plt.tight_layout()
+    plt.savefig(out_png, dpi=200)
+    plt.close()
+
+def plot_pair(acc: EDAAccumulator, x: str, y: str, out_png: Path) -> None:
+    # raw scatter up to scatter_max_rows, binned density above
+    points = acc.scatter_points((x, y))
+    if points is not None:
+        plot_scatter(points, x, y, out_png)
+    else:
+        plot_density(acc.densities[(x, y)], x, y, out_png)
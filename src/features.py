@@ -1,24 +1,38 @@
 from __future__ import annotations
+from typing import Optional, Tuple
 import pandas as pd
 import numpy as np
+from src.instrument import traced
 
-def add_financial_ratios(df: pd.DataFrame) -> pd.DataFrame:
+@traced
+def add_financial_ratios(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Adds Profit_Margin, Cost_Ratio, Debt_Ratio based on notebook definitions.
     """
-    out = df.copy()
+    out = df if inplace else df.copy()
     out["Profit_Margin"] = out["Net_Profit"] / out["Revenue"]
     out["Cost_Ratio"] = out["Expenses"] / out["Revenue"]
     out["Debt_Ratio"] = out["Loan_Amount"] / out["Revenue"]
     return out
 
-def add_climate_stress(df: pd.DataFrame) -> pd.DataFrame:
+def climate_stress_stats(df: pd.DataFrame) -> Tuple[float, float]:
+    """
+    (mean, std) of Avg_Temperature, as add_climate_stress computes them.
+    """
+    return float(df["Avg_Temperature"].mean()), float(df["Avg_Temperature"].std())
+
+@traced
+def add_climate_stress(df: pd.DataFrame, inplace: bool = False, temp_stats: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
     """
     Adds Climate_Stress (your notebook version):
       0.4 * Drought + 0.4 * Flood + 0.2 * z(Temperature deviation)
+    temp_stats = (mean, std) of Avg_Temperature over the full dataset; pass it when df is only a chunk.
     """
-    out = df.copy()
-    temp_z = (out["Avg_Temperature"] - out["Avg_Temperature"].mean()) / (out["Avg_Temperature"].std() + 1e-9)
+    out = df if inplace else df.copy()
+    if temp_stats is None:
+        temp_stats = climate_stress_stats(out)
+    temp_mean, temp_std = temp_stats
+    temp_z = (out["Avg_Temperature"] - temp_mean) / (temp_std + 1e-9)
     out["Climate_Stress"] = (
         0.4 * out["Drought_Index"]
         + 0.4 * out["Flood_Risk_Score"]
@@ -0,0 +1,96 @@
+"""
+Figure rendering as a stage: a list of FigureSpec (a plot function of src.eda and its inputs) is
+rendered in a process pool with the Agg backend. Each figure's key hashes its inputs, parameters and
+the source of src.eda; a figure whose key matches the one recorded for its file (and whose
+file exists) is skipped. Keys are kept in one JSON file next to the figures.
+"""
+from __future__ import annotations
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.cache import hash_frame, code_version
+from src.config import FIG_DIR, FIGURE_HASHES_PATH
+from src.instrument import traced
+
+def _digest(obj: Any) -> str:
+    if isinstance(obj, pd.DataFrame):
+        return hash_frame(obj)
+    if isinstance(obj, pd.Series):
+        return hash_frame(obj.to_frame())
+    if isinstance(obj, np.ndarray):
+        return hashlib.sha256(obj.tobytes() + repr((obj.shape, obj.dtype.str)).encode()).hexdigest()
+    if isinstance(obj, dict):
+        return _digest([[str(k), _digest(v)] for k, v in obj.items()])
+    if isinstance(obj, (list, tuple)):
+        return hashlib.sha256(json.dumps([_digest(v) for v in obj]).encode()).hexdigest()
+    if hasattr(obj, "counts") and hasattr(obj, "edges"):  # BinnedHistogram
+        return _digest([obj.counts, obj.lo, obj.width])
+    return hashlib.sha256(repr(obj).encode()).hexdigest()
+
+@dataclass
+class FigureSpec:
+    out_png: Path
+    plot: str  # name of a src.eda plot function; out_png is passed by keyword
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def key(self) -> str:
+        from src import eda
+        return _digest([self.plot, code_version(eda), _digest(self.args), _digest(self.kwargs)])
+
+def histogram_specs(hists: Dict[str, Any], out_dir: Path = FIG_DIR, per_column: bool = False) -> List[FigureSpec]:
+    """
+    One grid figure of every column (histograms.png), or one figure per column (hist_<col>.png).
+    """
+    if not per_column:
+        return [FigureSpec(out_dir / "histograms.png", "plot_binned_histograms", (hists,))]
+    return [FigureSpec(out_dir / f"hist_{col}.png", "plot_binned_histogram", (h, col)) for col, h in hists.items()]
+
+def pair_spec(acc, x: str, y: str, out_png: Path) -> FigureSpec:
+    # as eda.plot_pair: raw scatter up to scatter_max_rows, binned density above
+    points = acc.scatter_points((x, y))
+    if points is not None:
+        return FigureSpec(out_png, "plot_scatter", (points, x, y))
+    return FigureSpec(out_png, "plot_density", (acc.densities[(x, y)], x, y))
+
+def _render(spec: FigureSpec) -> str:
+    import matplotlib
+    matplotlib.use("Agg")
+    from src import eda
+    getattr(eda, spec.plot)(*spec.args, out_png=spec.out_png, **spec.kwargs)
+    return str(spec.out_png)
+
+def _load_hashes(path: Path) -> Dict[str, str]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+@traced
+def render_figures(specs: Sequence[FigureSpec], n_workers: int = 1, hashes_path: Path = FIGURE_HASHES_PATH, force: bool = False) -> List[Tuple[str, str]]:
+    """
+    Renders the figures whose inputs changed, on n_workers processes. Returns (file, "rendered" | "cached") per spec.
+    """
+    hashes = _load_hashes(hashes_path)
+    keys = {str(s.out_png): s.key() for s in specs}
+    todo = [s for s in specs if force or not s.out_png.exists() or hashes.get(str(s.out_png)) != keys[str(s.out_png)]]
+    if n_workers <= 1 or len(todo) <= 1:
+        for s in todo:
+            _render(s)
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(todo))) as pool:
+            list(pool.map(_render, todo))
+
+    for s in todo:
+        hashes[str(s.out_png)] = keys[str(s.out_png)]
+    hashes_path.parent.mkdir(parents=True, exist_ok=True)
+    hashes_path.write_text(json.dumps(hashes, indent=2, sort_keys=True))
+    rendered = {str(s.out_png) for s in todo}
+    return [(str(s.out_png), "rendered" if str(s.out_png) in rendered else "cached") for s in specs]
@@ -0,0 +1,127 @@
+"""
+Sensitivity grids over the output-stage settings of PipelineConfig (years, growth_rate, discount_rate,
+top_risk_q) plus the scenario set and the severe scenario.
+Features, cleaning, proxies and models do not depend on those, so they run once (prepare_base); the
+columns the output stages read are written once as a columnar dataset, which every worker process
+memory-maps (shared through the page cache, never pickled). Each grid point then runs only steps 6-9
+and the stability table, and reports a few metrics as long-format rows.
+"""
+from __future__ import annotations
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.config import CARBON_PRICE_SCENARIOS_USD2010, SEVERE_SCENARIO, EXCLUDE_PROFIT, EXCLUDE_OTHER, PipelineConfig
+from src.io import load_raw_data, load_columnar, save_columnar
+from src.features import add_financial_ratios, add_climate_stress, climate_stress_stats
+from src.preprocessing import fit_clean_dataset
+from src.proxies import PROXY_VARIANTS, add_proxy_variants, choose_baseline_proxy, fit_proxy_stats, proxy_stability
+from src.models import train_ridge_regression, predict_column
+from src.outputs import add_pipeline_outputs
+
+GRID_FIELDS = ("years", "growth_rate", "discount_rate", "top_risk_q")
+GRID_INPUT_COLS = ["Revenue", "Climate_Stress", "Pred_Emissions_Proxy"] + PROXY_VARIANTS
+
+@dataclass
+class GridPoint:
+    point: int
+    cfg: PipelineConfig
+    scenarios: Dict[str, float] = field(default_factory=lambda: dict(CARBON_PRICE_SCENARIOS_USD2010))
+    severe: str = SEVERE_SCENARIO
+    scenario_set: int = 0  # position in the grid's list of scenario dicts
+
+    def params(self) -> dict:
+        return {"point": self.point, **{f: getattr(self.cfg, f) for f in GRID_FIELDS}, "scenario_set": self.scenario_set, "severe": self.severe}
+
+def expand_grid(grid: Dict[str, list], base: Optional[PipelineConfig] = None) -> List[GridPoint]:
+    """
+    Cartesian product of grid = {field: [values]} for the GRID_FIELDS, "scenarios" ([{name: price}, ...])
+    and "severe" ([scenario names]); missing keys keep the base config / constants.
+    """
+    base = base or PipelineConfig()
+    unknown = [k for k in grid if k not in GRID_FIELDS + ("scenarios", "severe")]
+    if unknown:
+        raise ValueError(f"only the output-stage settings {GRID_FIELDS} + scenarios/severe can vary, got {unknown}")
+    fields_ = [f for f in GRID_FIELDS if f in grid]
+    scenario_sets = grid.get("scenarios") or [dict(CARBON_PRICE_SCENARIOS_USD2010)]
+    severes = grid.get("severe") or [SEVERE_SCENARIO]
+
+    points = []
+    for values in itertools.product(*(grid[f] for f in fields_)):
+        cfg = replace(base, **dict(zip(fields_, values)))
+        for s, scenarios in enumerate(scenario_sets):
+            for severe in severes:
+                if severe not in scenarios:
+                    raise ValueError(f"severe scenario {severe!r} is not in scenario set {s}: {list(scenarios)}")
+                points.append(GridPoint(len(points), cfg, dict(scenarios), severe, s))
+    return points
+
+def prepare_base(cfg: PipelineConfig, raw_path: Path) -> pd.DataFrame:
+    """
+    Steps 1-5 of run_pipeline.py (features, cleaning, proxies, models): the config-independent part.
+    """
+    df = load_raw_data(raw_path)
+    df = add_financial_ratios(df, inplace=True)
+    df = add_climate_stress(df, inplace=True, temp_stats=climate_stress_stats(df))
+    df, _ = fit_clean_dataset(df, inplace=True, compact=cfg.compact_categories, float32=cfg.float32)
+    df = add_proxy_variants(df, inplace=True, stats=fit_proxy_stats(df))
+    baseline = choose_baseline_proxy(df, preferred="Emissions_Proxy_v1")
+    res = train_ridge_regression(df, "Net_Profit", EXCLUDE_PROFIT + EXCLUDE_OTHER, cfg.random_state, cfg.cv_splits)
+    df = predict_column(df, res.model, res.features, "Pred_Net_Profit", inplace=True)
+    res = train_ridge_regression(df, baseline, [baseline] + EXCLUDE_OTHER, cfg.random_state, cfg.cv_splits)
+    return predict_column(df, res.model, res.features, "Pred_Emissions_Proxy", inplace=True)
+
+def save_base(df: pd.DataFrame, path: Path) -> Path:
+    return save_columnar(df[GRID_INPUT_COLS], path)
+
+_BASE: Optional[pd.DataFrame] = None
+
+def _load_base(path: Path) -> None:
+    global _BASE
+    _BASE = load_columnar(path)
+
+def evaluate_point(point: GridPoint, base: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Steps 6-9 for one grid point; one row per (scenario, metric), scenario "" for the overall ones.
+    """
+    df = _BASE if base is None else base
+    cfg = point.cfg
+    out = add_pipeline_outputs(
+        df, point.scenarios, years=cfg.years, growth_rate=cfg.growth_rate, discount_rate=cfg.discount_rate,
+        severe=point.severe, revenue_paths=False, exact_quantiles=cfg.exact_quantiles,
+    )
+    rows = []
+    for s in point.scenarios:
+        risk = out[f"Carbon_Risk_Score_Future_{s}"].to_numpy()
+        rows += [
+            (s, "stranded_share", float((risk > 0).mean())),
+            (s, "mean_risk_score", float(risk.mean())),
+            (s, "mean_future_profit", float(out[f"Future_Profit_{s}"].mean())),
+        ]
+    stability = proxy_stability(df[PROXY_VARIANTS].to_numpy(), PROXY_VARIANTS, q=cfg.top_risk_q, exact=cfg.exact_quantiles)
+    rows += [
+        ("", "severe_stranded_share", float(out["Is_Stranded"].mean())),
+        ("", "mean_discounted_revenue", float(out["Discounted_Future_Revenues"].mean())),
+        ("", "mean_proxy_top_overlap", float(stability.scores()["mean_overlap"].mean())),
+    ]
+    table = pd.DataFrame(rows, columns=["scenario", "metric", "value"])
+    for i, (k, v) in enumerate(point.params().items()):
+        table.insert(i, k, v)
+    return table
+
+def run_grid(points: List[GridPoint], base_path: Path, n_workers: int = 1) -> pd.DataFrame:
+    """
+    Every grid point against the memory-mapped base columns, on a process pool of n_workers.
+    """
+    if n_workers <= 1:
+        _load_base(base_path)
+        parts = [evaluate_point(p) for p in points]
+    else:
+        chunksize = max(1, len(points) // (4 * n_workers))
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_load_base, initargs=(base_path,)) as pool:
+            parts = list(pool.map(evaluate_point, points, chunksize=chunksize))
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,127 @@
+"""
+Append mode for new batches of enterprise records (e.g. the next quarter).
+A batch is scored with the fitted statistics of the last full run (src/scoring.py), so earlier rows
+never change, while a state store keeps running sufficient statistics over every row seen so far.
+Every batch goes through the same frozen transforms, so the running statistics are exactly the
+ones a refit would compute; how far they moved from the applied ones is the drift. Once a
+statistic drifts past the tolerance, the earlier rows need rescoring (a full run_pipeline.py).
+"""
+from __future__ import annotations
+import copy
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from src.config import DEFAULT_DRIFT_TOLERANCE
+from src.features import add_financial_ratios, add_climate_stress
+from src.proxies import proxy_input_series
+from src.scoring import PipelineArtifact, score_frame
+from src.streaming import RunningMoments, RunningRange
+
+CLIMATE_QUANTILES = (0.33, 0.67)  # add_climate_profile terciles
+
+@dataclass
+class RunningState:
+    applied: Tuple  # fingerprint of the artifact the batches were scored with
+    n_rows: int
+    temperature: RunningMoments                # raw Avg_Temperature (add_climate_stress, ddof=1)
+    scaler: StandardScaler                     # partial_fit over every row (scale_numeric)
+    proxy_moments: Dict[str, RunningMoments]   # every series proxies.zscore sees (ddof=0)
+    proxy_range: RunningRange                  # Future_Emissions_Proxy (carbon cost min-shift)
+    climate_below: List[int]                   # rows with Climate_Stress <= the applied q33 / q67
+    batches: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_artifact(cls, artifact: PipelineArtifact) -> "RunningState":
+        """
+        Seeds the running statistics with the full run's: its row count is the scaler's.
+        """
+        n = int(np.max(artifact.scaler.n_samples_seen_))
+        temp_mean, temp_std = artifact.temp_stats
+        return cls(
+            applied=fingerprint(artifact), n_rows=n,
+            temperature=RunningMoments(n, temp_mean, temp_std ** 2 * (n - 1)),
+            scaler=copy.deepcopy(artifact.scaler),
+            proxy_moments={c: RunningMoments(n, m, s ** 2 * n) for c, (m, s) in artifact.proxy_stats.items()},
+            proxy_range=RunningRange(*artifact.proxy_range),
+            climate_below=[int(round(q * n)) for q in CLIMATE_QUANTILES],
+        )
+
+def fingerprint(artifact: PipelineArtifact) -> Tuple:
+    return (artifact.temp_stats, tuple(artifact.scaler.mean_), artifact.proxy_range, artifact.climate_thresholds)
+
+def save_state(state: RunningState, path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+def load_state(path: Path, artifact: PipelineArtifact) -> RunningState:
+    """
+    The stored state, or a fresh one when there is none or it belongs to an earlier full run.
+    """
+    path = Path(path)
+    if path.exists():
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if isinstance(state, RunningState) and state.applied == fingerprint(artifact):
+            return state
+    return RunningState.from_artifact(artifact)
+
+def append_batch(state: RunningState, artifact: PipelineArtifact, df_raw: pd.DataFrame, name: str) -> pd.DataFrame:
+    """
+    Scores only the new rows and folds them into the running statistics. Returns the scored batch.
+    """
+    if name in state.batches:
+        raise ValueError(f"batch {name!r} was already appended")
+    features = add_financial_ratios(df_raw)
+    features = add_climate_stress(features, inplace=True, temp_stats=artifact.temp_stats)
+    scored = score_frame(df_raw, artifact)
+
+    state.temperature.update(df_raw["Avg_Temperature"])
+    state.scaler.partial_fit(features[list(state.scaler.feature_names_in_)])
+    for col, s in proxy_input_series(scored).items():
+        state.proxy_moments.setdefault(col, RunningMoments()).update(s)
+    state.proxy_range.update(scored["Future_Emissions_Proxy"])
+    stress = scored["Climate_Stress"].to_numpy()
+    for i, q in enumerate(artifact.climate_thresholds):
+        state.climate_below[i] += int((stress <= q).sum())
+    state.n_rows += len(df_raw)
+    state.batches.append(name)
+    return scored
+
+def drift_table(state: RunningState, artifact: PipelineArtifact, tolerance: float = DEFAULT_DRIFT_TOLERANCE) -> pd.DataFrame:
+    """
+    One row per applied statistic, with a unit-free drift: mean shifts in applied standard deviations,
+    relative std change, range growth relative to the applied width, and the absolute change of the
+    share of rows under each climate tercile threshold.
+    """
+    rows = []
+    def moments(name, applied, running):
+        (m0, s0), (m1, s1) = applied, running
+        rows.append((f"{name} mean", m0, m1, abs(m1 - m0) / s0 if s0 > 0 else 0.0))
+        rows.append((f"{name} std", s0, s1, abs(s1 / s0 - 1) if s0 > 0 else 0.0))
+
+    moments("Avg_Temperature", artifact.temp_stats, state.temperature.stats(ddof=1))
+    applied_scale, running_scale = artifact.scaler, state.scaler
+    for j, col in enumerate(applied_scale.feature_names_in_):
+        moments(f"scaler {col}", (applied_scale.mean_[j], applied_scale.scale_[j]), (running_scale.mean_[j], running_scale.scale_[j]))
+    for col, stats in artifact.proxy_stats.items():
+        moments(f"proxy z {col}", stats, state.proxy_moments[col].stats(ddof=0))
+
+    lo, hi = artifact.proxy_range
+    run_lo, run_hi = state.proxy_range.bounds()
+    growth = max(lo - run_lo, run_hi - hi, 0.0) / (hi - lo) if hi > lo else 0.0
+    rows.append(("Future_Emissions_Proxy range", f"[{lo:.4g}, {hi:.4g}]", f"[{run_lo:.4g}, {run_hi:.4g}]", growth))
+    for q, below in zip(CLIMATE_QUANTILES, state.climate_below):
+        rows.append((f"Climate_Stress share <= q{round(q * 100)}", q, below / state.n_rows, abs(below / state.n_rows - q)))
+
+    table = pd.DataFrame(rows, columns=["statistic", "applied", "running", "drift"])
+    table["flagged"] = table["drift"] > tolerance
+    return table
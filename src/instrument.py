@@ -0,0 +1,186 @@
+"""
+Per-stage instrumentation: wall time, CPU time, peak traced memory and frame shapes in/out.
+Disabled by default; a disabled @traced call costs one global lookup and trace_stage yields a no-op.
+
+    tracer = enable()
+    with trace_stage("1) Load") as t:
+        df = load_raw_data(path)
+        t.output(df)
+    disable()
+    tracer.save_json(path); tracer.summary_table()
+
+Peak memory is tracemalloc's peak above the allocation at stage entry (numpy and pandas buffers
+included). Nested stages are supported; with concurrent threads the peaks are process-wide.
+"""
+from __future__ import annotations
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Iterator, List, Optional
+
+import pandas as pd
+
+@dataclass
+class StageRecord:
+    name: str
+    depth: int
+    parent: Optional[str]
+    start_s: float  # since the tracer was enabled
+    wall_s: float = 0.0
+    cpu_s: float = 0.0  # process CPU time (all threads, BLAS included)
+    peak_mb: Optional[float] = None
+    rows_in: Optional[int] = None
+    cols_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    cols_out: Optional[int] = None
+    _peak: int = field(default=0, repr=False)
+    _base: int = field(default=0, repr=False)
+
+    def output(self, obj: Any) -> None:
+        self.rows_out, self.cols_out = _shape(obj)
+
+class _NullRecord:
+    def output(self, obj: Any) -> None:
+        pass
+
+_NULL = _NullRecord()
+SHAPE_COLS = ["rows_in", "cols_in", "rows_out", "cols_out"]
+_TRACER: Optional["Tracer"] = None
+
+def _shape(obj: Any):
+    if isinstance(obj, tuple) and obj:
+        obj = obj[0]  # e.g. fit_clean_dataset -> (df, scaler)
+    if isinstance(obj, pd.DataFrame):
+        return obj.shape
+    if isinstance(obj, pd.Series):
+        return len(obj), 1
+    return None, None
+
+class Tracer:
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.records: List[StageRecord] = []
+        self._local = threading.local()
+        self._t0 = time.perf_counter()
+        self._owns_tracemalloc = memory and not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+
+    def _stack(self) -> List[StageRecord]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name: str, obj: Any = None) -> Iterator[StageRecord]:
+        stack = self._stack()
+        rec = StageRecord(name, len(stack), stack[-1].name if stack else None, start_s=time.perf_counter() - self._t0)
+        rec.rows_in, rec.cols_in = _shape(obj)
+        self.records.append(rec)
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            rec._base = rec._peak = current
+        stack.append(rec)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        finally:
+            rec.wall_s = time.perf_counter() - wall
+            rec.cpu_s = time.process_time() - cpu
+            stack.pop()
+            if self.memory:
+                rec._peak = max(rec._peak, tracemalloc.get_traced_memory()[1])
+                rec.peak_mb = (rec._peak - rec._base) / 2 ** 20
+                if stack:
+                    stack[-1]._peak = max(stack[-1]._peak, rec._peak)
+                tracemalloc.reset_peak()
+
+    def close(self) -> None:
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def to_dicts(self) -> List[dict]:
+        return [{k: v for k, v in asdict(r).items() if not k.startswith("_")} for r in self.records]
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.to_dicts(), columns=[f.name for f in fields(StageRecord) if not f.name.startswith("_")])
+        return df.astype({c: "Int64" for c in SHAPE_COLS})
+
+    def save_json(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"memory": self.memory, "records": self.to_dicts()}, indent=2))
+        return path
+
+    def summary_table(self) -> pd.DataFrame:
+        """
+        One row per (parent, name), in first-call order under each parent; repeated calls (chunks, scenarios) are summed,
+        except peak_mb and column counts (max).
+        """
+        df = self.to_frame()
+        df["parent"] = df["parent"].fillna("")
+        g = df.groupby(["depth", "parent", "name"], sort=False)
+        out = pd.concat([
+            g.size().rename("calls"),
+            g[["wall_s", "cpu_s"]].sum(),
+            g[["peak_mb", "cols_in", "cols_out"]].max(),
+            g[["rows_in", "rows_out"]].sum(min_count=1),
+        ], axis=1).reset_index()
+
+        # each stage directly followed by its children (threads interleave the raw records)
+        order: List[int] = []
+        def visit(depth: int, parent: str) -> None:
+            for i in out.index[(out["depth"] == depth) & (out["parent"] == parent)]:
+                order.append(i)
+                visit(depth + 1, out.at[i, "name"])
+        visit(0, "")
+        out = out.loc[order]
+        out.insert(0, "stage", ["· " * d + n for d, n in zip(out["depth"], out["name"])])  # tabulate strips spaces
+        return out[["stage", "calls", "wall_s", "cpu_s", "peak_mb", "rows_in", "cols_in", "rows_out", "cols_out"]]
+
+def active() -> Optional[Tracer]:
+    return _TRACER
+
+def enable(memory: bool = True) -> Tracer:
+    global _TRACER
+    _TRACER = Tracer(memory=memory)
+    return _TRACER
+
+def disable() -> Optional[Tracer]:
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is not None:
+        tracer.close()
+    return tracer
+
+@contextmanager
+def trace_stage(name: str, obj: Any = None):
+    if _TRACER is None:
+        yield _NULL
+        return
+    with _TRACER.stage(name, obj) as rec:
+        yield rec
+
+def traced(fn):
+    """
+    Records every call of a transform while a tracer is enabled; shapes come from the first
+    positional argument and from the return value.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _TRACER is None:
+            return fn(*args, **kwargs)
+        with _TRACER.stage(fn.__name__, args[0] if args else None) as rec:
+            result = fn(*args, **kwargs)
+            rec.output(result)
+        return result
+    return wrapper
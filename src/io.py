@@ -1,20 +1,217 @@
 """
 Inputs raw data from a path, outputs clean data to a path. Also ensures a directory exists before saving there
 """
+import json
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import numpy as np
 import pandas as pd
+from src.instrument import traced
 
 # this file contains the functions related to input/output. Even if those functions are only one line in length, they should be there for convenience
 
+# explicit dtypes for the 17 AgriRiskFin columns, so chunks never depend on inference.
+# Money columns stay float64 (Net_Profit = Revenue - Expenses is an exact identity the models pick up),
+# bounded indices are safe as float32
+RAW_SCHEMA: Dict[str, object] = {
+    "Enterprise_ID": "str",
+    "Region": pd.CategoricalDtype(["East", "North", "South", "West"]),
+    "Enterprise_Size": pd.CategoricalDtype(["Large", "Medium", "Small"]),
+    "Revenue": "float64",
+    "Expenses": "float64",
+    "Loan_Amount": "float64",
+    "Debt_to_Equity": "float32",
+    "Avg_Temperature": "float32",
+    "Rainfall": "float32",
+    "Drought_Index": "float32",
+    "Flood_Risk_Score": "float32",
+    "Commodity_Price_Index": "float32",
+    "Input_Cost_Index": "float32",
+    "Policy_Support_Score": "int8",
+    "Quarter": pd.CategoricalDtype(["Q1", "Q2", "Q3", "Q4"]),
+    "Net_Profit": "float64",
+    "Financial_Risk_Level": pd.CategoricalDtype(["Low", "Medium", "High"]),
+}
+
 # loads original raw data into a Pandas dataframe, so that we can then use the ETL pipeline on it
+@traced
 def load_raw_data(path) -> pd.DataFrame:
     df = pd.read_csv(path)
     return df
 
+# streams the raw data in chunks with the explicit schema, for extracts that do not fit in memory
+# downcast=False reads the float32 columns as float64 (e.g. to score exactly like the in-memory pipeline)
+# schema=False infers the dtypes per chunk, as load_raw_data does for the whole file
+def iter_raw_chunks(path, chunksize: int, usecols: Optional[List[str]] = None, downcast: bool = True, schema: bool = True) -> Iterator[pd.DataFrame]:
+    dtype = {c: (t if downcast or t != "float32" else "float64") for c, t in RAW_SCHEMA.items() if usecols is None or c in usecols} if schema else None
+    with pd.read_csv(path, dtype=dtype, usecols=usecols, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk
+
+# only the Enterprise_ID column of a raw file (the cleaned data drops it; row positions line up)
+def load_enterprise_ids(path) -> np.ndarray:
+    return pd.read_csv(path, usecols=["Enterprise_ID"], dtype={"Enterprise_ID": "str"})["Enterprise_ID"].to_numpy()
+
+# streams a cleaned file written by save_clean_data back in chunks (round_trip keeps floats bit-exact)
+def iter_clean_chunks(path, chunksize: int) -> Iterator[pd.DataFrame]:
+    dtype = {"Financial_Risk_Level": RAW_SCHEMA["Financial_Risk_Level"]}
+    with pd.read_csv(path, dtype=dtype, chunksize=chunksize, float_precision="round_trip") as reader:
+        for chunk in reader:
+            yield chunk
+
 # saves the cleaned-up Pandas dataframe to a csv file in a chosen filepath
-def save_clean_data(df, path, index=False):
+@traced
+def save_clean_data(df, path, index=False, append=False):
     path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=index)
+    df.to_csv(path, index=index, mode="a" if append else "w", header=not append)
+
+# ---------------------------------------------------------------------------
+# Binary columnar storage. A dataset is a directory with a manifest.json and either one
+# uncompressed Feather file (when pyarrow is installed) or one .npy file per column.
+# Both load memory-mapped, and only the requested columns are opened.
+# ---------------------------------------------------------------------------
+
+MANIFEST_NAME = "manifest.json"
+COLUMNAR_FORMAT_VERSION = 1
+
+def _have_pyarrow() -> bool:
+    try:
+        import pyarrow.feather  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _read_manifest(path: Path) -> dict:
+    return json.loads((Path(path) / MANIFEST_NAME).read_text(encoding="utf-8"))
+
+def _codes_dtype(n_categories: int):
+    return np.int8 if n_categories < 127 else np.int16 if n_categories < 32767 else np.int32
+
+class ColumnarWriter:
+    """
+    Writes a frame of n_rows rows chunk by chunk into per-column .npy files (preallocated, so
+    nothing is held in memory). Categoricals are stored as integer codes, strings as codes into a
+    vocabulary that grows as chunks arrive. Call close() to write the manifest.
+    """
+    def __init__(self, path, n_rows: int):
+        self.path = Path(path)
+        self.n_rows = n_rows
+        self.offset = 0
+        self.columns: List[dict] = []
+        self._arrays: List[np.ndarray] = []
+        self._vocab: List[Optional[Dict[str, int]]] = []
+
+    def _open(self, df: pd.DataFrame) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        for old in self.path.glob("*.npy"):
+            old.unlink()
+        for i, (name, s) in enumerate(df.items()):
+            meta = {"name": name, "file": f"c{i:04d}.npy"}
+            vocab = None
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                meta.update(kind="category", categories=[str(c) for c in s.cat.categories], ordered=bool(s.cat.ordered))
+                dtype = _codes_dtype(len(s.cat.categories))
+            elif pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+                meta.update(kind="array")
+                dtype = s.dtype.numpy_dtype if hasattr(s.dtype, "numpy_dtype") else s.dtype
+            else:
+                meta.update(kind="string")
+                dtype, vocab = np.int32, {}
+            meta["dtype"] = np.dtype(dtype).str
+            self.columns.append(meta)
+            self._vocab.append(vocab)
+            self._arrays.append(np.lib.format.open_memmap(self.path / meta["file"], mode="w+", dtype=dtype, shape=(self.n_rows,)))
+
+    def write(self, df: pd.DataFrame) -> None:
+        if not self.columns:
+            self._open(df)
+        if list(df.columns) != [c["name"] for c in self.columns]:
+            raise ValueError("chunk columns differ from the first chunk")
+        stop = self.offset + len(df)
+        if stop > self.n_rows:
+            raise ValueError(f"more than n_rows={self.n_rows} rows written")
+        for meta, arr, vocab, (_, s) in zip(self.columns, self._arrays, self._vocab, df.items()):
+            if meta["kind"] == "category":
+                arr[self.offset:stop] = s.cat.codes.to_numpy()
+            elif meta["kind"] == "string":
+                codes, uniques = pd.factorize(s)
+                lookup = np.array([vocab.setdefault(str(u), len(vocab)) for u in uniques] + [-1], dtype=np.int32)
+                arr[self.offset:stop] = lookup[codes]  # code -1 (missing) maps to the trailing -1
+            else:
+                arr[self.offset:stop] = s.to_numpy()
+        self.offset = stop
+
+    def close(self) -> Path:
+        for arr in self._arrays:
+            arr.flush()
+        for meta, vocab in zip(self.columns, self._vocab):
+            if vocab is not None:
+                meta["categories"] = list(vocab)
+        manifest = {"version": COLUMNAR_FORMAT_VERSION, "backend": "npy", "n_rows": self.offset, "columns": self.columns}
+        (self.path / MANIFEST_NAME).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+        self._arrays = []
+        return self.path
+
+# saves a dataframe in the binary columnar format ("auto" = Feather if pyarrow is installed, else .npy files)
+@traced
+def save_columnar(df: pd.DataFrame, path, backend: str = "auto") -> Path:
+    path = Path(path)
+    if backend == "auto":
+        backend = "feather" if _have_pyarrow() else "npy"
+    if backend == "npy":
+        writer = ColumnarWriter(path, len(df))
+        writer.write(df)
+        return writer.close()
+    if backend != "feather":
+        raise ValueError(f"unknown columnar backend {backend!r}")
+
+    from pyarrow import feather
+    path.mkdir(parents=True, exist_ok=True)
+    # uncompressed, so the file can be memory-mapped on load
+    feather.write_feather(df.reset_index(drop=True), path / "data.feather", compression="uncompressed")
+    manifest = {"version": COLUMNAR_FORMAT_VERSION, "backend": "feather", "n_rows": len(df),
+                "columns": [{"name": c} for c in df.columns]}
+    (path / MANIFEST_NAME).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    return path
+
+def columnar_columns(path) -> List[str]:
+    return [c["name"] for c in _read_manifest(path)["columns"]]
+
+def _load_npy_column(path: Path, meta: dict, rows: slice) -> object:
+    # copy-on-write map: pages are read lazily and writes stay private to this process
+    arr = np.load(path / meta["file"], mmap_mode="c")[rows]
+    if meta["kind"] == "category":
+        dtype = pd.CategoricalDtype(meta["categories"], ordered=meta["ordered"])
+        return pd.Categorical.from_codes(arr, dtype=dtype)
+    if meta["kind"] == "string":
+        categories = np.array(meta["categories"] + [np.nan], dtype=object)
+        return categories[arr]  # code -1 picks the trailing NaN
+    return arr
+
+# loads a columnar dataset memory-mapped; columns= opens only those columns
+def load_columnar(path, columns: Optional[List[str]] = None, rows: slice = slice(None)) -> pd.DataFrame:
+    path = Path(path)
+    manifest = _read_manifest(path)
+    metas = {c["name"]: c for c in manifest["columns"]}
+    columns = list(columns) if columns is not None else list(metas)
+    missing = [c for c in columns if c not in metas]
+    if missing:
+        raise KeyError(f"columns not in {path}: {missing}")
+
+    if manifest["backend"] == "feather":
+        from pyarrow import feather
+        table = feather.read_table(path / "data.feather", columns=columns, memory_map=True)
+        return table.slice(rows.start or 0, None if rows.stop is None else (rows.stop - (rows.start or 0))).to_pandas()
+    # copy=False keeps the numeric columns as views on the memory maps
+    return pd.DataFrame({c: _load_npy_column(path, metas[c], rows) for c in columns}, copy=False)
+
+# streams a columnar dataset back in chunks of rows
+def iter_columnar_chunks(path, chunksize: int, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    n_rows = _read_manifest(path)["n_rows"]
+    for start in range(0, n_rows, chunksize):
+        chunk = load_columnar(path, columns, rows=slice(start, start + chunksize))
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        yield chunk
 
 def ensure_dirs(*dirs: Path) -> None:
     for d in dirs:
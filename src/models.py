@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Tuple, Dict
+from typing import Callable, Iterable, List, Tuple, Dict
 
 import numpy as np
 import pandas as pd
@@ -8,8 +8,9 @@ import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import Ridge
-from sklearn.model_selection import train_test_split, KFold, cross_val_score
-from sklearn.metrics import mean_squared_error, r2_score, make_scorer
+from sklearn.model_selection import train_test_split, KFold
+from sklearn.metrics import mean_squared_error, r2_score
+from src.instrument import traced
 
 @dataclass
 class ModelResult:
@@ -19,33 +20,90 @@ class ModelResult:
     test_rmse: float
     test_r2: float
 
-def _rmse_scorer():
-    return make_scorer(lambda yt, yp: np.sqrt(mean_squared_error(yt, yp)), greater_is_better=False)
-
-def _to_int_bools(X: pd.DataFrame) -> pd.DataFrame:
+def _design_matrix(X: pd.DataFrame) -> pd.DataFrame:
+    """
+    Model input: bools as ints, float32 upcast, and categoricals (compact mode) expanded to drop-first
+    int dummies named and placed like get_dummies (after the other columns), so both encodings fit the same matrix.
+    """
     out = X.copy()
     bool_cols = out.select_dtypes(include=["bool"]).columns
     out[bool_cols] = out[bool_cols].astype(int)
+    f32_cols = out.select_dtypes(include=["float32"]).columns
+    out[f32_cols] = out[f32_cols].astype(np.float64)
+
+    cat_cols = [c for c in out.columns if isinstance(out[c].dtype, pd.CategoricalDtype)]
+    if cat_cols:
+        dummies = {}
+        for c in cat_cols:
+            codes = out[c].cat.codes.to_numpy()
+            for k, level in enumerate(out[c].cat.categories[1:], start=1):
+                dummies[f"{c}_{level}"] = (codes == k).astype(int)
+        out = pd.concat([out.drop(columns=cat_cols), pd.DataFrame(dummies, index=out.index)], axis=1)
     return out
 
-def tune_ridge_alpha(X: pd.DataFrame, y: pd.Series, random_state: int, cv_splits: int = 5) -> float:
+DEFAULT_ALPHAS = np.logspace(-3, 3, 20)
+TUNING_MODES = ("kfold", "gcv")
+
+def _standardize(X_train: np.ndarray, X_other: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # same statistics as StandardScaler (ddof=0, near-constant columns left unscaled)
+    mean = X_train.mean(axis=0)
+    scale = X_train.std(axis=0)
+    scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+    return (X_train - mean) / scale, (X_other - mean) / scale
+
+def ridge_path_predictions(X_train: np.ndarray, y_train: np.ndarray, X_val: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """
+    Predictions on X_val of StandardScaler + Ridge(alpha) for every alpha, from one SVD of the
+    standardized, centered training matrix: coef(alpha) = V diag(s / (s^2 + alpha)) U^T y.
+    Returns an (n_val, n_alphas) array.
+    """
+    Xs, Xv = _standardize(X_train, X_val)
+    x_mean, y_mean = Xs.mean(axis=0), y_train.mean()
+    U, s, Vt = np.linalg.svd(Xs - x_mean, full_matrices=False)
+    Uty = U.T @ (y_train - y_mean)
+    shrink = s[:, None] / (s[:, None] ** 2 + alphas[None, :])  # (k, n_alphas)
+    return ((Xv - x_mean) @ Vt.T) @ (shrink * Uty[:, None]) + y_mean
+
+def gcv_errors(X: np.ndarray, y: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """
+    Generalized cross-validation RMSE for every alpha (one SVD of the full standardized matrix).
+    """
+    Xs, _ = _standardize(X, X[:0])
+    Xc, yc = Xs - Xs.mean(axis=0), y - y.mean()
+    n = len(y)
+    U, s, _ = np.linalg.svd(Xc, full_matrices=False)
+    Uty = U.T @ yc
+    hat = s[:, None] ** 2 / (s[:, None] ** 2 + alphas[None, :])  # eigenvalues of the hat matrix
+    # residual = yc - U diag(hat) U^T yc, split into the part in span(U) and the rest
+    rss = ((1 - hat) ** 2 * Uty[:, None] ** 2).sum(axis=0) + (yc @ yc - Uty @ Uty)
+    dof = hat.sum(axis=0) + 1  # +1 for the intercept
+    return np.sqrt(rss / n) / (1 - dof / n)
+
+def tune_ridge_alpha(X: pd.DataFrame, y: pd.Series, random_state: int, cv_splits: int = 5, alphas=None, mode: str = "kfold") -> float:
     """
-    Simple grid tuning like your notebook.
+    Grid tuning like your notebook (mean KFold RMSE of StandardScaler + Ridge), but every alpha is
+    evaluated in closed form from one SVD per training fold, so dense grids cost little extra.
+    mode="gcv" uses generalized cross-validation on the full data instead of KFold.
     """
-    pipe = Pipeline([("scaler", StandardScaler()), ("model", Ridge())])
-    alphas = np.logspace(-3, 3, 20)
-    cv = KFold(n_splits=cv_splits, shuffle=True, random_state=random_state)
+    if mode not in TUNING_MODES:
+        raise ValueError(f"mode must be one of {TUNING_MODES}, got {mode!r}")
+    alphas = np.asarray(DEFAULT_ALPHAS if alphas is None else alphas, dtype=float)
+    X_arr = np.asarray(X, dtype=np.float64)
+    y_arr = np.asarray(y, dtype=np.float64)
 
-    best_alpha, best_score = None, -np.inf
-    for a in alphas:
-        pipe.set_params(model__alpha=a)
-        scores = cross_val_score(pipe, X, y, cv=cv, scoring=_rmse_scorer())
-        mean_score = scores.mean()  # negative RMSE; higher is better
-        if mean_score > best_score:
-            best_score, best_alpha = mean_score, a
-    return float(best_alpha)
+    if mode == "gcv":
+        errors = gcv_errors(X_arr, y_arr, alphas)
+    else:
+        cv = KFold(n_splits=cv_splits, shuffle=True, random_state=random_state)
+        fold_rmse = []
+        for train_idx, val_idx in cv.split(X_arr):
+            pred = ridge_path_predictions(X_arr[train_idx], y_arr[train_idx], X_arr[val_idx], alphas)
+            fold_rmse.append(np.sqrt(((pred - y_arr[val_idx, None]) ** 2).mean(axis=0)))
+        errors = np.mean(fold_rmse, axis=0)
+    return float(alphas[int(np.argmin(errors))])  # first alpha on ties, as the old loop
 
-def train_ridge_regression(df: pd.DataFrame, target: str, feature_exclude: List[str], random_state: int, cv_splits: int = 5) -> ModelResult:
+@traced
+def train_ridge_regression(df: pd.DataFrame, target: str, feature_exclude: List[str], random_state: int, cv_splits: int = 5, alphas=None, tuning_mode: str = "kfold") -> ModelResult:
     """
     Generic Ridge training with:
       - exclusion list (avoid leakage: Profit_Margin when predicting Net_Profit etc.)
@@ -54,10 +112,11 @@ def train_ridge_regression(df: pd.DataFrame, target: str, feature_exclude: List[
     """
     y = df[target]
     X = df.drop(columns=[c for c in feature_exclude if c in df.columns])
+    features = list(X.columns)  # categoricals stay one feature each; the model sees their dummies
 
-    X = _to_int_bools(X)
+    X = _design_matrix(X)
 
-    best_alpha = tune_ridge_alpha(X, y, random_state=random_state, cv_splits=cv_splits)
+    best_alpha = tune_ridge_alpha(X, y, random_state=random_state, cv_splits=cv_splits, alphas=alphas, mode=tuning_mode)
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=random_state)
 
@@ -68,11 +127,141 @@ def train_ridge_regression(df: pd.DataFrame, target: str, feature_exclude: List[
     rmse = float(np.sqrt(mean_squared_error(y_test, pred)))
     r2 = float(r2_score(y_test, pred))
 
-    return ModelResult(model=model, features=list(X.columns), best_alpha=best_alpha, test_rmse=rmse, test_r2=r2)
+    return ModelResult(model=model, features=features, best_alpha=best_alpha, test_rmse=rmse, test_r2=r2)
+
+def _split_groups(rng: np.random.Generator, n: int, cv_splits: int, test_size: float) -> np.ndarray:
+    # group cv_splits = test rows, 0..cv_splits-1 = CV folds of the training rows; one uniform draw per
+    # row, so a fresh rng with the same seed gives the same split for any chunking
+    u = rng.random(n)
+    fold = np.minimum(((u - test_size) / (1 - test_size) * cv_splits).astype(np.int64), cv_splits - 1)
+    return np.where(u < test_size, cv_splits, fold)
+
+@dataclass
+class NormalEquations:
+    """
+    Least-squares sufficient statistics per row group (CV folds + test split): counts, sums, X^T X,
+    X^T y and y^T y. Accumulated around a fixed shift (the first chunk's means) to limit cancellation.
+    Size is groups x p x p, whatever the number of rows.
+    """
+    shift_x: np.ndarray
+    shift_y: float
+    n: np.ndarray   # (g,)
+    sx: np.ndarray  # (g, p)
+    sy: np.ndarray  # (g,)
+    xx: np.ndarray  # (g, p, p)
+    xy: np.ndarray  # (g, p)
+    yy: np.ndarray  # (g,)
+
+    @classmethod
+    def empty(cls, n_groups: int, shift_x: np.ndarray, shift_y: float) -> "NormalEquations":
+        p = len(shift_x)
+        return cls(shift_x, shift_y, np.zeros(n_groups), np.zeros((n_groups, p)), np.zeros(n_groups),
+                   np.zeros((n_groups, p, p)), np.zeros((n_groups, p)), np.zeros(n_groups))
+
+    def update(self, X: np.ndarray, y: np.ndarray, groups: np.ndarray) -> None:
+        X, y = X - self.shift_x, y - self.shift_y
+        for g in np.unique(groups):
+            Xg, yg = X[groups == g], y[groups == g]
+            self.n[g] += len(yg)
+            self.sx[g] += Xg.sum(axis=0)
+            self.sy[g] += yg.sum()
+            self.xx[g] += Xg.T @ Xg
+            self.xy[g] += Xg.T @ yg
+            self.yy[g] += yg @ yg
+
+    def pooled(self, groups) -> Tuple[np.ndarray, ...]:
+        idx = list(groups)
+        return tuple(a[idx].sum(axis=0) for a in (self.n, self.sx, self.sy, self.xx, self.xy, self.yy))
+
+def _ridge_from_moments(n, sx, sy, xx, xy, alphas: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    StandardScaler + Ridge(alpha) for every alpha from pooled (shifted) moments: the standardized,
+    centered Gram matrix is eigendecomposed once, coef(alpha) = Q diag(1 / (lam + alpha)) Q^T Z^T y.
+    Returns mean, scale, standardized coefs (p, n_alphas) and raw-unit (w, b) with pred = x @ w + b.
+    """
+    mean, y_mean = sx / n, sy / n
+    scatter = xx - n * np.outer(mean, mean)
+    scale = np.sqrt(np.maximum(np.diag(scatter), 0) / n)
+    scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+    lam, Q = np.linalg.eigh(scatter / np.outer(scale, scale))
+    Qty = Q.T @ ((xy - n * mean * y_mean) / scale)
+    coef = Q @ (Qty[:, None] / (np.maximum(lam, 0)[:, None] + alphas[None, :]))
+    w = coef / scale[:, None]
+    return mean, scale, coef, (w, y_mean - mean @ w)
+
+def _sse(n, sx, sy, xx, xy, yy, w: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # sum of (y - x @ w - b)^2 over a group, from its moments, for every column of w
+    return (yy - 2 * b * sy - 2 * xy @ w + n * b ** 2 + 2 * b * (sx @ w)
+            + np.einsum("pa,pq,qa->a", w, xx, w))
+
+def _chunk_design(chunk: pd.DataFrame, target: str, feature_exclude: List[str], columns: List[str] = None):
+    X = _design_matrix(chunk.drop(columns=[c for c in feature_exclude if c in chunk.columns]))
+    if columns is not None:
+        X = X.reindex(columns=columns, fill_value=0)
+    return X, np.asarray(X, dtype=np.float64), chunk[target].to_numpy(dtype=np.float64)
+
+@traced
+def train_ridge_streaming(chunks: Callable[[], Iterable[pd.DataFrame]], target: str, feature_exclude: List[str], random_state: int, cv_splits: int = 5, alphas=None, test_size: float = 0.2) -> ModelResult:
+    """
+    train_ridge_regression out of core: chunks() yields the data chunk by chunk (called twice). The first
+    pass accumulates NormalEquations per KFold fold and the test split; alphas are tuned on the mean fold
+    RMSE and the final model is solved from the pooled training folds. The second pass scores the test
+    split. Memory grows with the number of features, not rows. The split is a seeded per-row draw, so the
+    test rows differ from train_test_split's.
+    """
+    alphas = np.asarray(DEFAULT_ALPHAS if alphas is None else alphas, dtype=float)
+    rng = np.random.default_rng(random_state)
+    eq, features, columns = None, None, None
+    for chunk in chunks():
+        X_df, X, y = _chunk_design(chunk, target, feature_exclude, columns)
+        if eq is None:
+            features = [c for c in chunk.columns if c not in feature_exclude]
+            columns = list(X_df.columns)
+            eq = NormalEquations.empty(cv_splits + 1, X.mean(axis=0), float(y.mean()))
+        eq.update(X, y, _split_groups(rng, len(y), cv_splits, test_size))
+    if eq is None:
+        raise ValueError("no chunks to train on")
+
+    folds = range(cv_splits)
+    fold_rmse = []
+    for k in folds:
+        n, sx, sy, xx, xy, _ = eq.pooled(f for f in folds if f != k)
+        _, _, _, (w, b) = _ridge_from_moments(n, sx, sy, xx, xy, alphas)
+        val = eq.pooled([k])
+        fold_rmse.append(np.sqrt(np.maximum(_sse(*val, w, b), 0) / val[0]))
+    best = int(np.argmin(np.mean(fold_rmse, axis=0)))  # first alpha on ties
+    best_alpha = float(alphas[best])
+
+    n, sx, sy, xx, xy, _ = eq.pooled(folds)
+    mean, scale, coef, (w, b) = _ridge_from_moments(n, sx, sy, xx, xy, alphas[best:best + 1])
+    scaler = StandardScaler()
+    scaler.mean_, scaler.scale_, scaler.var_ = mean + eq.shift_x, scale, scale ** 2
+    scaler.n_samples_seen_, scaler.n_features_in_ = int(n), len(columns)
+    scaler.feature_names_in_ = np.asarray(columns, dtype=object)
+    ridge = Ridge(alpha=best_alpha)
+    ridge.coef_, ridge.intercept_ = coef[:, 0], float(sy / n + eq.shift_y)
+    ridge.n_features_in_ = len(columns)
+    model = Pipeline([("scaler", scaler), ("model", ridge)])
+
+    # second pass: test metrics
+    rng = np.random.default_rng(random_state)
+    n_test, sse, sum_y, sum_yy = 0, 0.0, 0.0, 0.0
+    for chunk in chunks():
+        X_df, _, y = _chunk_design(chunk, target, feature_exclude, columns)
+        test = _split_groups(rng, len(y), cv_splits, test_size) == cv_splits
+        resid = y[test] - model.predict(X_df[test])
+        yt = y[test] - eq.shift_y
+        n_test += int(test.sum())
+        sse += float(resid @ resid)
+        sum_y += float(yt.sum())
+        sum_yy += float(yt @ yt)
+    rmse = float(np.sqrt(sse / n_test))
+    r2 = float(1 - sse / (sum_yy - sum_y ** 2 / n_test))
+    return ModelResult(model=model, features=features, best_alpha=best_alpha, test_rmse=rmse, test_r2=r2)
 
-def predict_column(df: pd.DataFrame, model: Pipeline, features: List[str], out_col: str) -> pd.DataFrame:
-    out = df.copy()
-    X = out[features]
-    X = _to_int_bools(X)
+@traced
+def predict_column(df: pd.DataFrame, model: Pipeline, features: List[str], out_col: str, inplace: bool = False) -> pd.DataFrame:
+    out = df if inplace else df.copy()
+    X = _design_matrix(out[features])
     out[out_col] = model.predict(X)
     return out
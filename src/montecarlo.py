@@ -0,0 +1,145 @@
+"""
+Monte Carlo stranding probabilities.
+Each draw samples the emissions-proxy weights, the carbon price, the growth rate and the discount rate.
+An enterprise is stranded in a draw when its discounted carbon cost over the horizon exceeds
+its discounted revenue path (as in src/projection.py). With zero growth
+this is Carbon_Risk_Score_Future > 0, the rule add_stranded_flag uses.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    CARBON_PRICE_SCENARIOS_USD2010, SEVERE_SCENARIO, DEFAULT_YEARS, DEFAULT_GROWTH_RATE, DEFAULT_DISCOUNT_RATE, DEFAULT_RANDOM_STATE
+)
+from src.proxies import proxy_input_series, zscore
+from src.instrument import traced
+
+# rows x draws values evaluated at once per chunk (~64 MB of float64)
+MAX_CHUNK_CELLS = 8_000_000
+
+@dataclass(frozen=True)
+class UncertaintySpec:
+    n_draws: int = 2000
+    weights: Tuple[float, float, float, float] = (0.4, 0.2, 0.3, 0.1)  # scale, input cost, climate, debt
+    weight_concentration: float = 50.0  # Dirichlet concentration around weights; higher = tighter
+    price: float = CARBON_PRICE_SCENARIOS_USD2010[SEVERE_SCENARIO]  # the scenario Is_Stranded uses
+    price_sigma: float = 0.5  # lognormal sigma; the median draw is price
+    growth_mean: float = DEFAULT_GROWTH_RATE
+    growth_sd: float = 0.01
+    discount_mean: float = DEFAULT_DISCOUNT_RATE
+    discount_sd: float = 0.01
+    years: int = DEFAULT_YEARS
+
+@dataclass
+class Draws:
+    weights: np.ndarray   # (n_draws, 4)
+    prices: np.ndarray    # (n_draws,)
+    growth: np.ndarray    # (n_draws,)
+    discount: np.ndarray  # (n_draws,)
+
+def sample_draws(spec: UncertaintySpec, random_state: int = DEFAULT_RANDOM_STATE) -> Draws:
+    rng = np.random.default_rng(random_state)
+    n = spec.n_draws
+    weights = rng.dirichlet(spec.weight_concentration * np.asarray(spec.weights, dtype=float), size=n)
+    prices = spec.price * np.exp(spec.price_sigma * rng.standard_normal(n))
+    growth = spec.growth_mean + spec.growth_sd * rng.standard_normal(n)
+    discount = np.clip(spec.discount_mean + spec.discount_sd * rng.standard_normal(n), -0.99, None)
+    return Draws(weights=weights, prices=prices, growth=growth, discount=discount)
+
+def revenue_cost_ratio(growth: np.ndarray, discount: np.ndarray, years: int) -> np.ndarray:
+    """
+    sum_t (1+g)^(t-1) / (1+r)^t  divided by  sum_t 1 / (1+r)^t, for t = 1..years:
+    the discounted revenue path per unit of discounted (flat) carbon cost.
+    """
+    t = np.arange(1, years + 1)[:, None]
+    disc = (1 + discount[None, :]) ** -t
+    return ((1 + growth[None, :]) ** (t - 1) * disc).sum(axis=0) / disc.sum(axis=0)
+
+def proxy_components(df: pd.DataFrame, scale_col: str = "Expenses") -> np.ndarray:
+    """
+    (n, 4) matrix of the z-scored proxy inputs, so that build_emissions_proxy(weights=w) == Z @ w.
+    """
+    series = proxy_input_series(df)
+    cols = [scale_col, "Input_Cost_Index", "Climate_Stress", "Debt_to_Equity"]
+    return np.column_stack([zscore(series[c]).to_numpy(dtype=np.float64) for c in cols])
+
+def _chunks(n_rows: int, n_draws: int) -> List[slice]:
+    size = max(1, MAX_CHUNK_CELLS // max(1, n_draws))
+    return [slice(start, start + size) for start in range(0, n_rows, size)]
+
+def _proxy_range(Z: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    proxy = Z @ weights.T
+    return proxy.min(axis=0), proxy.max(axis=0)
+
+def _chunk_summary(Z, revenue, weights, prices, shift, ratio, quantiles) -> Tuple[np.ndarray, np.ndarray]:
+    # (rows, draws) risk = discounted carbon cost - discounted revenue, in year-1 units
+    risk = (Z @ weights.T) * prices[None, :] - shift[None, :]
+    risk -= revenue[:, None] * ratio[None, :]
+    return (risk > 0).mean(axis=1), np.quantile(risk, quantiles, axis=1).T
+
+def stranding_probabilities(
+    df: pd.DataFrame,
+    spec: UncertaintySpec = None,
+    random_state: int = DEFAULT_RANDOM_STATE,
+    quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+    revenue_col: str = "Pred_Future_Revenue",
+    scale_col: str = "Expenses",
+    n_workers: int = 1,
+) -> pd.DataFrame:
+    """
+    Per-enterprise P_Stranded and quantile bands (Risk_Q05, ...) of the risk score over all draws.
+    Rows are processed in chunks (two passes: per-draw min-shift, then the summaries), so only a
+    chunk's draws are ever held; n_workers > 1 spreads chunks over a process pool.
+    """
+    spec = spec or UncertaintySpec()
+    draws = sample_draws(spec, random_state)
+    Z = proxy_components(df, scale_col)
+    revenue = df[revenue_col].to_numpy(dtype=np.float64)
+    ratio = revenue_cost_ratio(draws.growth, draws.discount, spec.years)
+    quantiles = np.asarray(quantiles, dtype=float)
+    chunks = _chunks(len(df), spec.n_draws)
+
+    with ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else _InlineExecutor() as pool:
+        # pass 1: min-shift per draw (carbon cost is shifted so its min over enterprises is 0)
+        ranges = list(pool.map(_proxy_range, [Z[c] for c in chunks], [draws.weights] * len(chunks)))
+        lo = np.min([r[0] for r in ranges], axis=0)
+        hi = np.max([r[1] for r in ranges], axis=0)
+        shift = np.where(draws.prices >= 0, lo * draws.prices, hi * draws.prices)
+
+        # pass 2: per-enterprise summaries
+        n = len(chunks)
+        parts = list(pool.map(
+            _chunk_summary, [Z[c] for c in chunks], [revenue[c] for c in chunks],
+            [draws.weights] * n, [draws.prices] * n, [shift] * n, [ratio] * n, [quantiles] * n
+        ))
+
+    prob = np.concatenate([p for p, _ in parts]) if parts else np.empty(0)
+    bands = np.concatenate([b for _, b in parts]) if parts else np.empty((0, len(quantiles)))
+    out = pd.DataFrame({"P_Stranded": prob}, index=df.index)
+    for j, q in enumerate(quantiles):
+        out[f"Risk_Q{round(q * 100):02d}"] = bands[:, j]
+    return out
+
+@traced
+def add_stranding_probability(df: pd.DataFrame, spec: UncertaintySpec = None, random_state: int = DEFAULT_RANDOM_STATE, n_workers: int = 1, inplace: bool = False) -> pd.DataFrame:
+    out = df if inplace else df.copy()
+    res = stranding_probabilities(out, spec=spec, random_state=random_state, n_workers=n_workers)
+    for c in res.columns:
+        out[c] = res[c]
+    return out
+
+class _InlineExecutor:
+    # same map() interface as ProcessPoolExecutor, for the single-worker case
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
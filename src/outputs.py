@@ -1,94 +1,184 @@
 from __future__ import annotations
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 import numpy as np
 import pandas as pd
 
-def project_revenue_paths(df: pd.DataFrame, base_revenue_col: str, years: int, growth_rate: float) -> pd.DataFrame:
-    out = df.copy()
-    out["Revenue_Year_1"] = out[base_revenue_col]
-    for year in range(2, years + 1):
-        out[f"Revenue_Year_{year}"] = out[f"Revenue_Year_{year-1}"] * (1 + growth_rate)
+from src.scenarios import evaluate_scenario_matrix, break_even_prices
+from src.projection import ProjectionCurves, add_discounted_revenue, discount_factors
+from src.instrument import traced
+from src.sketch import sketch_quantiles
+
+CLIMATE_PROFILE_LEVELS = ["Low", "Medium", "High"]
+
+def project_revenue_paths(df: pd.DataFrame, base_revenue_col: str, years: int, growth_rate: float, inplace: bool = False) -> pd.DataFrame:
+    # flat growth from the base year, through the projection engine
+    return add_revenue_path_columns(df, base_revenue_col, ProjectionCurves.build(years, growth_rate, 0.0), inplace=inplace)
+
+@traced
+def add_revenue_path_columns(df: pd.DataFrame, base_revenue_col: str, curves: ProjectionCurves, inplace: bool = False) -> pd.DataFrame:
+    """
+    Revenue_Year_1..Revenue_Year_years from the (first) projection curve, as float64 columns.
+    """
+    out = df if inplace else df.copy()
+    paths = curves.paths(out[base_revenue_col], dtype=np.float64)
+    for year in range(1, curves.years + 1):
+        out[f"Revenue_Year_{year}"] = paths[:, year - 1]
     return out
 
 def discounted_revenue_npv(df: pd.DataFrame, years: int, discount_rate: float) -> pd.Series:
     """
     NPV of projected revenue path. Assumes Revenue_Year_1..Revenue_Year_years exist.
     """
-    npv = 0.0
-    for year in range(1, years + 1):
-        npv = npv + df[f"Revenue_Year_{year}"] / ((1 + discount_rate) ** year)
-    return npv
+    paths = df[[f"Revenue_Year_{year}" for year in range(1, years + 1)]].to_numpy(dtype=np.float64)
+    return pd.Series(paths @ discount_factors(discount_rate, years)[0], index=df.index)
 
-def add_environmental_risk_index(df: pd.DataFrame, scenarios: Dict[str, float], emissions_proxy_col: str, out_prefix: str = "Environmental_Risk") -> pd.DataFrame:
+@traced
+def add_environmental_risk_index(df: pd.DataFrame, scenarios: Dict[str, float], emissions_proxy_col: str, out_prefix: str = "Environmental_Risk", inplace: bool = False, proxy_range: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
     """
     Environmental risk index = emissions proxy * carbon price, shifted so min=0.
+    proxy_range = (min, max) of the proxy over the full dataset, when df is only a chunk.
     """
-    out = df.copy()
-    for scenario, price in scenarios.items():
-        col = f"{out_prefix}_{scenario}"
-        out[col] = out[emissions_proxy_col] * price
-        out[col] = out[col] - out[col].min()
+    out = df if inplace else df.copy()
+    risk = evaluate_scenario_matrix(out[emissions_proxy_col], scenarios, kind="cost", proxy_range=proxy_range)
+    for scenario in scenarios:
+        out[f"{out_prefix}_{scenario}"] = risk.column(scenario)
     return out
 
-def add_future_profit_index(df: pd.DataFrame, scenarios: Dict[str, float], future_revenue_col: str, emissions_proxy_col: str, out_prefix: str = "Future_Profit") -> pd.DataFrame:
+@traced
+def add_future_profit_index(df: pd.DataFrame, scenarios: Dict[str, float], future_revenue_col: str, emissions_proxy_col: str, out_prefix: str = "Future_Profit", inplace: bool = False, proxy_range: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
     """
     Future profit index = predicted revenue (scaled) - carbon cost index (scaled).
     Note: This is an INDEX, not a unit-consistent $ profit, consistent with your notebook framing.
     """
-    out = df.copy()
+    out = df if inplace else df.copy()
 
     # carbon cost based on future emissions proxy
-    for scenario, price in scenarios.items():
+    cost = evaluate_scenario_matrix(out[emissions_proxy_col], scenarios, kind="cost", proxy_range=proxy_range)
+    for scenario in scenarios:
         cost_col = f"Carbon_Cost_Future_{scenario}"
-        out[cost_col] = out[emissions_proxy_col] * price
-        out[cost_col] = out[cost_col] - out[cost_col].min()
-
+        out[cost_col] = cost.column(scenario)
         out[f"{out_prefix}_{scenario}"] = out[future_revenue_col] - out[cost_col]
 
     return out
 
-def add_future_carbon_risk_index(df: pd.DataFrame, scenarios: Dict[str, float], future_revenue_col: str, out_prefix: str = "Carbon_Risk_Score_Future") -> pd.DataFrame:
+@traced
+def add_future_carbon_risk_index(df: pd.DataFrame, scenarios: Dict[str, float], future_revenue_col: str, out_prefix: str = "Carbon_Risk_Score_Future", inplace: bool = False) -> pd.DataFrame:
     """
     Carbon risk index = carbon cost future - predicted revenue
     """
-    out = df.copy()
+    out = df if inplace else df.copy()
     for scenario in scenarios:
         cost_col = f"Carbon_Cost_Future_{scenario}"
         out[f"{out_prefix}_{scenario}"] = out[cost_col] - out[future_revenue_col]
     return out
 
-def add_stranded_flag(df: pd.DataFrame, scenario: str, risk_prefix: str = "Carbon_Risk_Score_Future") -> pd.DataFrame:
-    out = df.copy()
+@traced
+def add_stranded_flag(df: pd.DataFrame, scenario: str, risk_prefix: str = "Carbon_Risk_Score_Future", inplace: bool = False) -> pd.DataFrame:
+    out = df if inplace else df.copy()
     col = f"{risk_prefix}_{scenario}"
     out["Is_Stranded"] = out[col] > 0
     return out
 
-def reconstruct_categories(df: pd.DataFrame) -> pd.DataFrame:
+@traced
+def add_break_even_price(df: pd.DataFrame, future_revenue_col: str, emissions_proxy_col: str, out_col: str = "Break_Even_Carbon_Price", inplace: bool = False, proxy_range: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
+    """
+    Carbon price above which the enterprise is stranded (Carbon_Risk_Score_Future > 0), in closed form.
+    """
+    out = df if inplace else df.copy()
+    out[out_col] = break_even_prices(out[emissions_proxy_col], out[future_revenue_col], proxy_range=proxy_range)
+    return out
+
+def _is_categorical(df: pd.DataFrame, col: str) -> bool:
+    return col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype)
+
+@traced
+def reconstruct_categories(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Reconstruct Region and Enterprise_Size from one-hot dummies (as in notebook).
+    In compact mode they already are categoricals (codes + levels): the labels are a lookup, nothing is rebuilt.
     """
-    out = df.copy()
+    out = df if inplace else df.copy()
 
     # Region
-    out["Region"] = "East"
-    if "Region_North" in out.columns: out.loc[out["Region_North"] == 1, "Region"] = "North"
-    if "Region_South" in out.columns: out.loc[out["Region_South"] == 1, "Region"] = "South"
-    if "Region_West"  in out.columns: out.loc[out["Region_West"]  == 1, "Region"] = "West"
+    if not _is_categorical(out, "Region"):
+        out["Region"] = "East"
+        if "Region_North" in out.columns: out.loc[out["Region_North"] == 1, "Region"] = "North"
+        if "Region_South" in out.columns: out.loc[out["Region_South"] == 1, "Region"] = "South"
+        if "Region_West"  in out.columns: out.loc[out["Region_West"]  == 1, "Region"] = "West"
 
     # Enterprise size
-    out["Enterprise_Size"] = "Large"
-    if "Enterprise_Size_Medium" in out.columns: out.loc[out["Enterprise_Size_Medium"] == 1, "Enterprise_Size"] = "Medium"
-    if "Enterprise_Size_Small"  in out.columns: out.loc[out["Enterprise_Size_Small"]  == 1, "Enterprise_Size"] = "Small"
+    if not _is_categorical(out, "Enterprise_Size"):
+        out["Enterprise_Size"] = "Large"
+        if "Enterprise_Size_Medium" in out.columns: out.loc[out["Enterprise_Size_Medium"] == 1, "Enterprise_Size"] = "Medium"
+        if "Enterprise_Size_Small"  in out.columns: out.loc[out["Enterprise_Size_Small"]  == 1, "Enterprise_Size"] = "Small"
 
     return out
 
-def add_climate_profile(df: pd.DataFrame, climate_stress_col: str = "Climate_Stress") -> pd.DataFrame:
-    out = df.copy()
-    q33 = out[climate_stress_col].quantile(0.33)
-    q67 = out[climate_stress_col].quantile(0.67)
+CLIMATE_PROFILE_QUANTILES = (0.33, 0.67)
+
+def climate_profile_thresholds(stress, exact: bool = False) -> Tuple[float, float]:
+    q33, q67 = sketch_quantiles(stress, CLIMATE_PROFILE_QUANTILES, exact=exact)
+    return float(q33), float(q67)
+
+@traced
+def add_climate_profile(df: pd.DataFrame, climate_stress_col: str = "Climate_Stress", inplace: bool = False, thresholds: Optional[Tuple[float, float]] = None, exact_quantiles: bool = False) -> pd.DataFrame:
+    """
+    Low/Medium/High terciles of climate stress. thresholds = (q33, q67) over the full dataset, when df is only a chunk;
+    otherwise they come from a KLL sketch of the column (exact_quantiles: Series.quantile).
+    """
+    out = df if inplace else df.copy()
+    if thresholds is None:
+        thresholds = climate_profile_thresholds(out[climate_stress_col], exact=exact_quantiles)
+    q33, q67 = thresholds
     out["Climate_Profile"] = pd.cut(
         out[climate_stress_col],
         bins=[-np.inf, q33, q67, np.inf],
-        labels=["Low", "Medium", "High"]
+        labels=CLIMATE_PROFILE_LEVELS
     )
     return out
+
+@traced
+def add_pipeline_outputs(
+    df: pd.DataFrame,
+    scenarios: Dict[str, float],
+    years: int,
+    growth_rate: float,
+    discount_rate: float,
+    severe: str,
+    inplace: bool = False,
+    proxy_range: Optional[Tuple[float, float]] = None,
+    climate_thresholds: Optional[Tuple[float, float]] = None,
+    exact_quantiles: bool = False,
+    revenue_paths: bool = True,
+) -> pd.DataFrame:
+    """
+    Steps 6-9 of run_pipeline.py on a frame that already has Pred_Emissions_Proxy.
+    proxy_range / climate_thresholds are the full-dataset stats when df is a chunk or a new batch.
+    revenue_paths=False skips the Revenue_Year_k columns (long horizons: the NPV needs no paths).
+    """
+    out = df if inplace else df.copy()
+    out["Future_Emissions_Proxy"] = out["Pred_Emissions_Proxy"]
+
+    # 6) Environmental risk index (scenario multipliers)
+    out = add_environmental_risk_index(out, scenarios, "Future_Emissions_Proxy", inplace=True, proxy_range=proxy_range)
+
+    # 7) Future revenue (simple cross-sectional approach: model Revenue directly)
+    # For full alignment with your notebook: you can train a revenue Ridge here too.
+    # For skeleton: reuse Pred_Net_Profit as a placeholder or keep your own revenue model file.
+    out["Pred_Future_Revenue"] = out["Revenue"]  # placeholder; replace with trained revenue model
+
+    curves = ProjectionCurves.build(years, growth_rate, discount_rate)
+    if revenue_paths:
+        out = add_revenue_path_columns(out, "Pred_Future_Revenue", curves, inplace=True)
+    out = add_discounted_revenue(out, "Pred_Future_Revenue", curves, inplace=True)
+
+    # 8) Future profit & risk indices (index-based; consistent with proxy)
+    out = add_future_profit_index(out, scenarios, "Pred_Future_Revenue", "Future_Emissions_Proxy", inplace=True, proxy_range=proxy_range)
+    out = add_future_carbon_risk_index(out, scenarios, "Pred_Future_Revenue", inplace=True)
+
+    # 9) Stranding analysis
+    out = add_stranded_flag(out, scenario=severe, inplace=True)
+    out = add_break_even_price(out, "Pred_Future_Revenue", "Future_Emissions_Proxy", inplace=True, proxy_range=proxy_range)
+    out = reconstruct_categories(out, inplace=True)
+    out = add_climate_profile(out, inplace=True, thresholds=climate_thresholds, exact_quantiles=exact_quantiles)
+    return out
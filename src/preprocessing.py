@@ -1,43 +1,125 @@
 from __future__ import annotations
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
 from sklearn.preprocessing import StandardScaler
+from src.instrument import traced
 
 CATEGORICAL_COLS = ["Region", "Enterprise_Size", "Quarter"]
 
-def drop_unneeded_columns(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
+def drop_unneeded_columns(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    out = df if inplace else df.copy()
     if "Enterprise_ID" in out.columns:
-        out = out.drop(columns=["Enterprise_ID"])
+        out.drop(columns=["Enterprise_ID"], inplace=True)
     return out
 
-def one_hot_encode(df: pd.DataFrame, categorical_cols: List[str] = None) -> pd.DataFrame:
-    out = df.copy()
+def category_vocabularies(df: pd.DataFrame, categorical_cols: List[str] = None) -> Dict[str, List[str]]:
+    """
+    Levels of each categorical column, in the order get_dummies uses (sorted; first one is dropped).
+    """
+    categorical_cols = categorical_cols or CATEGORICAL_COLS
+    return {c: sorted(str(v) for v in df[c].dropna().unique()) for c in categorical_cols if c in df.columns}
+
+def apply_vocabularies(df: pd.DataFrame, vocab: Dict[str, List[str]], inplace: bool = False) -> pd.DataFrame:
+    """
+    Casts categorical columns to the recorded levels, so one_hot_encode yields the training dummy
+    columns for any batch (unseen levels become all-zero dummies, i.e. the dropped base level).
+    """
+    out = df if inplace else df.copy()
+    for c, levels in vocab.items():
+        if c in out.columns:
+            out[c] = out[c].astype(str).where(out[c].notna()).astype(pd.CategoricalDtype(levels))
+    return out
+
+def one_hot_encode(df: pd.DataFrame, categorical_cols: List[str] = None, inplace: bool = False) -> pd.DataFrame:
+    out = df if inplace else df.copy()
     categorical_cols = categorical_cols or CATEGORICAL_COLS
     out = pd.get_dummies(out, columns=categorical_cols, drop_first=True)
     return out
 
-def scale_numeric(df: pd.DataFrame, exclude_cols: List[str] = None) -> Tuple[pd.DataFrame, StandardScaler]:
+def encode_categories(df: pd.DataFrame, categorical_cols: List[str] = None, inplace: bool = False) -> pd.DataFrame:
     """
-    Fits StandardScaler on numeric columns and returns scaled dataframe + scaler.
+    Compact alternative to one_hot_encode: each categorical column becomes a pandas categorical
+    (int8 codes + levels, sorted as get_dummies). Columns that already are categoricals (schema chunks,
+    apply_vocabularies) keep their levels. models.train_ridge_regression expands them to the same dummies.
+    """
+    out = df if inplace else df.copy()
+    categorical_cols = categorical_cols or CATEGORICAL_COLS
+    todo = [c for c in categorical_cols if c in out.columns and not isinstance(out[c].dtype, pd.CategoricalDtype)]
+    return apply_vocabularies(out, category_vocabularies(out, todo), inplace=True) if todo else out
+
+def downcast_floats(df: pd.DataFrame, exclude_cols: List[str] = None, inplace: bool = False) -> pd.DataFrame:
+    """
+    float64 numeric columns to float32 (half the memory; models upcast their design matrix again).
     """
-    out = df.copy()
+    out = df if inplace else df.copy()
+    cols = [c for c in numeric_columns(out, exclude_cols) if out[c].dtype == np.float64]
+    out[cols] = out[cols].astype(np.float32)
+    return out
+
+def one_hot_nbytes(df: pd.DataFrame) -> int:
+    """
+    Bytes df would take in the default encoding (drop-first bool dummies, float64 numerics),
+    to report what the compact encoding saves.
+    """
+    total = int(df.memory_usage(index=False, deep=True).sum())
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype) and c in CATEGORICAL_COLS:
+            total += len(df) * (len(df[c].cat.categories) - 1) - int(df[c].memory_usage(index=False, deep=True))
+        elif df[c].dtype == np.float32:
+            total += 4 * len(df)
+    return total
+
+def numeric_columns(df: pd.DataFrame, exclude_cols: List[str] = None) -> List[str]:
     exclude_cols = set(exclude_cols or [])
-    num_cols = [c for c in out.columns if out[c].dtype in ["float64", "int64"] and c not in exclude_cols]
+    return [c for c in df.columns if is_numeric_dtype(df[c]) and not is_bool_dtype(df[c]) and c not in exclude_cols]
 
-    scaler = StandardScaler()
-    out[num_cols] = scaler.fit_transform(out[num_cols])
+def scale_numeric(df: pd.DataFrame, exclude_cols: List[str] = None, inplace: bool = False, scaler: StandardScaler = None) -> Tuple[pd.DataFrame, StandardScaler]:
+    """
+    Fits StandardScaler on numeric columns and returns scaled dataframe + scaler.
+    Pass an already fitted scaler (e.g. from partial_fit over chunks) to only transform.
+    """
+    out = df if inplace else df.copy()
+    # a fitted scaler knows its columns (and their order)
+    num_cols = list(scaler.feature_names_in_) if hasattr(scaler, "feature_names_in_") else numeric_columns(out, exclude_cols)
+
+    if scaler is None:
+        scaler = StandardScaler()
+        out[num_cols] = scaler.fit_transform(out[num_cols])
+    else:
+        out[num_cols] = scaler.transform(out[num_cols])
     return out, scaler
 
-def build_clean_dataset(df_raw: pd.DataFrame) -> pd.DataFrame:
+@traced
+def fit_clean_dataset(df_raw: pd.DataFrame, inplace: bool = False, scaler: StandardScaler = None, compact: bool = False, float32: bool = False) -> Tuple[pd.DataFrame, StandardScaler]:
     """
-    Complete preprocessing: drop ID, add dummies, scale numerics.
+    Complete preprocessing: drop ID, add dummies, scale numerics. Returns the scaler too.
     Keeps Financial_Risk_Level as a column for later analysis.
+    With inplace=True, df_raw is modified and only get_dummies allocates a new frame.
+    A fitted scaler is applied as-is, so chunks of one dataset are scaled alike.
+    compact=True keeps Region / Enterprise_Size / Quarter as categoricals instead of dummies;
+    float32=True downcasts the scaled numerics.
     """
-    out = drop_unneeded_columns(df_raw)
-    out = one_hot_encode(out)
+    out = drop_unneeded_columns(df_raw, inplace=inplace)
+    if compact:
+        # out is already a copy unless inplace=True
+        out = encode_categories(out, inplace=True)
+    else:
+        # the frame below is always new, so the later steps can work on it directly
+        out = one_hot_encode(out, inplace=inplace)
 
     # Keep Financial_Risk_Level unscaled (it's categorical)
     exclude = ["Financial_Risk_Level"]
-    out, _ = scale_numeric(out, exclude_cols=exclude)
+    out, scaler = scale_numeric(out, exclude_cols=exclude, inplace=True, scaler=scaler)
+    if float32:
+        out = downcast_floats(out, exclude_cols=exclude, inplace=True)
+    return out, scaler
+
+@traced
+def build_clean_dataset(df_raw: pd.DataFrame, inplace: bool = False, scaler: StandardScaler = None, compact: bool = False, float32: bool = False) -> pd.DataFrame:
+    """
+    fit_clean_dataset without the scaler.
+    """
+    out, _ = fit_clean_dataset(df_raw, inplace=inplace, scaler=scaler, compact=compact, float32=float32)
     return out
@@ -0,0 +1,155 @@
+"""
+Single-pass data-quality profile of an extract, chunk by chunk, before it enters the pipeline:
+the EDASummary of compute_eda_summary plus a describe(include="all")-style table (no quantiles).
+Feed it chunks read without the schema (iter_raw_chunks(..., schema=False)) for the dtypes
+compute_eda_summary reports; a column's dtype is the common type over the chunks.
+Per chunk: rows are hashed once (vectorized), numeric columns update running moments and ranges,
+the other columns update their value counts. Duplicate rows are counted against a fixed-size Bloom
+filter by default (approximate, memory set by its capacity) or against the sorted set of row
+hashes (duplicates="exact": memory grows with the number of distinct rows).
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.eda import EDASummary
+from src.streaming import RunningMoments, RunningRange
+
+DUPLICATE_MODES = ("bloom", "exact")
+DEFAULT_BLOOM_CAPACITY = 10_000_000  # distinct rows at which the Bloom filter reaches its false-positive rate
+DEFAULT_BLOOM_FP_RATE = 1e-3
+DEFAULT_MAX_TOP_VALUES = 10_000  # value counts kept per non-numeric column
+
+class BloomFilter:
+    """
+    Bit array with k probes per 64-bit hash (double hashing). seen_before flags hashes that were
+    (probably) added earlier, then adds them: never a false negative, false positives at about fp_rate.
+    """
+    def __init__(self, capacity: int = DEFAULT_BLOOM_CAPACITY, fp_rate: float = DEFAULT_BLOOM_FP_RATE):
+        self.n_bits = int(np.ceil(-capacity * np.log(fp_rate) / np.log(2) ** 2))
+        self.n_probes = max(1, int(round(self.n_bits / capacity * np.log(2))))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+
+    def _probes(self, hashes: np.ndarray):
+        step = (hashes >> np.uint64(32)) | np.uint64(1)
+        for i in range(self.n_probes):
+            idx = (hashes + np.uint64(i) * step) % np.uint64(self.n_bits)
+            yield idx >> np.uint64(3), (np.uint8(1) << (idx & np.uint64(7)).astype(np.uint8))
+
+    def seen_before(self, hashes: np.ndarray) -> np.ndarray:
+        # hashes must be distinct (within the call)
+        seen = np.ones(len(hashes), dtype=bool)
+        for byte, bit in self._probes(hashes):
+            seen &= (self.bits[byte] & bit) != 0
+        for byte, bit in self._probes(hashes):
+            np.bitwise_or.at(self.bits, byte, bit)
+        return seen
+
+def _common_dtype(a: str, b: str) -> str:
+    # as inference over the whole file: int64 + float64 -> float64, anything else mixed -> object
+    if a == b:
+        return a
+    try:
+        ta, tb = np.dtype(a), np.dtype(b)
+    except TypeError:  # pandas extension dtypes
+        return "object"
+    return str(np.result_type(ta, tb)) if ta.kind in "biuf" and tb.kind in "biuf" else "object"
+
+class DataProfile:
+    def __init__(self, duplicates: str = "bloom", bloom_capacity: int = DEFAULT_BLOOM_CAPACITY,
+                 bloom_fp_rate: float = DEFAULT_BLOOM_FP_RATE, max_top_values: int = DEFAULT_MAX_TOP_VALUES):
+        if duplicates not in DUPLICATE_MODES:
+            raise ValueError(f"duplicates must be one of {DUPLICATE_MODES}, got {duplicates!r}")
+        self.duplicates = duplicates
+        self.bloom = BloomFilter(bloom_capacity, bloom_fp_rate) if duplicates == "bloom" else None
+        self.seen = np.empty(0, dtype=np.uint64)  # sorted distinct row hashes (exact mode)
+        self.max_top_values = max_top_values
+        self.n_rows = 0
+        self.n_duplicates = 0
+        self.dtypes: Dict[str, str] = {}
+        self.missing: Optional[np.ndarray] = None
+        self.moments: Dict[str, RunningMoments] = {}
+        self.ranges: Dict[str, RunningRange] = {}
+        self.values: Dict[str, pd.Series] = {}
+        self.truncated: Dict[str, bool] = {}
+
+    def update(self, chunk: pd.DataFrame) -> "DataProfile":
+        if self.missing is None:
+            self.dtypes = {c: str(t) for c, t in chunk.dtypes.items()}
+            self.missing = np.zeros(chunk.shape[1], dtype=np.int64)
+            numeric = chunk.select_dtypes(include="number", exclude="bool").columns
+            self.moments = {c: RunningMoments() for c in numeric}
+            self.ranges = {c: RunningRange() for c in numeric}
+            self.values = {c: pd.Series(dtype=np.int64) for c in chunk.columns if c not in self.moments}
+            self.truncated = {c: False for c in self.values}
+        else:
+            self.dtypes = {c: _common_dtype(t, str(chunk[c].dtype)) for c, t in self.dtypes.items()}
+        self.n_rows += len(chunk)
+        self.missing += chunk.isna().to_numpy().sum(axis=0)
+        self._count_duplicates(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+        for c, m in self.moments.items():
+            x = chunk[c].to_numpy(dtype=np.float64, na_value=np.nan)
+            x = x[~np.isnan(x)]
+            m.update(x)
+            self.ranges[c].update(x)
+        for c in self.values:
+            counts = self.values[c].add(chunk[c].value_counts(sort=False), fill_value=0)
+            if len(counts) > self.max_top_values:
+                # keep the most frequent values: top / freq stay right unless the top value was pruned early
+                counts = counts.nlargest(self.max_top_values)
+                self.truncated[c] = True
+            self.values[c] = counts[counts > 0]
+        return self
+
+    def _count_duplicates(self, hashes: np.ndarray) -> None:
+        # repeats within the chunk are exact; first occurrences are checked against earlier chunks
+        first = np.unique(hashes)
+        self.n_duplicates += len(hashes) - len(first)
+        if self.bloom is not None:
+            self.n_duplicates += int(self.bloom.seen_before(first).sum())
+            return
+        pos = np.searchsorted(self.seen, first)
+        hit = self.seen[np.minimum(pos, len(self.seen) - 1)] == first if len(self.seen) else np.zeros(len(first), dtype=bool)
+        self.n_duplicates += int(hit.sum())
+        self.seen = np.insert(self.seen, pos[~hit], first[~hit])
+
+    def summary(self) -> EDASummary:
+        """
+        As compute_eda_summary; n_duplicates is approximate (an upper bound) in Bloom mode.
+        """
+        return EDASummary(
+            n_rows=self.n_rows,
+            n_cols=len(self.dtypes),
+            dtypes=self.dtypes,
+            missing_by_col={c: int(v) for c, v in zip(self.dtypes, self.missing)} if self.missing is not None else {},
+            n_duplicates=self.n_duplicates,
+        )
+
+    def describe(self) -> pd.DataFrame:
+        """
+        describe(include="all") without quantiles: count / unique / top / freq for the non-numeric
+        columns (unique is NaN once the value counts were truncated), count / mean / std / min / max
+        for the numeric ones.
+        """
+        table = {}
+        for c in self.dtypes:
+            if c in self.moments:
+                m, r = self.moments[c], self.ranges[c]
+                table[c] = {"count": m.count, "mean": m.mean if m.count else np.nan, "std": m.std(),
+                            "min": r.lo if m.count else np.nan, "max": r.hi if m.count else np.nan}
+            else:
+                counts = self.values[c]
+                top = counts.index[int(np.argmax(counts.to_numpy()))] if len(counts) else np.nan
+                table[c] = {"count": self.n_rows - int(self.missing[list(self.dtypes).index(c)]),
+                            "unique": np.nan if self.truncated[c] else len(counts),
+                            "top": top, "freq": int(counts.max()) if len(counts) else np.nan}
+        rows = ["count", "unique", "top", "freq", "mean", "std", "min", "max"]
+        return pd.DataFrame(table).reindex([r for r in rows if any(r in v for v in table.values())])
+
+def profile_chunks(chunks: Iterable[pd.DataFrame], **kwargs) -> DataProfile:
+    profile = DataProfile(**kwargs)
+    for chunk in chunks:
+        profile.update(chunk)
+    return profile
@@ -0,0 +1,104 @@
+"""
+Revenue projection engine for long horizons.
+Revenue in year t is base * G_t with G_t = prod_{s=2..t} (1 + g_s), discounted by D_t = prod_{s=1..t} 1 / (1 + r_s).
+The NPV is then base * sum_t G_t D_t: one precomputed factor per scenario, so the NPV of every
+enterprise under every scenario is a single (n,) x (S,) product, whatever the horizon.
+Per-year paths are only built on request, as an (n, years) float32 array.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.instrument import traced
+
+Curve = Union[float, np.ndarray]  # a flat rate, a per-year (years,) curve, or (S, years) for S scenarios
+
+def _per_year(rate: Curve, years: int) -> np.ndarray:
+    r = np.asarray(rate, dtype=np.float64)
+    if r.ndim == 0:
+        return np.full((1, years), float(r))
+    r = np.atleast_2d(r)
+    if r.shape[-1] != years:
+        raise ValueError(f"curve has {r.shape[-1]} years, expected {years}")
+    return r
+
+def growth_factors(growth: Curve, years: int) -> np.ndarray:
+    """
+    (S, years) cumulative growth G_t; year 1 is the base year (G_1 = 1, its growth rate is ignored).
+    """
+    g = _per_year(growth, years)
+    out = np.ones_like(g)
+    out[:, 1:] = np.cumprod(1 + g[:, 1:], axis=1)
+    return out
+
+def discount_factors(discount: Curve, years: int) -> np.ndarray:
+    """
+    (S, years) cumulative discount D_t = 1 / prod_{s<=t} (1 + r_s).
+    """
+    return 1 / np.cumprod(1 + _per_year(discount, years), axis=1)
+
+@dataclass
+class ProjectionCurves:
+    names: List[str]
+    growth: np.ndarray    # (S, years) G_t
+    discount: np.ndarray  # (S, years) D_t
+
+    @property
+    def years(self) -> int:
+        return self.growth.shape[1]
+
+    @property
+    def npv_factors(self) -> np.ndarray:
+        # (S,) sum_t G_t D_t
+        return (self.growth * self.discount).sum(axis=1)
+
+    @classmethod
+    def build(cls, years: int, growth: Curve, discount: Curve, names: Optional[List[str]] = None) -> "ProjectionCurves":
+        G, D = growth_factors(growth, years), discount_factors(discount, years)
+        G, D = np.broadcast_arrays(G, D)
+        if names is None:
+            names = ["base"] if G.shape[0] == 1 else [f"s{i}" for i in range(G.shape[0])]
+        if len(names) != G.shape[0]:
+            raise ValueError(f"{len(names)} names for {G.shape[0]} curves")
+        return cls(list(names), np.ascontiguousarray(G), np.ascontiguousarray(D))
+
+    @classmethod
+    def from_scenarios(cls, years: int, scenarios: Dict[str, Tuple[Curve, Curve]]) -> "ProjectionCurves":
+        """
+        scenarios = {name: (growth, discount)}, each a flat rate or a per-year curve.
+        """
+        G = np.vstack([growth_factors(g, years) for g, _ in scenarios.values()])
+        D = np.vstack([discount_factors(r, years) for _, r in scenarios.values()])
+        return cls(list(scenarios), G, D)
+
+    def npv(self, base) -> np.ndarray:
+        """
+        (n, S) discounted revenue over the horizon for base revenues (n,).
+        """
+        b = np.asarray(base, dtype=np.float64)
+        return np.multiply.outer(b, self.npv_factors)
+
+    def paths(self, base, scenario: Union[int, str] = 0, discounted: bool = False, dtype=np.float32) -> np.ndarray:
+        """
+        (n, years) revenue paths for one scenario, materialized only when asked for.
+        """
+        s = self.names.index(scenario) if isinstance(scenario, str) else scenario
+        factors = self.growth[s] * self.discount[s] if discounted else self.growth[s]
+        return np.multiply.outer(np.asarray(base, dtype=np.float64), factors).astype(dtype, copy=False)
+
+@traced
+def add_discounted_revenue(df: pd.DataFrame, base_revenue_col: str, curves: ProjectionCurves, out_col: str = "Discounted_Future_Revenues", inplace: bool = False) -> pd.DataFrame:
+    """
+    One NPV column per scenario (out_col for a single curve, out_col_<name> otherwise).
+    """
+    out = df if inplace else df.copy()
+    npv = curves.npv(out[base_revenue_col])
+    if len(curves.names) == 1:
+        out[out_col] = npv[:, 0]
+    else:
+        for j, name in enumerate(curves.names):
+            out[f"{out_col}_{name}"] = npv[:, j]
+    return out
@@ -1,10 +1,38 @@
 from __future__ import annotations
-from typing import Dict, Tuple
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 import numpy as np
 import pandas as pd
+from src.instrument import traced
+from src.sketch import sketch_quantiles
 
-def zscore(s: pd.Series) -> pd.Series:
-    return (s - s.mean()) / (s.std(ddof=0) + 1e-9)
+PROXY_INPUT_COLS = ["Input_Cost_Index", "Climate_Stress", "Debt_to_Equity"]
+PROXY_SCALE_COLS = ["Expenses", "Revenue"]
+
+def zscore(s: pd.Series, stats: Optional[Tuple[float, float]] = None) -> pd.Series:
+    """
+    stats = (mean, std with ddof=0) from the full dataset; defaults to the series' own.
+    """
+    mean, std = stats if stats is not None else (s.mean(), s.std(ddof=0))
+    return (s - mean) / (std + 1e-9)
+
+def scale_input(s: pd.Series, use_log_scale: bool = True) -> pd.Series:
+    return np.log1p(s.clip(lower=0)) if use_log_scale else s
+
+def proxy_input_series(df: pd.DataFrame, use_log_scale: bool = True) -> Dict[str, pd.Series]:
+    """
+    Every series the proxy variants z-score, keyed by column name (scale columns after log1p).
+    Used to accumulate the z-score stats chunk by chunk.
+    """
+    series = {c: scale_input(df[c], use_log_scale) for c in PROXY_SCALE_COLS}
+    series.update({c: df[c] for c in PROXY_INPUT_COLS})
+    return series
+
+def fit_proxy_stats(df: pd.DataFrame) -> Dict[str, Tuple[float, float]]:
+    """
+    (mean, std with ddof=0) of every series zscore sees in add_proxy_variants.
+    """
+    return {c: (float(s.mean()), float(s.std(ddof=0))) for c, s in proxy_input_series(df).items()}
 
 def build_emissions_proxy(
     df: pd.DataFrame,
@@ -14,55 +42,160 @@ def build_emissions_proxy(
     debt_col: str = "Debt_to_Equity",
     weights: Tuple[float, float, float, float] = (0.4, 0.2, 0.3, 0.1),
     use_log_scale: bool = True,
+    stats: Optional[Dict[str, Tuple[float, float]]] = None,
 ) -> pd.Series:
+    """
+    stats maps column name -> (mean, std) for the z-scores (see proxy_input_series); missing keys use df's own.
+    """
     w_scale, w_input, w_climate, w_debt = weights
-    scale = df[scale_col].copy()
-    if use_log_scale:
-        scale = np.log1p(scale.clip(lower=0))
+    stats = stats or {}
+    scale = scale_input(df[scale_col].copy(), use_log_scale)
 
     return (
-        w_scale * zscore(scale)
-        + w_input * zscore(df[input_cost_col])
-        + w_climate * zscore(df[climate_stress_col])
-        + w_debt * zscore(df[debt_col])
+        w_scale * zscore(scale, stats.get(scale_col))
+        + w_input * zscore(df[input_cost_col], stats.get(input_cost_col))
+        + w_climate * zscore(df[climate_stress_col], stats.get(climate_stress_col))
+        + w_debt * zscore(df[debt_col], stats.get(debt_col))
     )
 
-def add_proxy_variants(df: pd.DataFrame) -> pd.DataFrame:
+@traced
+def add_proxy_variants(df: pd.DataFrame, inplace: bool = False, stats: Optional[Dict[str, Tuple[float, float]]] = None) -> pd.DataFrame:
     """
     Adds Emissions_Proxy_v1..v4 as in your notebook.
     """
-    out = df.copy()
-    out["Emissions_Proxy_v1"] = build_emissions_proxy(out, scale_col="Expenses", weights=(0.4, 0.2, 0.3, 0.1))
-    out["Emissions_Proxy_v2"] = build_emissions_proxy(out, scale_col="Revenue",  weights=(0.4, 0.2, 0.3, 0.1))
-    out["Emissions_Proxy_v3"] = build_emissions_proxy(out, scale_col="Expenses", weights=(0.25, 0.25, 0.25, 0.25))
-    out["Emissions_Proxy_v4"] = build_emissions_proxy(out, scale_col="Revenue",  weights=(0.25, 0.25, 0.25, 0.25))
+    out = df if inplace else df.copy()
+    out["Emissions_Proxy_v1"] = build_emissions_proxy(out, scale_col="Expenses", weights=(0.4, 0.2, 0.3, 0.1), stats=stats)
+    out["Emissions_Proxy_v2"] = build_emissions_proxy(out, scale_col="Revenue",  weights=(0.4, 0.2, 0.3, 0.1), stats=stats)
+    out["Emissions_Proxy_v3"] = build_emissions_proxy(out, scale_col="Expenses", weights=(0.25, 0.25, 0.25, 0.25), stats=stats)
+    out["Emissions_Proxy_v4"] = build_emissions_proxy(out, scale_col="Revenue",  weights=(0.25, 0.25, 0.25, 0.25), stats=stats)
     return out
 
 def mad(df: pd.DataFrame, a: str, b: str) -> float:
     return float(np.mean(np.abs(df[b] - df[a])))
 
-def top_overlap(df: pd.DataFrame, a: str, b: str, q: float = 0.90) -> float:
-    top_a = df[a] >= df[a].quantile(q)
-    top_b = df[b] >= df[b].quantile(q)
+def top_overlap(df: pd.DataFrame, a: str, b: str, q: float = 0.90, exact: bool = False) -> float:
+    top_a = df[a] >= sketch_quantiles(df[a], [q], exact=exact)[0]
+    top_b = df[b] >= sketch_quantiles(df[b], [q], exact=exact)[0]
     return float((top_a & top_b).sum() / max(1, top_a.sum()))
 
-def compare_proxies(df: pd.DataFrame, q: float = 0.90) -> pd.DataFrame:
-    proxies = ["Emissions_Proxy_v1", "Emissions_Proxy_v2", "Emissions_Proxy_v3", "Emissions_Proxy_v4"]
-    rows = []
-    for i in range(len(proxies)):
-        for j in range(i + 1, len(proxies)):
-            a, b = proxies[i], proxies[j]
-            rows.append({
-                "proxy_a": a,
-                "proxy_b": b,
-                "mad": mad(df, a, b),
-                "top10_overlap": top_overlap(df, a, b, q=q),
-            })
-    return pd.DataFrame(rows)
-
-def choose_baseline_proxy(df: pd.DataFrame, preferred: str = "Emissions_Proxy_v1") -> str:
-    """
-    Simple policy: choose a preferred proxy unless missing.
-    You can later extend to choose based on stability table.
-    """
-    return preferred if preferred in df.columns else "Emissions_Proxy_v1"
+PROXY_VARIANTS = ["Emissions_Proxy_v1", "Emissions_Proxy_v2", "Emissions_Proxy_v3", "Emissions_Proxy_v4"]
+
+# scratch values per block when computing pairwise MAD (rows x K x K, ~64 MB of float64)
+MAD_BLOCK_CELLS = 8_000_000
+
+@dataclass
+class ProxyStability:
+    """
+    Pairwise stability of K proxies: mad[a, b] = mean |b - a|, overlap[a, b] = share of a's top-q rows
+    that are also in b's top-q rows (as top_overlap).
+    """
+    names: List[str]
+    mad: np.ndarray
+    overlap: np.ndarray
+
+    def pairs(self) -> pd.DataFrame:
+        # long table with one row per unordered pair, as compare_proxies has always returned
+        i, j = np.triu_indices(len(self.names), k=1)
+        return pd.DataFrame({
+            "proxy_a": [self.names[k] for k in i],
+            "proxy_b": [self.names[k] for k in j],
+            "mad": self.mad[i, j],
+            "top10_overlap": self.overlap[i, j],
+        })
+
+    def scores(self) -> pd.DataFrame:
+        """
+        Per proxy: mean overlap and mean MAD against every other proxy.
+        """
+        k = len(self.names)
+        off = ~np.eye(k, dtype=bool)
+        return pd.DataFrame({
+            "mean_overlap": (self.overlap * off).sum(axis=1) / max(1, k - 1),
+            "mean_mad": (self.mad * off).sum(axis=1) / max(1, k - 1),
+        }, index=self.names)
+
+class StabilityAccumulator:
+    """
+    proxy_stability over chunks of rows, given each proxy's top-q threshold (e.g. from merged sketches):
+    top-mask co-counts, top counts and absolute-difference sums add up chunk by chunk.
+    """
+    def __init__(self, names: List[str], thresholds):
+        k = len(names)
+        self.names = list(names)
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.n = 0
+        self.both = np.zeros((k, k))
+        self.top = np.zeros(k)
+        self.abs_sum = np.zeros((k, k))
+
+    def update(self, P: np.ndarray) -> "StabilityAccumulator":
+        P = np.asarray(P, dtype=np.float64)
+        top = P >= self.thresholds[None, :]
+        top_f = top.astype(np.float64)
+        self.both += top_f.T @ top_f
+        self.top += top.sum(axis=0)
+        k = P.shape[1]
+        block_rows = max(1, MAD_BLOCK_CELLS // (k * k))
+        for start in range(0, len(P), block_rows):
+            block = P[start:start + block_rows]
+            self.abs_sum += np.abs(block[:, None, :] - block[:, :, None]).sum(axis=0)
+        self.n += len(P)
+        return self
+
+    def result(self) -> ProxyStability:
+        overlap = self.both / np.maximum(1, self.top)[:, None]
+        return ProxyStability(names=self.names, mad=self.abs_sum / max(1, self.n), overlap=overlap)
+
+def proxy_stability(P: np.ndarray, names: List[str], q: float = 0.90, exact: bool = False) -> ProxyStability:
+    """
+    Stability of the N x K proxy matrix P. Each column's q-quantile is computed once (KLL sketch, or
+    exactly); overlaps come from one product of the boolean top-q masks, MADs from blocks of rows.
+    """
+    P = np.asarray(P, dtype=np.float64)
+    thresholds = [sketch_quantiles(P[:, j], [q], exact=exact)[0] for j in range(P.shape[1])]
+    return StabilityAccumulator(names, thresholds).update(P).result()
+
+def generate_proxy_family(
+    df: pd.DataFrame,
+    n_weights: int,
+    scale_cols: Tuple[str, ...] = ("Expenses", "Revenue"),
+    random_state: int = 0,
+    concentration: float = 1.0,
+    stats: Optional[Dict[str, Tuple[float, float]]] = None,
+) -> Tuple[np.ndarray, List[str], List[Tuple[str, Tuple[float, float, float, float]]]]:
+    """
+    N x K matrix of candidate proxies: n_weights Dirichlet(concentration) weight vectors for every
+    scale column, K = n_weights * len(scale_cols). Returns (P, names, [(scale_col, weights), ...]).
+    Column k equals build_emissions_proxy(df, scale_col, weights=weights_k).
+    """
+    stats = stats or {}
+    series = proxy_input_series(df)
+    rng = np.random.default_rng(random_state)
+    W = rng.dirichlet(np.full(4, concentration), size=n_weights)
+    others = np.column_stack([zscore(series[c], stats.get(c)).to_numpy(dtype=np.float64) for c in PROXY_INPUT_COLS])
+
+    blocks, names, specs = [], [], []
+    for scale_col in scale_cols:
+        Z = np.column_stack([zscore(series[scale_col], stats.get(scale_col)).to_numpy(dtype=np.float64), others])
+        blocks.append(Z @ W.T)
+        for k, w in enumerate(W):
+            names.append(f"Emissions_Proxy_{scale_col}_{k:03d}")
+            specs.append((scale_col, tuple(float(x) for x in w)))
+    return np.hstack(blocks), names, specs
+
+@traced
+def compare_proxies(df: pd.DataFrame, q: float = 0.90, proxies: List[str] = None, exact: bool = False) -> pd.DataFrame:
+    proxies = proxies or PROXY_VARIANTS
+    return proxy_stability(df[proxies].to_numpy(), proxies, q=q, exact=exact).pairs()
+
+def choose_baseline_proxy(df: Union[pd.DataFrame, Sequence[str]], preferred: str = "Emissions_Proxy_v1", stability: ProxyStability = None) -> str:
+    """
+    Simple policy: choose a preferred proxy unless missing (from the frame, or a list of its columns).
+    Given a stability result, choose the most stable proxy instead: highest mean top-q overlap with
+    the others, ties broken by the lowest mean MAD.
+    """
+    if stability is not None:
+        scores = stability.scores()
+        return str(scores.sort_values(["mean_overlap", "mean_mad"], ascending=[False, True], kind="stable").index[0])
+    columns = df.columns if isinstance(df, pd.DataFrame) else df
+    return preferred if preferred in columns else "Emissions_Proxy_v1"
@@ -0,0 +1,164 @@
+"""
+Persisted ranking index over the risk score columns of the snapshot (one per scenario).
+Per column: row positions by descending score, the scores in that order, and each row's rank, so
+top-k is a slice (O(k)), a percentile threshold is one lookup (O(1)), "how many rows score above x"
+is a binary search (O(log n)) and the rank of an enterprise is a lookup by row (O(1)) or Enterprise_ID
+(O(log n)). Stored as .npy files that are memory-mapped on load: a query reads only what it touches.
+With top=k only the k highest rows are kept, found with argpartition instead of a full sort.
+"""
+from __future__ import annotations
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.instrument import traced
+
+RISK_PREFIXES = ("Carbon_Risk_Score_Future", "Environmental_Risk")
+MANIFEST_NAME = "manifest.json"
+
+def risk_columns(columns: List[str], prefixes=RISK_PREFIXES) -> List[str]:
+    return [c for c in columns if c.startswith(tuple(f"{p}_" for p in prefixes))]
+
+@dataclass
+class Ranking:
+    column: str
+    n_rows: int           # rows with a score (NaN rows are never ranked)
+    order: np.ndarray     # row positions, highest score first (all rows, or the top slice)
+    values: np.ndarray    # scores in that order (descending)
+    ranks: Optional[np.ndarray] = None  # 1-based rank of every row (full index only; 0 = NaN)
+
+    @property
+    def complete(self) -> bool:
+        return len(self.order) == self.n_rows
+
+    def top(self, k: int) -> pd.DataFrame:
+        if k > len(self.order):
+            raise ValueError(f"the index keeps the top {len(self.order)} rows of {self.column!r}, asked for {k}")
+        return pd.DataFrame({"rank": np.arange(1, k + 1), "row": self.order[:k], "value": self.values[:k]})
+
+    def quantile(self, q: float) -> float:
+        """
+        The q-quantile of the scores, as Series.quantile (linear interpolation).
+        """
+        pos = q * (self.n_rows - 1)
+        lo, frac = int(np.floor(pos)), pos - np.floor(pos)
+        i = self.n_rows - 1 - lo  # ascending position lo = descending position n - 1 - lo
+        hi_i = max(i - 1, 0) if frac > 0 else i
+        if i >= len(self.values):
+            raise ValueError(f"q={q} lies below the top {len(self.values)} rows kept for {self.column!r}")
+        return float(self.values[i] + (self.values[hi_i] - self.values[i]) * frac)
+
+    def count_at_least(self, threshold: float) -> int:
+        """
+        Rows scoring >= threshold (binary search on the descending values).
+        """
+        count = int(np.searchsorted(-self.values, -threshold, side="right"))
+        if count == len(self.values) and not self.complete:
+            raise ValueError(f"{threshold} lies below the top {len(self.values)} rows kept for {self.column!r}")
+        return count
+
+    def rank(self, row: int) -> Optional[int]:
+        """
+        1-based rank of a row position (ties in order of position); None when the row has no score
+        or, for a top-k index, is not in the top slice.
+        """
+        if self.ranks is not None:
+            r = int(self.ranks[row])
+            return r or None
+        hit = np.flatnonzero(self.order == row)
+        return int(hit[0]) + 1 if len(hit) else None
+
+def build_ranking(scores, column: str, top: Optional[int] = None) -> Ranking:
+    """
+    Full index (stable argsort) or, with top=k, the k highest rows (argpartition + sort of k).
+    """
+    x = np.asarray(scores, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(x))
+    n = len(valid)
+    key = -x[valid]
+    if top is not None and top < n:
+        part = np.argpartition(key, top - 1)[:top]
+        # position order first, so ties break by row like the stable full sort
+        part = np.sort(part)
+        idx = part[np.argsort(key[part], kind="stable")]
+        return Ranking(column, n, valid[idx], x[valid[idx]])
+    idx = np.argsort(key, kind="stable")
+    order = valid[idx]
+    ranks = np.zeros(len(x), dtype=np.int64)
+    ranks[order] = np.arange(1, n + 1)
+    return Ranking(column, n, order, x[order], ranks)
+
+@dataclass
+class RankingIndex:
+    rankings: Dict[str, Ranking]
+    ids: Optional[np.ndarray] = None        # Enterprise_ID per row position
+    id_order: Optional[np.ndarray] = None   # argsort of ids, for O(log n) lookups
+
+    def ranking(self, column: str) -> Ranking:
+        if column not in self.rankings:
+            raise KeyError(f"no ranking for {column!r}; indexed: {list(self.rankings)}")
+        return self.rankings[column]
+
+    def row_of(self, enterprise_id: str) -> int:
+        if self.ids is None:
+            raise ValueError("the index was built without Enterprise_IDs")
+        i = int(np.searchsorted(self.ids, enterprise_id, sorter=self.id_order))
+        if i == len(self.ids) or self.ids[self.id_order[i]] != enterprise_id:
+            raise KeyError(f"unknown enterprise {enterprise_id!r}")
+        return int(self.id_order[i])
+
+    def top(self, column: str, k: int) -> pd.DataFrame:
+        out = self.ranking(column).top(k)
+        if self.ids is not None:
+            out.insert(2, "Enterprise_ID", self.ids[out["row"].to_numpy()])
+        return out
+
+    def rank(self, column: str, enterprise: Union[int, str]) -> Optional[int]:
+        row = self.row_of(enterprise) if isinstance(enterprise, str) else int(enterprise)
+        return self.ranking(column).rank(row)
+
+@traced
+def build_ranking_index(df: pd.DataFrame, columns: Optional[List[str]] = None, ids=None, top: Optional[int] = None) -> RankingIndex:
+    columns = columns or risk_columns(list(df.columns))
+    ids = None if ids is None else np.asarray(ids).astype(str)
+    return RankingIndex(
+        {c: build_ranking(df[c], c, top=top) for c in columns},
+        ids=ids, id_order=None if ids is None else np.argsort(ids, kind="stable"),
+    )
+
+def save_ranking_index(index: RankingIndex, path: Path) -> Path:
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    manifest = {"columns": {}, "ids": index.ids is not None}
+    for i, (col, r) in enumerate(index.rankings.items()):
+        stem = f"c{i}"
+        manifest["columns"][col] = {"stem": stem, "n_rows": r.n_rows, "ranks": r.ranks is not None}
+        np.save(path / f"{stem}.order.npy", r.order)
+        np.save(path / f"{stem}.values.npy", r.values)
+        if r.ranks is not None:
+            np.save(path / f"{stem}.ranks.npy", r.ranks)
+    if index.ids is not None:
+        np.save(path / "ids.npy", index.ids)
+        np.save(path / "id_order.npy", index.id_order)
+    (path / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    return path
+
+def load_ranking_index(path: Path) -> RankingIndex:
+    """
+    Memory-maps every array: nothing is read until a query touches it.
+    """
+    path = Path(path)
+    manifest = json.loads((path / MANIFEST_NAME).read_text())
+    load = lambda name: np.load(path / name, mmap_mode="r")
+    rankings = {
+        col: Ranking(col, meta["n_rows"], load(f"{meta['stem']}.order.npy"), load(f"{meta['stem']}.values.npy"),
+                     load(f"{meta['stem']}.ranks.npy") if meta["ranks"] else None)
+        for col, meta in manifest["columns"].items()
+    }
+    if manifest["ids"]:
+        return RankingIndex(rankings, ids=load("ids.npy"), id_order=load("id_order.npy"))
+    return RankingIndex(rankings)
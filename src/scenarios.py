@@ -0,0 +1,140 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from src.config import CARBON_PRICE_SCENARIOS_USD2010
+
+# rows evaluated per broadcast; a chunk costs chunk_size * n_scenarios * 8 bytes of scratch
+DEFAULT_CHUNK_SIZE = 65_536
+
+SCENARIO_KINDS = ("cost", "adjusted_profit", "risk")
+
+@dataclass
+class ScenarioMatrix:
+    """
+    Enterprise x scenario result: values[i, j] is the index for row i under scenario j.
+    """
+    names: List[str]
+    prices: np.ndarray
+    values: np.ndarray
+    index: pd.Index
+
+    def column(self, scenario: str) -> np.ndarray:
+        return self.values[:, self.names.index(scenario)]
+
+    def to_frame(self, prefix: str, scenarios: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        scenarios = list(scenarios) if scenarios is not None else self.names
+        cols = [self.names.index(s) for s in scenarios]
+        return pd.DataFrame(self.values[:, cols], index=self.index, columns=[f"{prefix}_{s}" for s in scenarios])
+
+def price_grid(start: float = 0.0, stop: float = 500.0, num: int = 501, include: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Evenly spaced carbon prices (named by their value) plus the named scenario points, e.g. NGFS.
+    """
+    include = CARBON_PRICE_SCENARIOS_USD2010 if include is None else include
+    grid = {f"{p:g}": float(p) for p in np.linspace(start, stop, num)}
+    grid.update(include)
+    return grid
+
+def _min_shift(proxy: np.ndarray, prices: np.ndarray, proxy_range: Optional[Tuple[float, float]] = None) -> np.ndarray:
+    # min_i(proxy_i * p) is p * min(proxy) for p >= 0 and p * max(proxy) for p < 0,
+    # so the per-scenario shift never needs the full matrix
+    lo, hi = proxy_range if proxy_range is not None else (np.nanmin(proxy), np.nanmax(proxy))
+    return np.where(prices >= 0, lo * prices, hi * prices)
+
+def evaluate_scenario_matrix(
+    proxy,
+    scenarios: Dict[str, float],
+    profit=None,
+    kind: str = "cost",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dtype=np.float64,
+    proxy_range: Optional[Tuple[float, float]] = None,
+) -> ScenarioMatrix:
+    """
+    Evaluates every scenario for every enterprise in one broadcast per chunk of rows.
+      cost            = proxy * price, shifted so min=0 per scenario
+      adjusted_profit = profit - cost
+      risk            = cost - profit
+    proxy_range = (min, max) of the proxy over the full dataset; pass it when proxy is only a chunk.
+    """
+    if kind not in SCENARIO_KINDS:
+        raise ValueError(f"kind must be one of {SCENARIO_KINDS}, got {kind!r}")
+    if kind != "cost" and profit is None:
+        raise ValueError(f"kind={kind!r} needs a profit column")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+
+    index = proxy.index if isinstance(proxy, pd.Series) else pd.RangeIndex(len(proxy))
+    x = np.asarray(proxy, dtype=np.float64)
+    names = list(scenarios)
+    prices = np.asarray([scenarios[s] for s in names], dtype=np.float64)
+    shift = _min_shift(x, prices, proxy_range)
+    p = None if profit is None else np.asarray(profit, dtype=np.float64)
+
+    values = np.empty((len(x), len(names)), dtype=dtype)
+    for start in range(0, len(x), chunk_size):
+        stop = start + chunk_size
+        block = x[start:stop, None] * prices[None, :] - shift[None, :]
+        if kind == "adjusted_profit":
+            block = p[start:stop, None] - block
+        elif kind == "risk":
+            block -= p[start:stop, None]
+        values[start:stop] = block
+    return ScenarioMatrix(names=names, prices=prices, values=values, index=index)
+
+def break_even_prices(proxy, revenue, proxy_range: Optional[Tuple[float, float]] = None) -> np.ndarray:
+    """
+    Carbon price at which each enterprise's future carbon risk crosses zero. For p >= 0 the min-shifted
+    cost is p * (proxy - min), so risk = p * (proxy - min) - revenue > 0 exactly when p > revenue / (proxy - min).
+    At the minimum proxy the cost is 0 for every price: -inf (always stranded) if revenue < 0, else +inf.
+    """
+    x = np.asarray(proxy, dtype=np.float64)
+    r = np.asarray(revenue, dtype=np.float64)
+    lo = proxy_range[0] if proxy_range is not None else np.nanmin(x)
+    slope = x - lo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price = r / slope
+    flat = slope <= 0
+    price[flat] = np.where(r[flat] < 0, -np.inf, np.inf)
+    return price
+
+@dataclass
+class StrandingCurve:
+    """
+    Stranded share as a function of the carbon price, from the sorted break-even prices:
+    each query is a binary search.
+    """
+    prices: np.ndarray  # sorted break-even prices, NaN dropped
+
+    @classmethod
+    def from_break_even(cls, break_even) -> "StrandingCurve":
+        x = np.asarray(break_even, dtype=np.float64)
+        return cls(np.sort(x[~np.isnan(x)]))
+
+    def stranded_count(self, price) -> np.ndarray:
+        # stranded when price > break-even (risk > 0, as add_stranded_flag)
+        return np.searchsorted(self.prices, np.asarray(price, dtype=np.float64), side="left")
+
+    def share(self, price) -> np.ndarray:
+        return self.stranded_count(price) / max(1, len(self.prices))
+
+    def table(self, prices: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        prices = price_grid() if prices is None else prices
+        p = np.fromiter(prices.values(), dtype=np.float64)
+        return pd.DataFrame({
+            "scenario": list(prices), "price": p,
+            "stranded": self.stranded_count(p), "stranded_share": self.share(p),
+        }).sort_values("price", kind="stable").reset_index(drop=True)
+
+def add_scenario_columns(df: pd.DataFrame, result: ScenarioMatrix, prefix: str, scenarios: Optional[Iterable[str]] = None, inplace: bool = False) -> pd.DataFrame:
+    """
+    Materializes only the requested scenarios as {prefix}_{scenario} columns.
+    """
+    out = df if inplace else df.copy()
+    cols = result.to_frame(prefix, scenarios)
+    for c in cols.columns:
+        out[c] = cols[c]
+    return out
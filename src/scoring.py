@@ -0,0 +1,133 @@
+"""
+Persisted fitted pipeline and batch scoring.
+A PipelineArtifact holds every statistic the pipeline fits (temperature stats, category vocabularies,
+the StandardScaler, the proxy z-score stats, both Ridge models and the output reference stats),
+so new enterprises are scored chunk by chunk without refitting anything.
+"""
+from __future__ import annotations
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import sklearn
+from sklearn.preprocessing import StandardScaler
+
+from src.config import CARBON_PRICE_SCENARIOS_USD2010, SEVERE_SCENARIO, DEFAULT_CHUNKSIZE, PipelineConfig
+from src.io import ColumnarWriter, MANIFEST_NAME, _read_manifest, iter_columnar_chunks, iter_raw_chunks, save_clean_data
+from src.features import add_financial_ratios, add_climate_stress
+from src.preprocessing import apply_vocabularies, build_clean_dataset
+from src.proxies import add_proxy_variants
+from src.models import ModelResult, predict_column
+from src.outputs import add_pipeline_outputs
+
+ARTIFACT_VERSION = 1
+
+@dataclass
+class PipelineArtifact:
+    temp_stats: Tuple[float, float]
+    vocabularies: Dict[str, List[str]]
+    scaler: StandardScaler
+    proxy_stats: Dict[str, Tuple[float, float]]
+    baseline_proxy: str
+    profit_model: ModelResult
+    emissions_model: ModelResult
+    proxy_range: Tuple[float, float]  # of Future_Emissions_Proxy on the training data (carbon cost min-shift)
+    climate_thresholds: Tuple[float, float]  # Climate_Stress q33 / q67 on the training data
+    years: int
+    growth_rate: float
+    discount_rate: float
+    revenue_paths: bool = True  # Revenue_Year_k columns
+    compact: bool = False  # categoricals kept as codes instead of dummies
+    float32: bool = False
+    scenarios: Dict[str, float] = field(default_factory=lambda: dict(CARBON_PRICE_SCENARIOS_USD2010))
+    severe: str = SEVERE_SCENARIO
+    version: int = ARTIFACT_VERSION
+    sklearn_version: str = sklearn.__version__
+    pandas_version: str = pd.__version__
+
+def build_artifact(cfg: PipelineConfig, **fitted) -> PipelineArtifact:
+    return PipelineArtifact(
+        years=cfg.years, growth_rate=cfg.growth_rate, discount_rate=cfg.discount_rate,
+        revenue_paths=cfg.revenue_path_columns, compact=cfg.compact_categories, float32=cfg.float32, scenarios=dict(CARBON_PRICE_SCENARIOS_USD2010), severe=SEVERE_SCENARIO, **fitted
+    )
+
+def save_artifact(artifact: PipelineArtifact, path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+def load_artifact(path: Path) -> PipelineArtifact:
+    with open(path, "rb") as f:
+        artifact = pickle.load(f)
+    if not isinstance(artifact, PipelineArtifact) or artifact.version != ARTIFACT_VERSION:
+        raise ValueError(f"{path} is not a version-{ARTIFACT_VERSION} pipeline artifact; re-run run_pipeline.py")
+    return artifact
+
+def score_frame(df_raw: pd.DataFrame, artifact: PipelineArtifact) -> pd.DataFrame:
+    """
+    Runs a raw-schema batch through every pipeline step with the fitted state: no statistic
+    is recomputed from the batch, so one row scores the same alone or in any batch.
+    Enterprise_ID (when present) is kept as the first column.
+    """
+    ids = df_raw["Enterprise_ID"] if "Enterprise_ID" in df_raw.columns else None
+    out = add_financial_ratios(df_raw)
+    out = add_climate_stress(out, inplace=True, temp_stats=artifact.temp_stats)
+    out = apply_vocabularies(out, artifact.vocabularies, inplace=True)
+    out = build_clean_dataset(out, inplace=True, scaler=artifact.scaler, compact=artifact.compact, float32=artifact.float32)
+    out = add_proxy_variants(out, inplace=True, stats=artifact.proxy_stats)
+
+    for res, col in ((artifact.profit_model, "Pred_Net_Profit"), (artifact.emissions_model, "Pred_Emissions_Proxy")):
+        out = predict_column(out, res.model, res.features, col, inplace=True)
+
+    out = add_pipeline_outputs(
+        out, artifact.scenarios, years=artifact.years, growth_rate=artifact.growth_rate,
+        discount_rate=artifact.discount_rate, severe=artifact.severe, inplace=True,
+        proxy_range=artifact.proxy_range, climate_thresholds=artifact.climate_thresholds,
+        revenue_paths=artifact.revenue_paths,
+    )
+    if ids is not None:
+        out.insert(0, "Enterprise_ID", ids.to_numpy())
+    return out
+
+def _iter_input(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    path = Path(path)
+    if (path / MANIFEST_NAME).exists():
+        return iter_columnar_chunks(path, chunksize)
+    return iter_raw_chunks(path, chunksize, downcast=False)
+
+def _count_rows(path: Path, chunksize: int) -> int:
+    path = Path(path)
+    if (path / MANIFEST_NAME).exists():
+        return _read_manifest(path)["n_rows"]
+    with pd.read_csv(path, usecols=[0], chunksize=chunksize) as reader:
+        return sum(len(c) for c in reader)
+
+def score_file(artifact: PipelineArtifact, input_path: Path, output_path: Path, chunksize: int = DEFAULT_CHUNKSIZE, n_rows: Optional[int] = None) -> int:
+    """
+    Scores a raw CSV or columnar dataset chunk by chunk. The output is a CSV when output_path ends
+    in .csv, else a columnar dataset (which needs the row count up front: given, or one extra pass).
+    Returns the number of rows scored.
+    """
+    output_path = Path(output_path)
+    as_csv = output_path.suffix.lower() == ".csv"
+    writer = None
+    if not as_csv:
+        if n_rows is None:
+            n_rows = _count_rows(input_path, chunksize)
+        writer = ColumnarWriter(output_path, n_rows)
+
+    total = 0
+    for i, chunk in enumerate(_iter_input(input_path, chunksize)):
+        scored = score_frame(chunk, artifact)
+        if as_csv:
+            save_clean_data(scored, output_path, append=i > 0)
+        else:
+            writer.write(scored)
+        total += len(scored)
+    if writer is not None:
+        writer.close()
+    return total
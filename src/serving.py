@@ -0,0 +1,119 @@
+"""
+Small local HTTP scoring server. Concurrent requests are micro-batched: a worker thread collects
+whatever arrives within max_wait_ms (up to max_batch_rows rows) and scores it in one score_frame call.
+
+    POST /score   {"records": [{<raw AgriRiskFin columns>}, ...]}  ->  {"scores": [{...}, ...]}
+    GET  /health
+"""
+from __future__ import annotations
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from src.scoring import PipelineArtifact, score_frame
+
+# columns returned per record (by prefix); the full scored row is mostly intermediate features
+RESPONSE_PREFIXES = (
+    "Enterprise_ID", "Pred_Net_Profit", "Pred_Emissions_Proxy", "Environmental_Risk_",
+    "Future_Profit_", "Carbon_Risk_Score_Future_", "Discounted_Future_Revenues", "Is_Stranded", "Climate_Profile",
+)
+
+def response_columns(columns) -> List[str]:
+    return [c for c in columns if c.startswith(RESPONSE_PREFIXES)]
+
+class _Pending:
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher:
+    def __init__(self, score_fn: Callable[[pd.DataFrame], pd.DataFrame], max_batch_rows: int = 1024, max_wait_ms: float = 10.0):
+        self.score_fn = score_fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame: pd.DataFrame) -> pd.DataFrame:
+        pending = _Pending(frame)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            rows = len(batch[0].frame)
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item.frame)
+            self._score(batch)
+
+    def _score(self, batch: List[_Pending]) -> None:
+        try:
+            scored = self.score_fn(pd.concat([p.frame for p in batch], ignore_index=True))
+            bounds = np.cumsum([0] + [len(p.frame) for p in batch])
+            for p, start, stop in zip(batch, bounds[:-1], bounds[1:]):
+                p.result = scored.iloc[start:stop]
+        except Exception as exc:  # every request in the batch gets the error
+            for p in batch:
+                p.error = exc
+        for p in batch:
+            p.done.set()
+
+def make_server(artifact: PipelineArtifact, host: str = "127.0.0.1", port: int = 8000, max_batch_rows: int = 1024, max_wait_ms: float = 10.0) -> ThreadingHTTPServer:
+    batcher = MicroBatcher(lambda df: score_frame(df, artifact), max_batch_rows=max_batch_rows, max_wait_ms=max_wait_ms)
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "artifact_version": artifact.version})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/score":
+                return self._send(404, {"error": "not found"})
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                records = payload["records"] if isinstance(payload, dict) else payload
+                frame = pd.DataFrame.from_records(records)
+            except (ValueError, KeyError, TypeError) as exc:
+                return self._send(400, {"error": f"bad request: {exc}"})
+            try:
+                scored = batcher.submit(frame)
+            except Exception as exc:
+                return self._send(500, {"error": str(exc)})
+            self._send(200, {"scores": json.loads(scored[response_columns(scored.columns)].to_json(orient="records"))})
+
+        def log_message(self, format, *args):  # keep stdout quiet under load
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
@@ -0,0 +1,155 @@
+"""
+Steps 4-10 of run_pipeline.py as a dependency graph (see src/dag.py).
+Every column is its own artifact, so a stage only waits for the columns it reads: the stability table
+runs next to the Net_Profit model, and the per-scenario indices run side by side.
+Outputs are appended to the cleaned columns in stage order, which is the column order of the sequential run.
+"""
+from __future__ import annotations
+from functools import partial
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from src.config import EXCLUDE_PROFIT, EXCLUDE_OTHER, PipelineConfig
+from src.dag import Stage
+from src.proxies import PROXY_VARIANTS, PROXY_INPUT_COLS, PROXY_SCALE_COLS, add_proxy_variants, compare_proxies, fit_proxy_stats
+from src.models import train_ridge_regression, predict_column
+from src.outputs import (
+    add_environmental_risk_index, add_future_profit_index, add_future_carbon_risk_index,
+    add_stranded_flag, add_break_even_price, reconstruct_categories, add_climate_profile, add_revenue_path_columns
+)
+from src.projection import ProjectionCurves, add_discounted_revenue
+from src.montecarlo import UncertaintySpec, add_stranding_probability
+
+def _frame(data: Dict[str, Any], cols: List[str]) -> pd.DataFrame:
+    return pd.DataFrame({c: data[c] for c in cols})
+
+def _columns(df: pd.DataFrame, cols: List[str]) -> Dict[str, pd.Series]:
+    return {c: df[c] for c in cols}
+
+def _transform(data, transform, inputs, outputs, **kwargs):
+    # any of the add_* transforms, run on just its input columns
+    return _columns(transform(_frame(data, inputs), inplace=True, **kwargs), outputs)
+
+def _proxies(data, inputs):
+    df = _frame(data, inputs)
+    stats = fit_proxy_stats(df)
+    df = add_proxy_variants(df, inplace=True, stats=stats)
+    return {**_columns(df, PROXY_VARIANTS), "proxy_stats": stats}
+
+def _stability(data, q, exact):
+    return {"stability": compare_proxies(_frame(data, PROXY_VARIANTS), q=q, exact=exact)}
+
+def _model(data, inputs, target, exclude, out_col, result, random_state, cv_splits, copy_to=None):
+    df = _frame(data, inputs)
+    res = train_ridge_regression(df, target=target, feature_exclude=exclude, random_state=random_state, cv_splits=cv_splits)
+    pred = predict_column(df, res.model, res.features, out_col, inplace=True)[out_col]
+    out = {result: res, out_col: pred}
+    if copy_to:
+        out[copy_to] = pred.copy()
+    return out
+
+def _revenue(data, years, growth_rate, discount_rate, paths):
+    df = pd.DataFrame({"Pred_Future_Revenue": data["Revenue"]})  # placeholder, as in add_pipeline_outputs
+    curves = ProjectionCurves.build(years, growth_rate, discount_rate)
+    if paths:
+        df = add_revenue_path_columns(df, "Pred_Future_Revenue", curves, inplace=True)
+    df = add_discounted_revenue(df, "Pred_Future_Revenue", curves, inplace=True)
+    return _columns(df, list(df.columns))
+
+PROXY_READS = PROXY_SCALE_COLS + PROXY_INPUT_COLS
+
+def pipeline_stages(
+    clean_cols: List[str],
+    cfg: PipelineConfig,
+    scenarios: Dict[str, float],
+    severe: str,
+    baseline_proxy: str,
+) -> List[Stage]:
+    stages = [
+        # 4) proxies + stability table
+        Stage("proxies", partial(_proxies, inputs=PROXY_READS), PROXY_READS, PROXY_VARIANTS + ["proxy_stats"]),
+        Stage("proxy_stability", partial(_stability, q=cfg.top_risk_q, exact=cfg.exact_quantiles), PROXY_VARIANTS, ["stability"]),
+    ]
+
+    # 5) models; features are every other column, in the sequential run's order
+    profit_in = clean_cols + PROXY_VARIANTS
+    em_in = profit_in + ["Pred_Net_Profit"]
+    stages += [
+        Stage("model_net_profit", partial(
+            _model, inputs=profit_in, target="Net_Profit", exclude=EXCLUDE_PROFIT + EXCLUDE_OTHER,
+            out_col="Pred_Net_Profit", result="profit_res", random_state=cfg.random_state, cv_splits=cfg.cv_splits,
+        ), profit_in, ["profit_res", "Pred_Net_Profit"]),
+        Stage("model_emissions", partial(
+            _model, inputs=em_in, target=baseline_proxy, exclude=[baseline_proxy] + EXCLUDE_OTHER,
+            out_col="Pred_Emissions_Proxy", result="em_res", random_state=cfg.random_state, cv_splits=cfg.cv_splits,
+            copy_to="Future_Emissions_Proxy",
+        ), em_in, ["em_res", "Pred_Emissions_Proxy", "Future_Emissions_Proxy"]),
+    ]
+
+    # 6) environmental risk, one stage per scenario
+    for s, price in scenarios.items():
+        out = [f"Environmental_Risk_{s}"]
+        stages.append(Stage(f"env_risk[{s}]", partial(
+            _transform, transform=add_environmental_risk_index, inputs=["Future_Emissions_Proxy"], outputs=out,
+            scenarios={s: price}, emissions_proxy_col="Future_Emissions_Proxy",
+        ), ["Future_Emissions_Proxy"], out))
+
+    # 7) future revenue
+    path_cols = [f"Revenue_Year_{y}" for y in range(1, cfg.years + 1)] if cfg.revenue_path_columns else []
+    revenue_out = ["Pred_Future_Revenue"] + path_cols + ["Discounted_Future_Revenues"]
+    stages.append(Stage("revenue", partial(
+        _revenue, years=cfg.years, growth_rate=cfg.growth_rate, discount_rate=cfg.discount_rate, paths=cfg.revenue_path_columns,
+    ), ["Revenue"], revenue_out))
+
+    # 8) future profit & risk, per scenario
+    for s, price in scenarios.items():
+        inputs, out = ["Pred_Future_Revenue", "Future_Emissions_Proxy"], [f"Carbon_Cost_Future_{s}", f"Future_Profit_{s}"]
+        stages.append(Stage(f"future_profit[{s}]", partial(
+            _transform, transform=add_future_profit_index, inputs=inputs, outputs=out, scenarios={s: price},
+            future_revenue_col="Pred_Future_Revenue", emissions_proxy_col="Future_Emissions_Proxy",
+        ), inputs, out))
+    for s, price in scenarios.items():
+        inputs, out = [f"Carbon_Cost_Future_{s}", "Pred_Future_Revenue"], [f"Carbon_Risk_Score_Future_{s}"]
+        stages.append(Stage(f"future_risk[{s}]", partial(
+            _transform, transform=add_future_carbon_risk_index, inputs=inputs, outputs=out,
+            scenarios={s: price}, future_revenue_col="Pred_Future_Revenue",
+        ), inputs, out))
+
+    # 9) stranding + categories (compact mode: the cleaned columns already are the categories)
+    dummies = [c for c in clean_cols if c.startswith(("Region_", "Enterprise_Size_"))]
+    stages.append(Stage("stranded", partial(
+        _transform, transform=add_stranded_flag, inputs=[f"Carbon_Risk_Score_Future_{severe}"], outputs=["Is_Stranded"], scenario=severe,
+    ), [f"Carbon_Risk_Score_Future_{severe}"], ["Is_Stranded"]))
+    inputs = ["Pred_Future_Revenue", "Future_Emissions_Proxy"]
+    stages.append(Stage("break_even", partial(
+        _transform, transform=add_break_even_price, inputs=inputs, outputs=["Break_Even_Carbon_Price"],
+        future_revenue_col="Pred_Future_Revenue", emissions_proxy_col="Future_Emissions_Proxy",
+    ), inputs, ["Break_Even_Carbon_Price"]))
+    if "Region" not in clean_cols:
+        stages.append(Stage("categories", partial(
+            _transform, transform=reconstruct_categories, inputs=dummies, outputs=["Region", "Enterprise_Size"],
+        ), dummies, ["Region", "Enterprise_Size"]))
+    stages.append(Stage("climate_profile", partial(
+        _transform, transform=add_climate_profile, inputs=["Climate_Stress"], outputs=["Climate_Profile"],
+        exact_quantiles=cfg.exact_quantiles,
+    ), ["Climate_Stress"], ["Climate_Profile"]))
+
+    # 10) optional Monte Carlo stranding probabilities
+    if cfg.mc_draws > 0:
+        spec = UncertaintySpec(n_draws=cfg.mc_draws, growth_mean=cfg.growth_rate, discount_mean=cfg.discount_rate, years=cfg.years)
+        inputs, out = PROXY_READS + ["Pred_Future_Revenue"], ["P_Stranded", "Risk_Q05", "Risk_Q50", "Risk_Q95"]
+        stages.append(Stage("montecarlo", partial(
+            _transform, transform=add_stranding_probability, inputs=inputs, outputs=out,
+            spec=spec, random_state=cfg.random_state, n_workers=cfg.n_workers,
+        ), inputs, out))
+    return stages
+
+def assemble_frame(df_cleaned: pd.DataFrame, stages: List[Stage], store: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Cleaned columns followed by every column output, in stage order (non-column artifacts are skipped).
+    """
+    cols = {c: df_cleaned[c] for c in df_cleaned.columns}
+    for s in stages:
+        cols.update({o: store[o] for o in s.outputs if isinstance(store[o], pd.Series)})
+    return pd.DataFrame(cols, index=df_cleaned.index)
@@ -0,0 +1,114 @@
+"""
+Chunked passes over the raw and cleaned files, so the pipeline runs in bounded memory.
+Statistics that need the full dataset are accumulated chunk by chunk, then applied in a later pass.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from src.io import iter_raw_chunks
+from src.features import add_financial_ratios, add_climate_stress
+from src.preprocessing import numeric_columns
+from src.proxies import proxy_input_series
+
+@dataclass
+class RunningMoments:
+    """
+    Count / mean / sum of squared deviations, merged chunk by chunk (Chan et al.), so the
+    result matches a single pass over the full column up to rounding.
+    """
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, values) -> "RunningMoments":
+        x = np.asarray(values, dtype=np.float64)
+        x = x[~np.isnan(x)]
+        if len(x):
+            chunk_mean = float(x.mean())
+            self.merge(RunningMoments(len(x), chunk_mean, float(((x - chunk_mean) ** 2).sum())))
+        return self
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        n = self.count + other.count
+        if n == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / n
+        self.count = n
+        return self
+
+    def std(self, ddof: int = 1) -> float:
+        return float(np.sqrt(self.m2 / (self.count - ddof))) if self.count > ddof else float("nan")
+
+    def stats(self, ddof: int = 1) -> Tuple[float, float]:
+        return self.mean, self.std(ddof)
+
+@dataclass
+class RunningRange:
+    lo: float = np.inf
+    hi: float = -np.inf
+
+    def update(self, values) -> "RunningRange":
+        x = np.asarray(values, dtype=np.float64)
+        if len(x):
+            self.lo = min(self.lo, float(np.nanmin(x)))
+            self.hi = max(self.hi, float(np.nanmax(x)))
+        return self
+
+    def bounds(self) -> Tuple[float, float]:
+        return self.lo, self.hi
+
+def temperature_stats(raw_path, chunksize: int) -> Tuple[int, Tuple[float, float]]:
+    """
+    Pass 1 over the raw file: row count and mean/std (ddof=1, as Series.std) of Avg_Temperature
+    for add_climate_stress.
+    """
+    n_rows, moments = 0, RunningMoments()
+    for chunk in iter_raw_chunks(raw_path, chunksize, usecols=["Avg_Temperature"]):
+        n_rows += len(chunk)
+        moments.update(chunk["Avg_Temperature"])
+    return n_rows, moments.stats(ddof=1)
+
+def iter_feature_chunks(raw_path, chunksize: int, temp_stats: Tuple[float, float]) -> Iterator[pd.DataFrame]:
+    """
+    Raw chunks with the raw-space features (step 2 of the pipeline).
+    Categoricals come from the schema, so every chunk later gets the same dummy columns.
+    """
+    for chunk in iter_raw_chunks(raw_path, chunksize):
+        out = add_financial_ratios(chunk, inplace=True)
+        yield add_climate_stress(out, inplace=True, temp_stats=temp_stats)
+
+def fit_scaler(chunks: Iterable[pd.DataFrame], exclude_cols: List[str] = None) -> StandardScaler:
+    """
+    StandardScaler fitted over all chunks with partial_fit.
+    """
+    scaler = StandardScaler()
+    for chunk in chunks:
+        scaler.partial_fit(chunk[numeric_columns(chunk, exclude_cols)])
+    return scaler
+
+def update_proxy_moments(moments: Dict[str, RunningMoments], chunk: pd.DataFrame) -> Dict[str, RunningMoments]:
+    """
+    Accumulates every series the proxy variants z-score (see proxies.proxy_input_series).
+    """
+    for col, s in proxy_input_series(chunk).items():
+        moments.setdefault(col, RunningMoments()).update(s)
+    return moments
+
+def proxy_stats(moments: Dict[str, RunningMoments]) -> Dict[str, Tuple[float, float]]:
+    # (mean, std with ddof=0), as proxies.zscore uses
+    return {col: m.stats(ddof=0) for col, m in moments.items()}
+
+def sample_mask(n_rows: int, fraction: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Bernoulli row mask; keeps every row (and its order) when fraction >= 1.
+    """
+    if fraction >= 1:
+        return np.ones(n_rows, dtype=bool)
+    return rng.random(n_rows) < fraction
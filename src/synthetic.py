@@ -0,0 +1,82 @@
+"""
+Synthetic AgriRiskFin-schema data for benchmarks, at any row count.
+Columns are drawn independently (the bundled sample's columns are uncorrelated, apart from
+Net_Profit = Revenue - Expenses, which is recomputed): numeric columns from the sample's empirical
+quantile function, categoricals with the sample's mix. Rounding follows the sample's decimals.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import DEFAULT_RANDOM_STATE, DEFAULT_CHUNKSIZE
+from src.io import save_clean_data
+
+DERIVED = {"Net_Profit": ("Revenue", "Expenses")}  # column = a - b
+
+@dataclass
+class SampleProfile:
+    columns: list                                          # raw column order
+    quantiles: Dict[str, np.ndarray]                       # sorted sample values per numeric column
+    decimals: Dict[str, int]
+    categories: Dict[str, Tuple[np.ndarray, np.ndarray]]   # levels, probabilities
+
+def _decimals(s: pd.Series, max_decimals: int = 4) -> int:
+    for d in range(max_decimals + 1):
+        if np.allclose(s, s.round(d), rtol=0, atol=1e-9):
+            return d
+    return max_decimals
+
+def fit_profile(df: pd.DataFrame) -> SampleProfile:
+    quantiles, decimals, categories = {}, {}, {}
+    for c in df.columns:
+        if c == "Enterprise_ID" or c in DERIVED:
+            continue
+        if pd.api.types.is_numeric_dtype(df[c]):
+            s = df[c].dropna().astype(np.float64)
+            quantiles[c] = np.sort(s.to_numpy())
+            decimals[c] = _decimals(s)
+        else:
+            mix = df[c].value_counts(normalize=True, sort=False)
+            categories[c] = (mix.index.astype(str).to_numpy(), mix.to_numpy(dtype=np.float64))
+    return SampleProfile(list(df.columns), quantiles, decimals, categories)
+
+def generate_chunk(profile: SampleProfile, n: int, rng: np.random.Generator, start: int = 0, id_width: int = 4) -> pd.DataFrame:
+    cols = {}
+    for c in profile.columns:
+        if c == "Enterprise_ID":
+            cols[c] = [f"ENT{i:0{id_width}d}" for i in range(start + 1, start + n + 1)]
+        elif c in profile.quantiles:
+            values = profile.quantiles[c]
+            # inverse empirical CDF with linear interpolation between sample order statistics
+            drawn = np.interp(rng.random(n) * (len(values) - 1), np.arange(len(values)), values)
+            cols[c] = drawn.round(profile.decimals[c])
+            if values[0] < 0 < values[-1] and not (values == 0).any():
+                # no exact zeros where the sample has none (Revenue is a divisor in add_financial_ratios)
+                zero = cols[c] == 0
+                cols[c][zero] = np.copysign(10.0 ** -profile.decimals[c], drawn[zero])
+            if profile.decimals[c] == 0:
+                cols[c] = cols[c].astype(np.int64)
+        elif c in profile.categories:
+            levels, probs = profile.categories[c]
+            cols[c] = levels[rng.choice(len(levels), size=n, p=probs)]
+    for c, (a, b) in DERIVED.items():
+        if c in profile.columns:
+            cols[c] = cols[a] - cols[b]
+    return pd.DataFrame({c: cols[c] for c in profile.columns})
+
+def write_synthetic(path: Path, n_rows: int, profile: SampleProfile, random_state: int = DEFAULT_RANDOM_STATE, chunksize: int = DEFAULT_CHUNKSIZE) -> Path:
+    """
+    Writes n_rows synthetic rows as a raw CSV, chunk by chunk (10M rows never sit in memory at once).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(random_state)
+    id_width = max(4, len(str(n_rows)))
+    for i, start in enumerate(range(0, n_rows, chunksize)):
+        chunk = generate_chunk(profile, min(chunksize, n_rows - start), rng, start=start, id_width=id_width)
+        save_clean_data(chunk, path, append=i > 0)
+    return path
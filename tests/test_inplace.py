@@ -0,0 +1,56 @@
+"""
+inplace=True through the feature / proxy / output chain: same frame as the copying default, with a
+lower peak allocation. The peak is tracemalloc's, not RSS: it counts the numpy / pandas buffers each
+copy allocates and is deterministic, where peak RSS of a test-sized frame is dominated by the
+interpreter and libraries and by allocator reuse. Wall time is not asserted here (timer noise on a
+loaded machine); compare it on large frames with the benchmark:
+
+    python -m src bench --rows 1m --save-baseline --baseline copy.json
+    python -m src bench --rows 1m --inplace --baseline copy.json
+"""
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import RAW_DATA_PATH, CARBON_PRICE_SCENARIOS_USD2010, SEVERE_SCENARIO, PipelineConfig
+from src.io import load_raw_data
+from src.synthetic import fit_profile, generate_chunk
+from src.features import add_financial_ratios, add_climate_stress, climate_stress_stats
+from src.proxies import add_proxy_variants, fit_proxy_stats
+from src.outputs import add_pipeline_outputs
+
+N_ROWS = 20_000
+
+@pytest.fixture(scope="module")
+def raw():
+    profile = fit_profile(load_raw_data(RAW_DATA_PATH))
+    return generate_chunk(profile, N_ROWS, np.random.default_rng(0))
+
+def run_chain(df: pd.DataFrame, inplace: bool) -> pd.DataFrame:
+    cfg = PipelineConfig()
+    df = add_financial_ratios(df, inplace=inplace)
+    df = add_climate_stress(df, inplace=inplace, temp_stats=climate_stress_stats(df))
+    df = add_proxy_variants(df, inplace=inplace, stats=fit_proxy_stats(df))
+    df["Pred_Emissions_Proxy"] = df["Emissions_Proxy_v1"]  # stands in for the emissions model
+    return add_pipeline_outputs(
+        df, CARBON_PRICE_SCENARIOS_USD2010, years=cfg.years, growth_rate=cfg.growth_rate,
+        discount_rate=cfg.discount_rate, severe=SEVERE_SCENARIO, inplace=inplace,
+    )
+
+def traced_run(raw: pd.DataFrame, inplace: bool):
+    df = raw.copy()
+    tracemalloc.start()
+    try:
+        out = run_chain(df, inplace)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return out, peak
+
+def test_inplace_matches_copy_with_lower_peak(raw):
+    copied, copy_peak = traced_run(raw, inplace=False)
+    inplace, inplace_peak = traced_run(raw, inplace=True)
+    pd.testing.assert_frame_equal(copied, inplace)
+    assert inplace_peak < 0.75 * copy_peak
@@ -0,0 +1,41 @@
+"""
+Startup regression: `python -m src --help` and `python -m src scenarios` (help, and a query against a
+tiny snapshot) must not import sklearn, scipy or matplotlib (`python -X importtime` logs every module imported).
+"""
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import PROJECT_ROOT
+from src.io import save_columnar
+
+HEAVY_MODULES = ("sklearn", "scipy", "matplotlib")
+
+def run_importtime(argv):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-m", "src", *argv], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout, {
+        line.split("|")[-1].strip()
+        for line in proc.stderr.splitlines()
+        if line.startswith("import time:") and "cumulative" not in line
+    }
+
+def heavy(modules) -> set:
+    return {m.split(".")[0] for m in modules} & set(HEAVY_MODULES)
+
+@pytest.mark.parametrize("argv", [["--help"], ["scenarios", "--help"]])
+def test_light_commands_skip_heavy_imports(argv):
+    _, modules = run_importtime(argv)
+    assert "src.cli" in modules
+    assert not heavy(modules)
+
+def test_scenarios_query_skips_heavy_imports(tmp_path):
+    # runs the handler, so its own imports (src.config, src.io, src.scenarios) are covered
+    snapshot = save_columnar(pd.DataFrame({"Break_Even_Carbon_Price": [5.0, 20.0, np.inf]}), tmp_path / "snapshot")
+    out, modules = run_importtime(["scenarios", "--price", "10", "--snapshot", str(snapshot)])
+    assert {"src.io", "src.scenarios"} <= modules
+    assert not heavy(modules)
+    assert out.splitlines()[-1].split("|")[3].strip() == "1"  # stranded at 10: only the break-even price 5